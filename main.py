@@ -2,8 +2,15 @@ from fastapi.responses import JSONResponse
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from src.middleware.logging_middleware import LoggingMiddleware
+from src.middleware.rate_limit_middleware import RateLimitMiddleware
+from src.middleware.compression_middleware import CompressionMiddleware
+from src.middleware.tracing_middleware import TracingMiddleware
+from src.middleware.profiling_middleware import ProfilingMiddleware
+from src.middleware.usage_middleware import UsageMiddleware
+from src.utils.json_response import FastJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import sys
 
@@ -20,10 +27,21 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import routers
-from src.routes import auth_router, organization_router
+from src.routes import auth_router, organization_router, jobs_router, internal_router
 from src.db.mongo import mongo_manager
+from src.config.settings import settings
 from src.models.organization import OrganizationModel
 from src.models.admin_user import AdminUserModel
+from src.models.job import JobModel
+from src.models.tenant_usage import TenantUsageModel
+from src.models.tenant_migration import TenantMigrationModel
+from src.models.tenant_index import TenantIndexModel
+from src.services.job_service import job_worker
+from src.services.usage_service import usage_collector
+from src.services.audit_service import audit_writer
+from src.utils.password import calibrate_bcrypt_rounds
+from src.utils.tracing import tracer, create_span_processor
+from src.utils.loop_monitor import loop_monitor
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,6 +51,18 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Organization Management Service...")
     
+    if settings.loop_monitor_enabled:
+        await loop_monitor.start()
+    
+    if settings.tracing_enabled:
+        tracer.configure(create_span_processor())
+        logger.info(f"✅ Tracing enabled ({settings.tracing_exporter}, sample ratio {tracer.sample_ratio})")
+    
+    # Fit the bcrypt cost to this node's CPU before serving logins
+    if settings.bcrypt_calibrate:
+        rounds = await asyncio.to_thread(calibrate_bcrypt_rounds)
+        logger.info(f"✅ bcrypt cost calibrated to {rounds} rounds")
+    
     try:
         # Initialize database connections
         mongo_manager.get_client()
@@ -40,6 +70,10 @@ async def lifespan(app: FastAPI):
         # Create indexes
         OrganizationModel.create_indexes()
         AdminUserModel.create_indexes()
+        JobModel.create_indexes()
+        TenantUsageModel.create_indexes(settings.usage_retention_days)
+        TenantMigrationModel.create_indexes()
+        TenantIndexModel.create_indexes()
         
         logger.info("✅ Database initialized and indexes created")
         
@@ -48,11 +82,25 @@ async def lifespan(app: FastAPI):
         # DO NOT RAISE - let service start in degraded mode
         # This allows health endpoint to show "disconnected" status
     
+    # Workers keep polling in degraded mode and pick up once MongoDB is back
+    await job_worker.start()
+    if settings.usage_enabled:
+        await usage_collector.start()
+    if settings.audit_enabled:
+        await audit_writer.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Organization Management Service...")
+    await job_worker.stop()
+    await usage_collector.stop()
+    # After the job workers, so events they recorded are flushed
+    await audit_writer.stop()
+    await loop_monitor.stop()
     mongo_manager.close_connection()
+    # Flushes spans still queued for export
+    tracer.configure(None)
     logger.info("✅ Clean shutdown completed")
 
 # Create FastAPI app
@@ -61,11 +109,18 @@ app = FastAPI(
     description="Multi-tenant backend service with dynamic MongoDB collections",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json"
 )
 
+# Add profiling middleware (innermost so the profiled task is the one running the endpoint)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+# Add usage accounting middleware (reads the tenant get_current_admin stores in the request state)
+if settings.usage_enabled:
+    app.add_middleware(UsageMiddleware)
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -74,12 +129,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Add rate limiting middleware (inside logging so 429s are logged)
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
 # Add logging middleware
 app.add_middleware(LoggingMiddleware)
+# Add compression middleware (outside logging so logged timings include handler work only)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+# Add tracing middleware (outermost so the server span covers the whole request)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
 
 # Include routers
 app.include_router(auth_router)
 app.include_router(organization_router)
+app.include_router(jobs_router)
+app.include_router(internal_router)
 
 # Health check endpoint
 @app.get("/")
@@ -34,7 +34,9 @@ setup(
         "pydantic-settings==2.1.0",
         "python-jose[cryptography]==3.3.0",
         "passlib[bcrypt]==1.7.4",
+        "bcrypt==4.0.1",
         "python-multipart==0.0.6",
+        "orjson==3.9.10",
     ],
     extras_require={
         "dev": [
@@ -49,6 +51,10 @@ setup(
             "httpx==0.25.2",
             "pytest-asyncio==0.21.1",
         ],
+        "compression": [
+            "brotli==1.1.0",
+            "zstandard==0.22.0",
+        ],
     },
     entry_points={
         "console_scripts": [
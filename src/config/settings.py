@@ -20,7 +20,109 @@ class Settings(BaseSettings):
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     
     # Security
-    bcrypt_rounds: int = 12
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # used when calibration is off
+    bcrypt_calibrate: bool = os.getenv("BCRYPT_CALIBRATE", "True").lower() == "true"
+    bcrypt_target_ms: float = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+    bcrypt_min_rounds: int = int(os.getenv("BCRYPT_MIN_ROUNDS", "12"))  # cluster-wide floor; lower hashes are rehashed
+    bcrypt_max_rounds: int = int(os.getenv("BCRYPT_MAX_ROUNDS", "15"))
+    internal_api_token: str = os.getenv("INTERNAL_API_TOKEN", "")  # empty disables /internal
+    
+    # Background Jobs
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_lease_seconds: int = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    job_poll_interval_seconds: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+    job_retry_backoff_seconds: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5"))
+    export_dir: str = os.getenv("EXPORT_DIR", "exports")
+    
+    # Backups
+    backup_dir: str = os.getenv("BACKUP_DIR", "backups")
+    backup_workers: int = int(os.getenv("BACKUP_WORKERS", "4"))  # collections dumped in parallel
+    backup_chunk_bytes: int = int(os.getenv("BACKUP_CHUNK_BYTES", str(16 * 1024 * 1024)))  # uncompressed
+    backup_compression: str = os.getenv("BACKUP_COMPRESSION", "")  # zstd, gzip or none; empty picks zstd if installed
+    backup_retention_days: int = int(os.getenv("BACKUP_RETENTION_DAYS", "7"))
+    backup_gc_grace_seconds: int = int(os.getenv("BACKUP_GC_GRACE_SECONDS", "3600"))  # unreferenced chunks younger than this are kept
+    
+    # Rate Limiting
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory or redis
+    rate_limit_rules: str = os.getenv("RATE_LIMIT_RULES", "")  # JSON overrides per route prefix
+    rate_limit_trust_forwarded_for: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() == "true"
+    rate_limit_trusted_proxy_hops: int = int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "1"))  # proxies appending to X-Forwarded-For
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Slow Operation Capture
+    slow_op_enabled: bool = os.getenv("SLOW_OP_ENABLED", "True").lower() == "true"
+    slow_op_threshold_ms: float = float(os.getenv("SLOW_OP_THRESHOLD_MS", "100"))
+    slow_op_buffer_size: int = int(os.getenv("SLOW_OP_BUFFER_SIZE", "200"))
+    slow_op_explain: bool = os.getenv("SLOW_OP_EXPLAIN", "True").lower() == "true"
+    
+    # Event Loop Monitor
+    loop_monitor_enabled: bool = os.getenv("LOOP_MONITOR_ENABLED", "True").lower() == "true"
+    loop_monitor_interval_ms: float = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+    loop_monitor_threshold_ms: float = float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100"))  # lag that counts as a stall
+    loop_monitor_buffer_size: int = int(os.getenv("LOOP_MONITOR_BUFFER_SIZE", "100"))
+    loop_monitor_fail_ms: float = float(os.getenv("LOOP_MONITOR_FAIL_MS", "0"))  # tests fail on longer stalls; 0 disables
+    
+    # Usage Accounting
+    usage_enabled: bool = os.getenv("USAGE_ENABLED", "True").lower() == "true"
+    usage_flush_interval_seconds: float = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "60"))
+    usage_collstats_batch_size: int = int(os.getenv("USAGE_COLLSTATS_BATCH_SIZE", "20"))  # tenants sampled per flush
+    usage_collstats_per_second: float = float(os.getenv("USAGE_COLLSTATS_PER_SECOND", "2"))
+    usage_retention_days: int = int(os.getenv("USAGE_RETENTION_DAYS", "90"))
+    
+    # Tenant Schema Migrations
+    migration_workers: int = int(os.getenv("MIGRATION_WORKERS", "4"))  # tenants migrated in parallel
+    migration_batch_size: int = int(os.getenv("MIGRATION_BATCH_SIZE", "500"))
+    migration_docs_per_second: float = float(os.getenv("MIGRATION_DOCS_PER_SECOND", "1000"))  # across all workers
+    migration_lease_seconds: int = int(os.getenv("MIGRATION_LEASE_SECONDS", "300"))
+    
+    # Tenant Indexes
+    index_build_workers: int = int(os.getenv("INDEX_BUILD_WORKERS", "2"))  # collections indexed in parallel
+    index_builds_per_second: float = float(os.getenv("INDEX_BUILDS_PER_SECOND", "5"))  # builds started, across all builders
+    index_bootstrap_workers: int = int(os.getenv("INDEX_BOOTSTRAP_WORKERS", "16"))  # init_db, unthrottled
+    
+    # Organization Search
+    search_candidate_limit: int = int(os.getenv("SEARCH_CANDIDATE_LIMIT", "200"))  # per index scan; also the deepest page
+    search_trigram_scan_limit: int = int(os.getenv("SEARCH_TRIGRAM_SCAN_LIMIT", "5000"))  # organizations read per fuzzy lookup
+    search_min_similarity: float = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.3"))  # trigram similarity of fuzzy matches
+    
+    # Audit Log
+    audit_enabled: bool = os.getenv("AUDIT_ENABLED", "True").lower() == "true"
+    audit_buffer_size: int = int(os.getenv("AUDIT_BUFFER_SIZE", "10000"))  # events held in memory at most
+    audit_batch_size: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))  # events per insert_many; a full batch flushes early
+    audit_flush_interval_seconds: float = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+    audit_enqueue_timeout_seconds: float = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT_SECONDS", "0.5"))  # wait for room before dropping
+    audit_retention_months: int = int(os.getenv("AUDIT_RETENTION_MONTHS", "13"))  # monthly partitions kept; 0 keeps all
+    
+    # Tracing
+    tracing_enabled: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+    tracing_exporter: str = os.getenv("TRACING_EXPORTER", "file")  # file, otlp or none
+    tracing_sample_ratio: float = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))  # for traces started here
+    tracing_file_path: str = os.getenv("TRACING_FILE_PATH", "logs/traces.jsonl")
+    tracing_otlp_endpoint: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    tracing_service_name: str = os.getenv("TRACING_SERVICE_NAME", "organization-management-service")
+    
+    # Request Profiling
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # fraction of requests profiled
+    profiling_secret: str = os.getenv("PROFILING_SECRET", "")  # signs X-Profile tokens; empty disables the header
+    profiling_interval_ms: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    profiling_dir: str = os.getenv("PROFILING_DIR", "logs/profiles")
+    profiling_max_profiles: int = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+    profiling_max_concurrent: int = int(os.getenv("PROFILING_MAX_CONCURRENT", "2"))
+    
+    # Caching
+    cache_backend: str = os.getenv("CACHE_BACKEND", "none")  # none, memory or redis (uses REDIS_URL)
+    cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    cache_negative_ttl_seconds: float = float(os.getenv("CACHE_NEGATIVE_TTL_SECONDS", "5"))
+    cache_stale_seconds: float = float(os.getenv("CACHE_STALE_SECONDS", "10"))  # served while one caller refreshes
+    cache_lock_wait_ms: float = float(os.getenv("CACHE_LOCK_WAIT_MS", "50"))
+    
+    # Response Compression
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    compression_minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))  # bytes
+    compression_rules: str = os.getenv("COMPRESSION_RULES", "")  # JSON levels per route prefix
     
     class Config:
         env_file = ".env"
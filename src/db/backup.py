@@ -0,0 +1,519 @@
+import os
+import gzip
+import json
+import time
+import zlib
+import uuid
+import hashlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from bson import ObjectId, json_util
+from bson.codec_options import CodecOptions
+from bson.json_util import CANONICAL_JSON_OPTIONS
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import OperationFailure
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.utils.logger import logger
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; the store is then unlocked
+    fcntl = None
+
+BACKUP_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+CHUNK_STORE_DIR = "chunks"
+CHUNK_STORE_LOCK = ".lock"
+BACKUP_ID_FORMAT = "%Y%m%d_%H%M%S"
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+class Codec:
+    """Chunk file compression"""
+
+    def __init__(self, name: str, extension: str, compress: Callable[[bytes], bytes], decompress: Callable[[bytes], bytes]):
+        self.name = name
+        self.extension = extension
+        self.compress = compress
+        self.decompress = decompress
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+def _zstd_decompress(data: bytes) -> bytes:
+    # Chunks are written in one frame with the content size recorded
+    return zstandard.ZstdDecompressor().decompress(data)
+
+def get_codec(name: str) -> Codec:
+    if name == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        return Codec("zstd", ".zst", _zstd_compress, _zstd_decompress)
+    if name == "gzip":
+        return Codec("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=6), gzip.decompress)
+    if name == "none":
+        return Codec("none", "", lambda data: data, lambda data: data)
+    raise ValueError(f"Unknown backup compression '{name}'")
+
+def default_compression() -> str:
+    return settings.backup_compression or ("zstd" if zstandard is not None else "gzip")
+
+def encode_id(value: Any) -> str:
+    """Extended JSON for an _id, so it survives the JSON manifest with its type"""
+    return json_util.dumps({"_id": value}, json_options=CANONICAL_JSON_OPTIONS)
+
+def decode_id(encoded: str) -> Any:
+    return json_util.loads(encoded)["_id"]
+
+def iter_chunk_documents(data: bytes, fmt: str) -> Iterator[Any]:
+    """Documents in a decompressed chunk: raw BSON documents or dicts for NDJSON"""
+    if fmt == "bson":
+        position = 0
+        while position < len(data):
+            size = int.from_bytes(data[position:position + 4], "little")
+            yield RawBSONDocument(data[position:position + size])
+            position += size
+    else:
+        for line in data.splitlines():
+            if line:
+                yield json_util.loads(line)
+
+def capture_position(db) -> Optional[str]:
+    """
+    Current change stream position of the database, as extended JSON.
+
+    Taken before a base backup reads anything, so replaying changes from
+    here over the (fuzzy) dump gives a consistent state. None on servers
+    without change streams (standalone), where increments are unavailable.
+    """
+    try:
+        with db.watch(max_await_time_ms=1) as stream:
+            stream.try_next()
+            resume_token = stream.resume_token
+        operation_time = db.command("ping").get("operationTime")
+    except (OperationFailure, NotImplementedError) as e:
+        logger.warning(f"Change streams unavailable, backup cannot be a base for increments: {str(e)}")
+        return None
+    return json_util.dumps(
+        {"resume_token": resume_token, "operation_time": operation_time},
+        json_options=CANONICAL_JSON_OPTIONS
+    )
+
+def decode_position(position: str) -> Dict[str, Any]:
+    return json_util.loads(position)
+
+def manifest_chunks(manifest: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Every chunk a manifest references: collection chunks and change event chunks"""
+    for entry in manifest["collections"].values():
+        yield from entry["chunks"]
+    yield from manifest.get("events", {}).get("chunks", [])
+
+class ChunkStore:
+    """
+    Content-addressed chunk files shared by every backup under a root.
+
+    A chunk is stored under the SHA-256 of its uncompressed contents, so a
+    chunk whose documents did not change since an earlier backup is
+    written once and referenced by both manifests. Files are only ever
+    added here; apply_retention removes the ones no manifest references.
+
+    Running backups hold the store's lock file shared and garbage
+    collection holds it exclusive, so a chunk a backup decided to reuse
+    cannot be deleted before its manifest lists it.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @contextmanager
+    def lock(self, exclusive: bool = False, blocking: bool = True):
+        """Hold the store lock; yields False if `blocking` is off and it is taken"""
+        if fcntl is None:
+            yield True
+            return
+        directory = os.path.join(self.root, CHUNK_STORE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, CHUNK_STORE_LOCK), "a") as f:
+            mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            try:
+                fcntl.flock(f, mode if blocking else mode | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def relative_path(digest: str, suffix: str) -> str:
+        return os.path.join(CHUNK_STORE_DIR, digest[:2], f"{digest}{suffix}")
+
+    def put(self, raw: bytes, codec: Codec, suffix: str) -> Tuple[str, str, int, bool]:
+        """Store a chunk unless present; returns (file, digest, stored bytes, newly written)"""
+        digest = hashlib.sha256(raw).hexdigest()
+        relative_path = self.relative_path(digest, suffix)
+        path = os.path.join(self.root, relative_path)
+        if os.path.exists(path):
+            # A fresh mtime keeps the chunk out of a concurrent garbage collection
+            try:
+                os.utime(path)
+                return relative_path, digest, os.path.getsize(path), False
+            except FileNotFoundError:
+                pass  # swept since the check (unlocked store): write it again
+
+        compressed = codec.compress(raw)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Two workers may store the same content at once; each writes its own temp file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return relative_path, digest, len(compressed), True
+
+class BackupManifest:
+    """
+    manifest.json of one backup: collections, their chunks and checksums.
+
+    Chunks are recorded only after their file is fully written and renamed
+    into place, so anything listed can be trusted and anything missing is
+    redone on resume. Saves are atomic (write then rename) and throttled,
+    since a full backup records thousands of tenant collections.
+    """
+
+    def __init__(self, path: str, data: Dict[str, Any]):
+        self.path = path
+        self.data = data
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    @classmethod
+    def load(cls, path: str) -> "BackupManifest":
+        with open(path, encoding="utf-8") as f:
+            return cls(path, json.load(f))
+
+    def collection(self, name: str) -> Dict[str, Any]:
+        return self.data["collections"][name]
+
+    def add_collection(self, name: str, entry: Dict[str, Any]):
+        with self._lock:
+            self.data["collections"].setdefault(name, entry)
+
+    def add_chunk(self, name: str, chunk: Dict[str, Any]):
+        with self._lock:
+            entry = self.data["collections"][name]
+            entry["chunks"].append(chunk)
+            entry["documents"] += chunk["documents"]
+        self.save(force=False)
+
+    def complete_collection(self, name: str):
+        with self._lock:
+            self.data["collections"][name]["complete"] = True
+        self.save(force=False)
+
+    def save(self, force: bool = True, interval: float = 2.0):
+        with self._lock:
+            if not force and time.monotonic() - self._last_save < interval:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=1, default=str)
+            os.replace(tmp_path, self.path)
+            self._last_save = time.monotonic()
+
+class BackupEngine:
+    """
+    Streams collections of the master database into compressed chunk files.
+
+    Each collection is read in _id order and cut into chunks of concatenated
+    BSON (the mongodump .bson layout) or canonical extended-JSON lines,
+    stored in the root's content-addressed ChunkStore. Chunk boundaries
+    depend on the documents themselves (see `is_boundary`), not on their
+    position, so an insert or delete only changes the chunk it falls in and
+    unchanged chunks deduplicate against earlier backups. Collections are
+    spread over `workers` threads, largest first. An interrupted run can be
+    resumed: complete collections are skipped and partial ones continue
+    after the last recorded chunk's _id.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunk_bytes: Optional[int] = None,
+        compression: Optional[str] = None,
+        fmt: str = "bson",
+        db=None
+    ):
+        if fmt not in ("bson", "ndjson"):
+            raise ValueError(f"Unknown backup format '{fmt}'")
+        self.root = root or settings.backup_dir
+        self.workers = workers or settings.backup_workers
+        self.chunk_bytes = chunk_bytes or settings.backup_chunk_bytes
+        self.codec = get_codec(compression or default_compression())
+        self.fmt = fmt
+        self.db = db if db is not None else mongo_manager.get_master_db()
+        self.store = ChunkStore(self.root)
+        self.stats = {"documents": 0, "raw_bytes": 0, "stored_bytes": 0, "chunks": 0, "reused_chunks": 0}
+        self._stats_lock = threading.Lock()
+
+    def plan(self, organization: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Collections to back up with the filter for each.
+
+        The whole master database by default; for a tenant backup, its
+        tenant collection plus its registry entry and admin user.
+        """
+        if organization is None:
+            names = [name for name in self.db.list_collection_names() if not name.startswith("system.")]
+            return [{"name": name, "query": {}} for name in names]
+        return [
+            {"name": organization["collection_name"], "query": {}},
+            {"name": "organizations", "query": {"_id": organization["_id"]}},
+            {"name": "admin_users", "query": {"_id": ObjectId(organization["admin_user_id"])}},
+        ]
+
+    def _new_manifest(self, backup_id: str, plans: List[Dict[str, Any]], organization: Optional[Dict[str, Any]]) -> BackupManifest:
+        directory = os.path.join(self.root, backup_id)
+        os.makedirs(directory, exist_ok=True)
+        manifest = BackupManifest(os.path.join(directory, MANIFEST_FILE), {
+            "format_version": BACKUP_FORMAT_VERSION,
+            "backup_id": backup_id,
+            "database": self.db.name,
+            "type": "tenant" if organization else "full",
+            "tenant": {
+                "organization_id": str(organization["_id"]),
+                "organization_name": organization["organization_name"],
+                "collection_name": organization["collection_name"]
+            } if organization else None,
+            "format": self.fmt,
+            "compression": self.codec.name,
+            "status": "running",
+            "started_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "position": capture_position(self.db),
+            "store": CHUNK_STORE_DIR,
+            "collections": {}
+        })
+        for plan in plans:
+            manifest.add_collection(plan["name"], self._collection_entry(plan))
+        manifest.save()
+        return manifest
+
+    def _collection_entry(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.db[plan["name"]]
+        options = next(iter(self.db.list_collections(filter={"name": plan["name"]})), {}).get("options", {})
+        return {
+            "query": json_util.dumps(plan["query"], json_options=CANONICAL_JSON_OPTIONS),
+            "options": json.loads(json_util.dumps(options, json_options=CANONICAL_JSON_OPTIONS)),
+            "indexes": [
+                json.loads(json_util.dumps(index, json_options=CANONICAL_JSON_OPTIONS))
+                for index in collection.list_indexes()
+            ],
+            "documents": 0,
+            "chunks": [],
+            "complete": False
+        }
+
+    def run(
+        self,
+        backup_id: Optional[str] = None,
+        organization: Optional[Dict[str, Any]] = None,
+        progress: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a backup, or resume it when `backup_id` names an existing one.
+
+        Returns the final manifest data with throughput stats.
+        """
+        if backup_id is None:
+            backup_id = base_id = datetime.utcnow().strftime(BACKUP_ID_FORMAT)
+            suffix = 1
+            while os.path.exists(os.path.join(self.root, backup_id)):
+                suffix += 1
+                backup_id = f"{base_id}_{suffix}"
+        manifest_path = os.path.join(self.root, backup_id, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            manifest = BackupManifest.load(manifest_path)
+            if manifest.data["status"] == "completed":
+                return manifest.data
+            # Chunks must decode the way the original run wrote them
+            self.fmt = manifest.data["format"]
+            self.codec = get_codec(manifest.data["compression"])
+            logger.info(f"Resuming backup {backup_id}")
+        else:
+            manifest = self._new_manifest(backup_id, self.plan(organization), organization)
+            logger.info(f"Starting backup {backup_id} ({manifest.data['type']}, {self.workers} workers)")
+
+        pending = [name for name, entry in manifest.data["collections"].items() if not entry["complete"]]
+        # Largest first, so one big collection does not start last and run alone
+        pending.sort(key=lambda name: self.db[name].estimated_document_count(), reverse=True)
+
+        started = time.perf_counter()
+        failures = {}
+        with self.store.lock(), ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backup") as pool:
+            futures = {pool.submit(self._backup_collection, manifest, name): name for name in pending}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    if progress:
+                        progress(name, manifest.collection(name))
+                except Exception as e:
+                    failures[name] = str(e)
+                    logger.error(f"❌ Backup of {name} failed: {str(e)}")
+            # Release the store only once every reused chunk is in the manifest
+            manifest.save()
+
+        elapsed = time.perf_counter() - started
+        manifest.data["status"] = "failed" if failures else "completed"
+        manifest.data["errors"] = failures
+        manifest.data["completed_at"] = datetime.utcnow().isoformat() if not failures else None
+        manifest.data["last_run"] = self.throughput(elapsed)
+        manifest.save()
+        return manifest.data
+
+    def throughput(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "seconds": round(elapsed, 3),
+            "workers": self.workers,
+            "documents_per_second": round(self.stats["documents"] / elapsed, 1) if elapsed else None,
+            "raw_mb_per_second": round(self.stats["raw_bytes"] / elapsed / 1_048_576, 2) if elapsed else None
+        }
+
+    def _backup_collection(self, manifest: BackupManifest, name: str):
+        entry = manifest.collection(name)
+        query = json_util.loads(entry["query"])
+        if entry["chunks"]:
+            last_id = decode_id(entry["chunks"][-1]["last_id"])
+            query = {"$and": [query, {"_id": {"$gt": last_id}}]} if query else {"_id": {"$gt": last_id}}
+
+        collection = self.db.get_collection(name, codec_options=RAW_CODEC_OPTIONS)
+        cursor = collection.find(query, sort=[("_id", 1)], batch_size=1000)
+        buffer = bytearray()
+        documents = 0
+        first_id = last_id = None
+
+        for document in cursor:
+            if self.fmt == "bson":
+                encoded = document.raw
+            else:
+                encoded = json_util.dumps(document, json_options=CANONICAL_JSON_OPTIONS).encode() + b"\n"
+            buffer += encoded
+            if first_id is None:
+                first_id = document["_id"]
+            last_id = document["_id"]
+            documents += 1
+            if self.is_boundary(last_id, len(encoded), len(buffer)):
+                self._write_chunk(manifest, name, bytes(buffer), documents, first_id, last_id)
+                buffer.clear()
+                documents = 0
+                first_id = None
+
+        if documents:
+            self._write_chunk(manifest, name, bytes(buffer), documents, first_id, last_id)
+        manifest.complete_collection(name)
+
+    def is_boundary(self, document_id: Any, document_bytes: int, buffered: int) -> bool:
+        """
+        Whether a chunk ends after this document.
+
+        A document is an anchor with probability document_bytes / chunk_bytes,
+        decided by a hash of its _id, so chunks average about 1.25 x
+        chunk_bytes (the first quarter never ends) and every run over the
+        same documents cuts in the same places. Chunks are capped at four
+        times the target.
+        """
+        if buffered >= 4 * self.chunk_bytes:
+            return True
+        if buffered < self.chunk_bytes // 4:
+            return False
+        anchor = zlib.crc32(encode_id(document_id).encode())
+        return anchor * self.chunk_bytes < document_bytes << 32
+
+    def _write_chunk(self, manifest: BackupManifest, name: str, raw: bytes, documents: int, first_id, last_id):
+        relative_path, digest, stored_bytes, new = self.store.put(raw, self.codec, f".{self.fmt}{self.codec.extension}")
+        manifest.add_chunk(name, {
+            "file": relative_path,
+            "hash": digest,
+            "documents": documents,
+            "raw_bytes": len(raw),
+            "stored_bytes": stored_bytes,
+            "new": new,
+            "first_id": encode_id(first_id),
+            "last_id": encode_id(last_id)
+        })
+        with self._stats_lock:
+            self.stats["documents"] += documents
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["chunks"] += 1
+            if new:
+                self.stats["stored_bytes"] += stored_bytes
+            else:
+                self.stats["reused_chunks"] += 1
+
+def backup_path(root: str, backup_id: str) -> str:
+    """Directory of `backup_id` directly under `root`; ValueError for ids that leave it"""
+    path = os.path.normpath(os.path.join(root, backup_id))
+    if not backup_id or os.path.dirname(path) != os.path.normpath(root):
+        raise ValueError(f"Invalid backup id '{backup_id}'")
+    return path
+
+def chunk_path(backup_dir: str, chunk: Dict[str, Any]) -> str:
+    """Path of a chunk file: in the root's chunk store, or in the backup's own directory"""
+    if "hash" in chunk:
+        return os.path.join(os.path.dirname(os.path.normpath(backup_dir)), chunk["file"])
+    return os.path.join(backup_dir, chunk["file"])
+
+def read_chunk(backup_dir: str, manifest: Dict[str, Any], chunk: Dict[str, Any], verify: bool = True) -> bytes:
+    """Decompressed contents of a chunk, checking its checksum"""
+    if "hash" in chunk:
+        with open(chunk_path(backup_dir, chunk), "rb") as f:
+            data = get_codec(manifest["compression"]).decompress(f.read())
+        if verify and hashlib.sha256(data).hexdigest() != chunk["hash"]:
+            raise ValueError(f"Checksum mismatch for {chunk['file']}")
+        return data
+
+    with open(chunk_path(backup_dir, chunk), "rb") as f:
+        compressed = f.read()
+    if verify and hashlib.sha256(compressed).hexdigest() != chunk["sha256"]:
+        raise ValueError(f"Checksum mismatch for {chunk['file']}")
+    return get_codec(manifest["compression"]).decompress(compressed)
+
+def list_backups(root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Backups under `root` with their manifest summary, newest first"""
+    root = root or settings.backup_dir
+    if not os.path.isdir(root):
+        return []
+    backups = []
+    for backup_id in sorted(os.listdir(root), reverse=True):
+        path = os.path.join(root, backup_id, MANIFEST_FILE)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        collections = manifest["collections"].values()
+        backups.append({
+            "backup_id": backup_id,
+            "type": manifest["type"],
+            "status": manifest["status"],
+            "started_at": manifest["started_at"],
+            "parent_id": manifest.get("parent_id"),
+            "collections": len(manifest["collections"]),
+            "documents": sum(entry["documents"] for entry in collections),
+            "events": manifest.get("events", {}).get("count", 0),
+            # Bytes this backup added; reused chunks are counted by the backup that wrote them
+            "stored_bytes": sum(chunk["stored_bytes"] for chunk in manifest_chunks(manifest) if chunk.get("new", True)),
+            "referenced_bytes": sum(chunk["stored_bytes"] for chunk in manifest_chunks(manifest))
+        })
+    return backups
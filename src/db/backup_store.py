@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from src.config.settings import settings
+from src.db.backup import (
+    BACKUP_ID_FORMAT, CHUNK_STORE_DIR, CHUNK_STORE_LOCK, MANIFEST_FILE, ChunkStore, chunk_path, get_codec,
+    manifest_chunks
+)
+from src.utils.logger import logger
+
+def load_manifests(root: str) -> Dict[str, Dict[str, Any]]:
+    """Manifest of every backup under `root` by backup id"""
+    manifests = {}
+    for backup_id in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        path = os.path.join(root, backup_id, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                manifests[backup_id] = json.load(f)
+    return manifests
+
+def backup_time(backup_id: str) -> Optional[datetime]:
+    """UTC start time from a backup id (ignoring any _N suffix)"""
+    try:
+        return datetime.strptime(backup_id[:15], BACKUP_ID_FORMAT)
+    except ValueError:
+        return None
+
+def apply_retention(
+    root: Optional[str] = None,
+    days: Optional[int] = None,
+    grace_seconds: Optional[int] = None,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Expire old backups, then garbage-collect the chunk store.
+
+    Backups started within `days` are kept together with every backup
+    they build on (an increment needs its parents back to the full
+    backup), and the newest completed full backup is always kept. The
+    rest are deleted. Chunk files no kept manifest references are then
+    swept, unless modified within `grace_seconds`: a running backup may
+    have stored chunks its manifest does not list yet.
+
+    The sweep holds the chunk store lock and is skipped while a backup
+    runs; the next retention run collects what is left.
+    """
+    root = root or settings.backup_dir
+    days = settings.backup_retention_days if days is None else days
+    grace_seconds = settings.backup_gc_grace_seconds if grace_seconds is None else grace_seconds
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    manifests = load_manifests(root)
+
+    kept = {backup_id for backup_id in manifests if (backup_time(backup_id) or cutoff) >= cutoff}
+    full = [
+        backup_id for backup_id, manifest in manifests.items()
+        if manifest["type"] == "full" and manifest["status"] == "completed"
+    ]
+    if full:
+        kept.add(full[-1])
+    for backup_id in list(kept):
+        parent_id = manifests[backup_id].get("parent_id")
+        while parent_id in manifests and parent_id not in kept:
+            kept.add(parent_id)
+            parent_id = manifests[parent_id].get("parent_id")
+
+    # Directories without a manifest are dumps from before the chunked format
+    legacy = [
+        name for name in os.listdir(root)
+        if name not in manifests and os.path.isdir(os.path.join(root, name)) and (backup_time(name) or cutoff) < cutoff
+    ] if os.path.isdir(root) else []
+    removed = sorted((set(manifests) - kept) | set(legacy))
+    for backup_id in removed:
+        if not dry_run:
+            shutil.rmtree(os.path.join(root, backup_id))
+        logger.info(f"Removed old backup: {backup_id}")
+
+    swept, freed, referenced = 0, 0, set()
+    with ChunkStore(root).lock(exclusive=True, blocking=False) as locked:
+        if not locked:
+            logger.info("Backup in progress, chunk garbage collection skipped")
+        else:
+            swept, freed, referenced = _sweep_chunks(root, set(removed), time.time() - grace_seconds, dry_run)
+
+    if swept:
+        logger.info(f"Garbage-collected {swept} unreferenced chunks ({freed / 1_048_576:.2f} MB)")
+    return {
+        "kept_backups": sorted(kept),
+        "removed_backups": removed,
+        "referenced_chunks": len(referenced),
+        "removed_chunks": swept,
+        "chunk_gc_skipped": not locked,
+        "freed_bytes": freed,
+        "dry_run": dry_run
+    }
+
+def _sweep_chunks(root: str, removed: set, horizon: float, dry_run: bool):
+    """Delete chunk files no remaining manifest references; returns (count, bytes, referenced)"""
+    # Reload: backups that completed since retention started reference chunks too
+    referenced = {
+        os.path.normpath(chunk["file"])
+        for backup_id, manifest in load_manifests(root).items() if backup_id not in removed
+        for chunk in manifest_chunks(manifest) if "hash" in chunk
+    }
+    swept, freed = 0, 0
+    for directory, _, filenames in os.walk(os.path.join(root, CHUNK_STORE_DIR)):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if filename == CHUNK_STORE_LOCK or os.path.relpath(path, root) in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime >= horizon:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            swept += 1
+            freed += stat.st_size
+    return swept, freed, referenced
+
+def _verify_chunk(path: str, compression: str, chunk: Dict[str, Any]) -> Optional[str]:
+    """Problem with one chunk file, or None when it is intact"""
+    try:
+        with open(path, "rb") as f:
+            stored = f.read()
+    except FileNotFoundError:
+        return "missing"
+    if "hash" not in chunk:
+        return None if hashlib.sha256(stored).hexdigest() == chunk["sha256"] else "checksum mismatch"
+    try:
+        data = get_codec(compression).decompress(stored)
+    except Exception as e:
+        return f"cannot decompress: {str(e)}"
+    if len(data) != chunk["raw_bytes"] or hashlib.sha256(data).hexdigest() != chunk["hash"]:
+        return "checksum mismatch"
+    return None
+
+def verify_backups(
+    root: Optional[str] = None,
+    backup_ids: Optional[List[str]] = None,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Check every chunk the given backups (default: all) reference.
+
+    Each distinct chunk file is read, decompressed and hashed once, however
+    many backups share it, on `workers` threads. A backup is ok when it
+    completed and all of its chunks are intact.
+    """
+    root = root or settings.backup_dir
+    manifests = load_manifests(root)
+    backup_ids = backup_ids or list(manifests)
+    missing_backups = [backup_id for backup_id in backup_ids if backup_id not in manifests]
+
+    chunks: Dict[str, Any] = {}
+    users: Dict[str, List[str]] = {}
+    for backup_id in backup_ids:
+        if backup_id in missing_backups:
+            continue
+        manifest = manifests[backup_id]
+        for chunk in manifest_chunks(manifest):
+            path = os.path.normpath(chunk_path(os.path.join(root, backup_id), chunk))
+            chunks.setdefault(path, (manifest["compression"], chunk))
+            users.setdefault(path, []).append(backup_id)
+
+    started = time.monotonic()
+    paths = list(chunks)
+    with ThreadPoolExecutor(max_workers=workers or settings.backup_workers, thread_name_prefix="verify") as pool:
+        problems = dict(zip(paths, pool.map(lambda path: _verify_chunk(path, *chunks[path]), paths)))
+
+    damaged = {path: problem for path, problem in problems.items() if problem}
+    backups = {}
+    for backup_id in backup_ids:
+        if backup_id in missing_backups:
+            backups[backup_id] = {"status": "missing"}
+            continue
+        bad = sorted(os.path.relpath(path, root) for path in damaged if backup_id in users[path])
+        if bad:
+            status = "damaged"
+        elif manifests[backup_id]["status"] != "completed":
+            status = "incomplete"
+        else:
+            status = "ok"
+        backups[backup_id] = {"status": status, "bad_chunks": bad}
+
+    return {
+        "ok": all(backup["status"] == "ok" for backup in backups.values()),
+        "chunks": len(paths),
+        "seconds": round(time.monotonic() - started, 3),
+        "damaged_chunks": {os.path.relpath(path, root): problem for path, problem in damaged.items()},
+        "backups": backups
+    }
@@ -0,0 +1,48 @@
+import threading
+from typing import Any, Dict, Tuple
+from pymongo import monitoring
+from src.db.explain import command_filter, filter_shape
+from src.utils.tracing import SPAN_KIND_CLIENT, STATUS_ERROR, Span, tracer
+
+class TracingCommandListener(monitoring.CommandListener):
+    """Emits a client span for every MongoDB command issued inside a trace"""
+
+    def __init__(self):
+        self._spans: Dict[Tuple[Any, int], Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        # Only commands issued under an active span; handshakes and
+        # background monitoring would otherwise start traces of their own
+        if not tracer.enabled or tracer.current_span() is None:
+            return
+        collection = event.command.get(event.command_name)
+        span = tracer.start_span(f"mongodb.{event.command_name}", SPAN_KIND_CLIENT, {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "db.mongodb.collection": collection if isinstance(collection, str) else "",
+            "db.statement": str(filter_shape(command_filter(event.command_name, event.command))),
+            "net.peer.name": event.connection_id[0],
+            "net.peer.port": event.connection_id[1],
+        })
+        with self._lock:
+            self._spans[(event.connection_id, event.request_id)] = span
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, None)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, event.failure.get("errmsg", "failed"))
+
+    def _finish(self, event, error):
+        with self._lock:
+            span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is None:
+            return
+        if error is not None:
+            span.status_code = STATUS_ERROR
+            span.status_message = str(error)
+        tracer.end_span(span)
+
+tracing_command_listener = TracingCommandListener()
@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+
+# Commands MongoDB can explain, and the field holding each one's filter
+EXPLAINABLE_COMMANDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+# Fields pymongo adds to commands that explain rejects or that belong to
+# the original session
+_SESSION_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+def filter_shape(value: Any) -> Any:
+    """Replace literal values with their type so queries group by shape"""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Keep pipelines and $and/$or branches, collapse value lists
+        if value and all(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return "<array>"
+    return f"<{type(value).__name__}>"
+
+def command_filter(command_name: str, command: Dict[str, Any]) -> Any:
+    """The filter (or pipeline) part of a command, if it has one"""
+    field = EXPLAINABLE_COMMANDS.get(command_name)
+    if field is None:
+        return None
+    value = command.get(field)
+    if command_name in ("update", "delete") and value:
+        # Batched write commands: explain the first statement's filter
+        return value[0].get("q")
+    return value
+
+def explain_command(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build an explain command for a previously issued command, None if not explainable"""
+    if command_name not in EXPLAINABLE_COMMANDS:
+        return None
+    inner = {
+        key: value for key, value in command.items()
+        if not key.startswith("$") and key not in _SESSION_FIELDS
+    }
+    if command_name in ("update", "delete"):
+        # explain accepts exactly one statement
+        inner[EXPLAINABLE_COMMANDS[command_name]] = inner[EXPLAINABLE_COMMANDS[command_name]][:1]
+    return {"explain": inner, "verbosity": "queryPlanner"}
+
+def _stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a winning plan tree, root first"""
+    stages = [plan]
+    if "inputStage" in plan:
+        stages.extend(_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_stages(child))
+    return stages
+
+def _winning_plan(explain: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # Aggregations report the planner per stage
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                planner = stage["$cursor"].get("queryPlanner")
+                break
+    if planner is None:
+        return None
+    plan = planner.get("winningPlan")
+    # Slot-based engine output wraps the classic plan tree
+    if plan and "queryPlan" in plan:
+        plan = plan["queryPlan"]
+    return plan
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce explain output to what matters for index coverage: the stage
+    chain, indexes used, and whether it scanned the collection or sorted
+    in memory.
+    """
+    plan = _winning_plan(explain)
+    if plan is None:
+        return {"plan": None, "collscan": False, "in_memory_sort": False, "indexes": []}
+
+    stages = _stages(plan)
+    names = [stage.get("stage", "?") for stage in stages]
+    indexes = [stage["indexName"] for stage in stages if stage.get("indexName")]
+    return {
+        "plan": " <- ".join(
+            f"{stage.get('stage')}({stage['indexName']})" if stage.get("indexName") else str(stage.get("stage"))
+            for stage in stages
+        ),
+        "collscan": "COLLSCAN" in names,
+        # A SORT stage means the index did not provide the order
+        "in_memory_sort": "SORT" in names,
+        "indexes": indexes,
+    }
@@ -0,0 +1,250 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import bson
+from bson import json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS
+from bson.timestamp import Timestamp
+from src.config.settings import settings
+from src.db.backup import (
+    BACKUP_FORMAT_VERSION, BACKUP_ID_FORMAT, MANIFEST_FILE, BackupManifest,
+    decode_position, default_compression, get_codec, iter_chunk_documents, read_chunk
+)
+from src.db.mongo import mongo_manager
+from src.utils.logger import logger
+
+def load_manifest(root: str, backup_id: str) -> Dict[str, Any]:
+    with open(os.path.join(root, backup_id, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+def encode_timestamp(value: Optional[Timestamp]) -> Optional[str]:
+    return json_util.dumps(value, json_options=CANONICAL_JSON_OPTIONS) if value is not None else None
+
+def decode_timestamp(value: Optional[str]) -> Optional[Timestamp]:
+    return json_util.loads(value) if value is not None else None
+
+def compact_event(change: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a change stream event needed to replay it"""
+    event = {
+        "ts": change["clusterTime"],
+        "op": change["operationType"],
+        "coll": change.get("ns", {}).get("coll"),
+    }
+    if "documentKey" in change:
+        event["key"] = change["documentKey"]
+    if "fullDocument" in change and change["fullDocument"] is not None:
+        event["doc"] = change["fullDocument"]
+    if "updateDescription" in change:
+        event["update"] = change["updateDescription"]
+    if "to" in change:
+        event["to"] = change["to"]["coll"]
+    return event
+
+class IncrementalBackup:
+    """
+    Captures the changes made since a previous backup.
+
+    Every backup records the change stream position it covers up to: a
+    base (full) backup the position taken before its dump started, an
+    increment the position after its last event. An increment resumes the
+    master database's change stream from its parent's position, reads
+    until it catches up with the time the run started, and writes the
+    events as compressed BSON chunks. Base plus the chain of increments
+    can rebuild any point in time they cover.
+    """
+
+    def __init__(self, root: Optional[str] = None, chunk_bytes: Optional[int] = None, compression: Optional[str] = None, db=None):
+        self.root = root or settings.backup_dir
+        self.chunk_bytes = chunk_bytes or settings.backup_chunk_bytes
+        self.codec = get_codec(compression or default_compression())
+        self.db = db if db is not None else mongo_manager.get_master_db()
+
+    def latest_parent(self) -> Optional[str]:
+        """Newest completed full backup or increment that has a change stream position"""
+        if not os.path.isdir(self.root):
+            return None
+        for backup_id in sorted(os.listdir(self.root), reverse=True):
+            path = os.path.join(self.root, backup_id, MANIFEST_FILE)
+            if not os.path.exists(path):
+                continue
+            manifest = load_manifest(self.root, backup_id)
+            if manifest["status"] == "completed" and manifest["type"] in ("full", "incremental") and manifest.get("position"):
+                return backup_id
+        return None
+
+    def run(self, parent_id: Optional[str] = None, max_events: int = 1_000_000) -> Dict[str, Any]:
+        """Back up the changes since `parent_id` (default: the latest backup)"""
+        parent_id = parent_id or self.latest_parent()
+        if parent_id is None:
+            raise ValueError("No completed backup with a change stream position to continue from")
+        parent = load_manifest(self.root, parent_id)
+        if not parent.get("position"):
+            raise ValueError(f"Backup {parent_id} has no change stream position")
+
+        position = decode_position(parent["position"])
+        # Stop at the time the run started, so a busy database cannot keep it going forever
+        until = self.db.command("ping").get("operationTime")
+        with self.db.watch(resume_after=position["resume_token"], max_await_time_ms=500) as stream:
+            events = self._read_until(stream, until, max_events)
+            return self.write(parent, events, lambda: stream.resume_token)
+
+    @staticmethod
+    def _read_until(stream, until: Optional[Timestamp], max_events: int) -> Iterator[Dict[str, Any]]:
+        for _ in range(max_events):
+            change = stream.try_next()
+            if change is None:
+                return
+            yield compact_event(change)
+            if change["operationType"] == "invalidate" or (until is not None and change["clusterTime"] >= until):
+                return
+
+    def write(self, parent: Dict[str, Any], events: Iterable[Dict[str, Any]], end_resume_token) -> Dict[str, Any]:
+        """
+        Write an increment holding `events` on top of `parent`.
+
+        `end_resume_token` is called once the events are consumed and gives
+        the position the next increment continues from.
+        """
+        backup_id = datetime.utcnow().strftime(BACKUP_ID_FORMAT)
+        suffix = 1
+        while os.path.exists(os.path.join(self.root, backup_id)):
+            suffix += 1
+            backup_id = f"{datetime.utcnow().strftime(BACKUP_ID_FORMAT)}_{suffix}"
+        directory = os.path.join(self.root, backup_id)
+        os.makedirs(directory)
+        parent_position = decode_position(parent["position"])
+        manifest = BackupManifest(os.path.join(directory, MANIFEST_FILE), {
+            "format_version": BACKUP_FORMAT_VERSION,
+            "backup_id": backup_id,
+            "database": self.db.name,
+            "type": "incremental",
+            "parent_id": parent["backup_id"],
+            "base_id": parent.get("base_id") or parent["backup_id"],
+            "format": "bson",
+            "compression": self.codec.name,
+            "status": "running",
+            "started_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "start_time": encode_timestamp(parent_position.get("operation_time")),
+            "end_time": None,
+            "position": None,
+            "collections": {},
+            "events": {"count": 0, "by_collection": {}, "chunks": []}
+        })
+        manifest.save()
+
+        buffer = bytearray()
+        chunk_events: List[Dict[str, Any]] = []
+        last_ts = parent_position.get("operation_time")
+        for event in events:
+            buffer += bson.encode(event)
+            chunk_events.append(event)
+            last_ts = event["ts"]
+            if len(buffer) >= self.chunk_bytes:
+                self._write_chunk(manifest, bytes(buffer), chunk_events)
+                buffer.clear()
+                chunk_events = []
+        if chunk_events:
+            self._write_chunk(manifest, bytes(buffer), chunk_events)
+
+        # Index specs of the collections the events touched, so a restore can
+        # build indexes of collections created after the base
+        existing = set(self.db.list_collection_names())
+        manifest.data["indexes"] = {
+            name: [json.loads(json_util.dumps(index, json_options=CANONICAL_JSON_OPTIONS)) for index in self.db[name].list_indexes()]
+            for name in manifest.data["events"]["by_collection"] if name in existing
+        }
+        manifest.data["position"] = json_util.dumps(
+            {"resume_token": end_resume_token(), "operation_time": last_ts},
+            json_options=CANONICAL_JSON_OPTIONS
+        )
+        manifest.data["end_time"] = encode_timestamp(last_ts)
+        manifest.data["status"] = "completed"
+        manifest.data["completed_at"] = datetime.utcnow().isoformat()
+        manifest.save()
+        logger.info(f"✅ Incremental backup {backup_id}: {manifest.data['events']['count']} changes since {parent['backup_id']}")
+        return manifest.data
+
+    def _write_chunk(self, manifest: BackupManifest, raw: bytes, events: List[Dict[str, Any]]):
+        info = manifest.data["events"]
+        compressed = self.codec.compress(raw)
+        relative_path = os.path.join("events", f"{len(info['chunks']):06d}.bson{self.codec.extension}")
+        path = os.path.join(os.path.dirname(manifest.path), relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(compressed)
+        os.replace(f"{path}.tmp", path)
+
+        for event in events:
+            if event["coll"]:
+                info["by_collection"][event["coll"]] = info["by_collection"].get(event["coll"], 0) + 1
+        info["count"] += len(events)
+        info["chunks"].append({
+            "file": relative_path,
+            "documents": len(events),
+            "raw_bytes": len(raw),
+            "stored_bytes": len(compressed),
+            "sha256": hashlib.sha256(compressed).hexdigest(),
+            "first_ts": encode_timestamp(events[0]["ts"]),
+            "last_ts": encode_timestamp(events[-1]["ts"])
+        })
+        manifest.save(force=False)
+
+def backup_chain(root: str, backup_id: str) -> List[Dict[str, Any]]:
+    """Manifests from the base backup to `backup_id`, oldest first"""
+    chain = []
+    current = backup_id
+    while current:
+        manifest = load_manifest(root, current)
+        if manifest["status"] != "completed":
+            raise ValueError(f"Backup {current} is not complete")
+        chain.append(manifest)
+        current = manifest.get("parent_id")
+    chain.reverse()
+    if chain[0]["type"] != "full":
+        raise ValueError(f"Backup chain of {backup_id} does not start with a full backup")
+    return chain
+
+def position_time(manifest: Dict[str, Any]) -> Optional[Timestamp]:
+    """Cluster time a backup covers up to (None when the server did not report one)"""
+    return decode_position(manifest["position"]).get("operation_time")
+
+def chain_for_time(root: str, until: Optional[Timestamp] = None) -> List[Dict[str, Any]]:
+    """
+    The backup chain that can rebuild the database as of `until`.
+
+    The newest full backup taken before `until`, followed by the
+    increments descending from it up to the one that contains `until`.
+    Without `until` the chain reaches the newest increment.
+    """
+    manifests = []
+    for backup_id in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        if os.path.exists(os.path.join(root, backup_id, MANIFEST_FILE)):
+            manifest = load_manifest(root, backup_id)
+            if manifest["status"] == "completed" and manifest.get("position"):
+                manifests.append(manifest)
+
+    def before_until(time: Optional[Timestamp]) -> bool:
+        return until is None or time is None or time <= until
+
+    bases = [m for m in manifests if m["type"] == "full" and before_until(position_time(m))]
+    if not bases:
+        raise ValueError("No full backup with a change stream position covers the requested time")
+    chain = [bases[-1]]
+    while True:
+        children = [
+            m for m in manifests
+            if m.get("parent_id") == chain[-1]["backup_id"] and before_until(decode_timestamp(m["start_time"]))
+        ]
+        if not children:
+            return chain
+        chain.append(children[-1])
+
+def iter_events(root: str, manifest: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+    """Decoded change events of an increment, one list per chunk"""
+    directory = os.path.join(root, manifest["backup_id"])
+    for chunk in manifest["events"]["chunks"]:
+        data = read_chunk(directory, manifest, chunk)
+        yield [bson.decode(document.raw) for document in iter_chunk_documents(data, "bson")]
@@ -0,0 +1,151 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+from src.config.settings import settings
+from src.db.explain import EXPLAINABLE_COMMANDS, command_filter, explain_command, filter_shape, summarize_explain
+from src.db.mongo import MongoManager
+
+# Queries that read a whole collection on purpose
+ALLOWED_COLLSCANS = {
+    "AdminUserModel.hash_cost_distribution",
+}
+
+class QueryRecorder(monitoring.CommandListener):
+    """Collects the explainable commands issued while a label is set"""
+
+    def __init__(self):
+        self.label: Optional[str] = None
+        self.commands: List[Tuple[str, str, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if self.label and event.command_name in EXPLAINABLE_COMMANDS:
+            with self._lock:
+                self.commands.append((self.label, event.command_name, event.database_name, dict(event.command)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def model_queries() -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Every query path of the master database models and routes, called with
+    values that match no document so write paths change nothing.
+    
+    OrganizationModel.backfill_search_fields is left out: it is a one-off
+    migration run by a script, not a request path.
+    """
+    from src.models.organization import OrganizationModel
+    from src.models.admin_user import AdminUserModel
+    from src.models.tenant_usage import TenantUsageModel
+    from src.utils.search import normalize_name, trigrams
+
+    missing_id = str(ObjectId())
+    missing_name = f"__index_check_{missing_id}"
+    missing_email = f"{missing_name}@example.invalid"
+    missing_prefix = normalize_name(missing_name)
+    missing_grams = trigrams(missing_prefix)
+    return [
+        ("OrganizationModel.find_by_name", lambda: OrganizationModel.find_by_name(missing_name)),
+        ("OrganizationModel.find_by_id", lambda: OrganizationModel.find_by_id(missing_id)),
+        ("OrganizationModel.find_by_email", lambda: OrganizationModel.find_by_email(missing_email)),
+        ("OrganizationModel.find_version_by_name", lambda: OrganizationModel.find_version_by_name(missing_name)),
+        ("OrganizationModel.find_version_by_id", lambda: OrganizationModel.find_version_by_id(missing_id)),
+        ("OrganizationModel.list_recent", lambda: OrganizationModel.list_recent(50)),
+        ("OrganizationModel.page_after", lambda: OrganizationModel.page_after(ObjectId(missing_id), 20)),
+        ("OrganizationModel.find_many_by_id", lambda: OrganizationModel.find_many("_id", [ObjectId(missing_id)])),
+        ("OrganizationModel.find_many_by_name", lambda: OrganizationModel.find_many("organization_name", [missing_name])),
+        ("OrganizationModel.find_by_name_prefix", lambda: OrganizationModel.find_by_name_prefix(missing_prefix, 20)),
+        ("OrganizationModel.trigram_frequency", lambda: OrganizationModel.trigram_frequency(missing_grams[0], 100)),
+        ("OrganizationModel.find_by_trigrams", lambda: OrganizationModel.find_by_trigrams(
+            missing_grams, len(missing_grams) // 2, 20, probe=missing_grams[:2], scan_limit=settings.search_trigram_scan_limit
+        )),
+        ("OrganizationModel.update", lambda: OrganizationModel.update(missing_name, {"updated_at": None})),
+        ("OrganizationModel.update_by_id", lambda: OrganizationModel.update_by_id(missing_id, {"updated_at": None})),
+        ("OrganizationModel.delete", lambda: OrganizationModel.delete(missing_name)),
+        ("OrganizationModel.delete_by_id", lambda: OrganizationModel.delete_by_id(missing_id)),
+        ("AdminUserModel.find_by_email", lambda: AdminUserModel.find_by_email(missing_email)),
+        ("AdminUserModel.find_credentials_by_email", lambda: AdminUserModel.find_credentials_by_email(missing_email)),
+        ("AdminUserModel.find_by_id", lambda: AdminUserModel.find_by_id(missing_id)),
+        ("AdminUserModel.update", lambda: AdminUserModel.update(missing_id, {"updated_at": None})),
+        ("AdminUserModel.replace_password_hash", lambda: AdminUserModel.replace_password_hash(missing_id, "x", "y")),
+        ("AdminUserModel.link_organization", lambda: AdminUserModel.link_organization(missing_id, missing_id)),
+        ("AdminUserModel.delete", lambda: AdminUserModel.delete(missing_id)),
+        ("AdminUserModel.hash_cost_distribution", AdminUserModel.hash_cost_distribution),
+        ("TenantUsageModel.summarize", lambda: TenantUsageModel.summarize(TenantUsageModel.since_hours(24), 50, "requests")),
+        ("TenantUsageModel.hourly", lambda: TenantUsageModel.hourly(missing_id, TenantUsageModel.since_hours(24))),
+        ("TenantUsageModel.find_storage", lambda: TenantUsageModel.find_storage(missing_id)),
+    ]
+
+@contextmanager
+def recording_client(recorder: QueryRecorder):
+    """Temporarily route the application's queries through a monitored client"""
+    from src.utils.cache import model_cache
+
+    client = MongoClient(os.getenv("MONGODB_URI", settings.mongodb_uri), event_listeners=[recorder])
+    saved_client, saved_backend = MongoManager._client, model_cache.backend
+    MongoManager._client = client
+    # Cache hits would hide the queries behind them
+    model_cache.backend = None
+    try:
+        yield client
+    finally:
+        MongoManager._client = saved_client
+        model_cache.backend = saved_backend
+        client.close()
+
+def verify_index_coverage(queries: Optional[List[Tuple[str, Callable[[], Any]]]] = None) -> Dict[str, Any]:
+    """
+    Run every model query, explain what it sent to MongoDB and report
+    collection scans, in-memory sorts and indexes no query uses.
+    """
+    recorder = QueryRecorder()
+    results = []
+    problems = []
+    used_indexes = set()
+
+    with recording_client(recorder) as client:
+        for label, run in queries or model_queries():
+            recorder.label = label
+            try:
+                run()
+            finally:
+                recorder.label = None
+
+        for label, command_name, database_name, command in recorder.commands:
+            collection = command.get(command_name)
+            summary = summarize_explain(client[database_name].command(explain_command(command_name, command)))
+            used_indexes.update((collection, index) for index in summary["indexes"])
+            results.append({
+                "query": label,
+                "collection": collection,
+                "command": command_name,
+                "filter_shape": filter_shape(command_filter(command_name, command)),
+                **summary
+            })
+            if summary["collscan"] and label not in ALLOWED_COLLSCANS:
+                problems.append(f"{label}: COLLSCAN on {collection}")
+            if summary["in_memory_sort"]:
+                problems.append(f"{label}: in-memory SORT on {collection}")
+
+        unused = []
+        master_db = client[settings.master_db_name]
+        for collection in sorted({result["collection"] for result in results}):
+            for name, spec in master_db[collection].index_information().items():
+                # Unique indexes enforce constraints even when never queried
+                if name == "_id_" or spec.get("unique") or (collection, name) in used_indexes:
+                    continue
+                unused.append(f"{collection}.{name}")
+                problems.append(f"Unused index {collection}.{name}")
+
+    return {
+        "queries": results,
+        "captured": len(recorder.commands),
+        "unused_indexes": unused,
+        "problems": problems
+    }
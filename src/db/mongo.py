@@ -3,6 +3,9 @@ from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 import logging
 from typing import Optional
+from src.config.settings import settings
+from src.db.slow_ops import slow_op_listener
+from src.db.command_tracing import tracing_command_listener
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +36,8 @@ class MongoManager:
                     mongodb_uri,
                     serverSelectionTimeoutMS=10000,  # 10 second timeout
                     connectTimeoutMS=10000,
-                    socketTimeoutMS=30000
+                    socketTimeoutMS=30000,
+                    event_listeners=cls.event_listeners()
                 )
                 
                 # Test the connection
@@ -50,6 +54,16 @@ class MongoManager:
             
         return cls._client
     
+    @staticmethod
+    def event_listeners() -> list:
+        """Command listeners enabled in settings"""
+        listeners = []
+        if settings.slow_op_enabled:
+            listeners.append(slow_op_listener)
+        if settings.tracing_enabled:
+            listeners.append(tracing_command_listener)
+        return listeners
+    
     @classmethod
     def get_db(cls):
         """Get database instance"""
@@ -57,6 +71,11 @@ class MongoManager:
             cls.get_client()  # Ensure client is initialized
         return cls._db
     
+    @classmethod
+    def get_master_db(cls):
+        """Get master database holding organization metadata and tenant collections"""
+        return cls.get_client()[settings.master_db_name]
+    
     @classmethod
     def close_connection(cls):
         """Close MongoDB connection"""
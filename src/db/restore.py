@@ -0,0 +1,367 @@
+import os
+import json
+import time
+import zlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import bson
+from bson import ObjectId, json_util
+from bson.raw_bson import RawBSONDocument
+from bson.timestamp import Timestamp
+from pymongo import DeleteOne, IndexModel, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from src.config.settings import settings
+from src.db.backup import backup_path, decode_id, iter_chunk_documents, list_backups, read_chunk
+from src.db.incremental_backup import backup_chain, chain_for_time, decode_timestamp, iter_events, load_manifest
+from src.utils.logger import logger
+
+# Change events that affect a whole collection or database; replay applies
+# every earlier event before them
+BARRIER_OPERATIONS = {"drop", "rename", "dropDatabase"}
+
+DUPLICATE_KEY_ERROR = 11000
+
+def timestamp_for(moment: datetime) -> Timestamp:
+    """Last cluster time within the second of `moment` (naive datetimes are UTC)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return Timestamp(int(moment.timestamp()), 2**32 - 1)
+
+def event_operations(event: Dict[str, Any]) -> List[Any]:
+    """Idempotent writes reproducing one document change event"""
+    key = event["key"]
+    if event["op"] in ("insert", "replace") or (event["op"] == "update" and "doc" in event):
+        return [ReplaceOne(key, event["doc"], upsert=True)]
+    if event["op"] == "delete":
+        return [DeleteOne(key)]
+    if event["op"] != "update":
+        return []
+
+    description = event.get("update", {})
+    operations = [
+        UpdateOne(key, {"$push": {truncated["field"]: {"$each": [], "$slice": truncated["newSize"]}}})
+        for truncated in description.get("truncatedArrays") or []
+    ]
+    update = {}
+    if description.get("updatedFields"):
+        update["$set"] = description["updatedFields"]
+    if description.get("removedFields"):
+        update["$unset"] = {field: "" for field in description["removedFields"]}
+    if update:
+        operations.append(UpdateOne(key, update))
+    return operations
+
+def index_models(specs: List[Dict[str, Any]]) -> List[IndexModel]:
+    """IndexModels for backed-up index specs (canonical extended JSON), without _id_"""
+    models = []
+    for index in specs:
+        spec = json_util.loads(json.dumps(index))
+        if spec["name"] == "_id_":
+            continue
+        key = list(spec.pop("key").items())
+        spec.pop("v", None)
+        spec.pop("ns", None)
+        models.append(IndexModel(key, **spec))
+    return models
+
+def batched(documents: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    iterator = iter(documents)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+class RestoreEngine:
+    """
+    Rebuilds a database from a backup chain.
+
+    The base backup's chunks are loaded in parallel with unordered inserts
+    (duplicates from an earlier, interrupted restore are skipped), then the
+    increments' change events are replayed. Within each events chunk the
+    events are partitioned by document, so each worker applies a
+    document's changes in their original order; drops and renames wait
+    for all earlier events. Indexes are built last, over the loaded data.
+    """
+
+    def __init__(self, db, root: Optional[str] = None, workers: Optional[int] = None, batch_size: int = 1000):
+        self.db = db
+        self.root = root or settings.backup_dir
+        self.workers = max(1, workers or settings.backup_workers)
+        self.batch_size = batch_size
+        self.stats = {"documents": 0, "events": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, value: int):
+        with self._lock:
+            self.stats[key] += value
+
+    def create_collections(self, manifest: Dict[str, Any]):
+        """Create missing collections with their backed-up options (capped, validators, ...)"""
+        existing = set(self.db.list_collection_names())
+        for name, entry in manifest["collections"].items():
+            if name not in existing:
+                self.db.create_collection(name, **json_util.loads(json.dumps(entry.get("options") or {})))
+
+    def load_base(self, manifest: Dict[str, Any]):
+        """Insert every chunk of a full backup, `workers` chunks at a time"""
+        directory = os.path.join(self.root, manifest["backup_id"])
+        self.create_collections(manifest)
+        tasks = [(name, chunk) for name, entry in manifest["collections"].items() for chunk in entry["chunks"]]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="restore") as pool:
+            for _ in pool.map(lambda task: self._load_chunk(directory, manifest, *task), tasks):
+                pass
+
+    def _load_chunk(self, directory: str, manifest: Dict[str, Any], name: str, chunk: Dict[str, Any]):
+        documents = iter_chunk_documents(read_chunk(directory, manifest, chunk), manifest["format"])
+        for batch in batched(documents, self.batch_size):
+            self._insert_batch(self.db[name], batch)
+
+    def _insert_batch(self, collection, documents: List[Any]) -> int:
+        """Unordered insert; documents already present from an interrupted run are skipped"""
+        try:
+            collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]):
+                raise
+        self._count("documents", len(documents))
+        return len(documents)
+
+    def replay(self, manifest: Dict[str, Any], until: Optional[Timestamp] = None) -> bool:
+        """
+        Apply an increment's events up to `until`.
+
+        Returns False when replay has to stop here: `until` was reached or
+        the stream was invalidated.
+        """
+        for events in iter_events(self.root, manifest):
+            segment = []
+            for event in events:
+                if (until is not None and event["ts"] > until) or event["op"] == "invalidate":
+                    self._apply_segment(segment)
+                    return False
+                if event["op"] in BARRIER_OPERATIONS:
+                    self._apply_segment(segment)
+                    self._apply_barrier(event)
+                    segment = []
+                else:
+                    segment.append(event)
+            self._apply_segment(segment)
+        return True
+
+    def _apply_segment(self, events: List[Dict[str, Any]]):
+        partitions = [[] for _ in range(self.workers)]
+        for event in events:
+            if "key" in event:
+                partition = zlib.crc32(event["coll"].encode() + bson.encode(event["key"])) % self.workers
+                partitions[partition].append(event)
+        partitions = [partition for partition in partitions if partition]
+        if len(partitions) == 1:
+            self._apply_partition(partitions[0])
+        elif partitions:
+            with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix="replay") as pool:
+                for _ in pool.map(self._apply_partition, partitions):
+                    pass
+
+    def _apply_partition(self, events: List[Dict[str, Any]]):
+        """Ordered bulk writes, one per run of events on the same collection"""
+        collection, operations = None, []
+        for event in events:
+            if event["coll"] != collection and operations:
+                self.db[collection].bulk_write(operations, ordered=True)
+                operations = []
+            collection = event["coll"]
+            operations.extend(event_operations(event))
+        if operations:
+            self.db[collection].bulk_write(operations, ordered=True)
+        self._count("events", len(events))
+
+    def _apply_barrier(self, event: Dict[str, Any]):
+        if event["op"] == "drop":
+            self.db.drop_collection(event["coll"])
+        elif event["op"] == "rename":
+            self.db[event["coll"]].rename(event["to"], dropTarget=True)
+        elif event["op"] == "dropDatabase":
+            for name in self.db.list_collection_names():
+                self.db.drop_collection(name)
+        self._count("events", 1)
+
+    def rebuild_indexes(self, indexes: Dict[str, List[Dict[str, Any]]]):
+        """Create the backed-up indexes of every collection that still exists"""
+        existing = set(self.db.list_collection_names())
+        for name, specs in indexes.items():
+            if name not in existing:
+                continue
+            models = index_models(specs)
+            if models:
+                self.db[name].create_indexes(models)
+
+    def restore(self, until: Optional[datetime] = None, backup_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rebuild the database as of `until` (default: the newest backup).
+
+        `backup_id` restores the chain ending at that backup instead of
+        choosing one by time.
+        """
+        started = time.monotonic()
+        target = timestamp_for(until) if until else None
+        chain = backup_chain(self.root, backup_id) if backup_id else chain_for_time(self.root, target)
+        base, increments = chain[0], chain[1:]
+        logger.info(f"Restoring {base['backup_id']} with {len(increments)} increments into {self.db.name}")
+
+        self.load_base(base)
+        indexes = {name: entry["indexes"] for name, entry in base["collections"].items()}
+        replayed = []
+        for manifest in increments:
+            replayed.append(manifest["backup_id"])
+            indexes.update(manifest.get("indexes", {}))
+            if not self.replay(manifest, target):
+                break
+        else:
+            end_time = decode_timestamp(increments[-1]["end_time"]) if increments else None
+            if target is not None and end_time is not None and end_time < target:
+                logger.warning(f"Backups end at {end_time.as_datetime().isoformat()}, before the requested time")
+        self.rebuild_indexes(indexes)
+
+        elapsed = time.monotonic() - started
+        return {
+            "base_id": base["backup_id"],
+            "increments": replayed,
+            "documents": self.stats["documents"],
+            "events": self.stats["events"],
+            "seconds": round(elapsed, 3)
+        }
+
+    def find_document(self, manifest: Dict[str, Any], name: str, document_id: Any) -> Optional[Dict[str, Any]]:
+        """A document of a backed-up collection by _id, reading only the chunk whose range holds it"""
+        entry = manifest["collections"].get(name)
+        if entry is None:
+            return None
+        directory = os.path.join(self.root, manifest["backup_id"])
+        for chunk in entry["chunks"]:
+            first_id, last_id = decode_id(chunk["first_id"]), decode_id(chunk["last_id"])
+            if type(first_id) is type(document_id) is type(last_id) and not first_id <= document_id <= last_id:
+                continue
+            for document in iter_chunk_documents(read_chunk(directory, manifest, chunk), manifest["format"]):
+                if document["_id"] == document_id:
+                    return bson.decode(document.raw) if isinstance(document, RawBSONDocument) else document
+        return None
+
+    def find_tenant_backup(self, organization_id: str, backup_id: Optional[str] = None) -> Dict[str, Any]:
+        """The given backup, or the newest full or tenant backup holding the organization"""
+        candidates = [backup_id] if backup_id else [
+            backup["backup_id"] for backup in list_backups(self.root)
+            if backup["status"] == "completed" and backup["type"] in ("full", "tenant")
+        ]
+        for candidate in candidates:
+            if not os.path.exists(os.path.join(backup_path(self.root, candidate), "manifest.json")):
+                raise ValueError(f"Backup '{candidate}' not found")
+            manifest = load_manifest(self.root, candidate)
+            if manifest["type"] == "tenant" and manifest["tenant"]["organization_id"] != organization_id:
+                continue
+            if self.find_document(manifest, "organizations", ObjectId(organization_id)) is not None:
+                return manifest
+        raise ValueError(f"No backup contains organization '{organization_id}'")
+
+    def restore_tenant(
+        self,
+        organization_id: str,
+        backup_id: Optional[str] = None,
+        replace: bool = False,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Recreate one organization in the live database from a backup.
+
+        The tenant collection is streamed into a staging collection in
+        unordered batches, `workers` batches in flight, and indexed once
+        loaded. Only then is it renamed into place and the registry entry
+        and admin user written, so the organization reappears complete.
+        `progress` is called with the phase and document counts.
+        """
+        if not ObjectId.is_valid(organization_id):
+            raise ValueError(f"Invalid organization id '{organization_id}'")
+        started = time.monotonic()
+        manifest = self.find_tenant_backup(organization_id, backup_id)
+        organization = self.find_document(manifest, "organizations", ObjectId(organization_id))
+        admin = self.find_document(manifest, "admin_users", ObjectId(organization["admin_user_id"]))
+        collection_name = organization["collection_name"]
+        entry = manifest["collections"].get(collection_name)
+        if entry is None or admin is None:
+            raise ValueError(f"Backup {manifest['backup_id']} is missing data of organization '{organization_id}'")
+
+        live = self.db.organizations.find_one({"_id": organization["_id"]})
+        if live and not replace:
+            raise ValueError(f"Organization '{organization_id}' exists; restore with replace to overwrite it")
+        if self.db.organizations.find_one({"organization_name": organization["organization_name"], "_id": {"$ne": organization["_id"]}}):
+            raise ValueError(f"Another organization is named '{organization['organization_name']}'")
+        if self.db.admin_users.find_one({"email": admin["email"], "_id": {"$ne": admin["_id"]}}):
+            raise ValueError(f"Another admin user has the email '{admin['email']}'")
+
+        state = {
+            "backup_id": manifest["backup_id"],
+            "organization_id": organization_id,
+            "phase": "loading",
+            "documents": 0,
+            "total_documents": entry["documents"]
+        }
+        last_report = [0.0]
+
+        def report(force: bool = False):
+            if progress and (force or time.monotonic() - last_report[0] >= 1.0):
+                last_report[0] = time.monotonic()
+                progress(dict(state))
+
+        report(force=True)
+        staging = self.db[f"{collection_name}_restoring"]
+        staging.drop()
+        self.db.create_collection(staging.name, **json_util.loads(json.dumps(entry.get("options") or {})))
+        directory = os.path.join(self.root, manifest["backup_id"])
+        in_flight = set()
+
+        def collect(futures):
+            for future in futures:
+                state["documents"] += future.result()
+            report()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="restore") as pool:
+            for chunk in entry["chunks"]:
+                documents = iter_chunk_documents(read_chunk(directory, manifest, chunk), manifest["format"])
+                for batch in batched(documents, self.batch_size):
+                    if len(in_flight) >= self.workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    in_flight.add(pool.submit(self._insert_batch, staging, batch))
+            collect(wait(in_flight).done)
+
+        state["phase"] = "indexes"
+        report(force=True)
+        models = index_models(entry["indexes"])
+        if models:
+            staging.create_indexes(models)
+
+        state["phase"] = "metadata"
+        report(force=True)
+        staging.rename(collection_name, dropTarget=True)
+        if live and live.get("collection_name") not in (None, collection_name):
+            self.db.drop_collection(live["collection_name"])
+        if live and live.get("admin_user_id") != organization["admin_user_id"]:
+            self.db.admin_users.delete_one({"_id": ObjectId(live["admin_user_id"])})
+        self.db.admin_users.replace_one({"_id": admin["_id"]}, admin, upsert=True)
+        self.db.organizations.replace_one({"_id": organization["_id"]}, organization, upsert=True)
+
+        state["phase"] = "completed"
+        state["seconds"] = round(time.monotonic() - started, 3)
+        report(force=True)
+        logger.info(
+            f"✅ Restored organization '{organization['organization_name']}' from {manifest['backup_id']}: "
+            f"{state['documents']} documents in {state['seconds']}s"
+        )
+        return {
+            **state,
+            "organization_name": organization["organization_name"],
+            "collection_name": collection_name,
+            "admin_user_id": organization["admin_user_id"],
+            "admin_email": admin["email"],
+            "replaced": bool(live)
+        }
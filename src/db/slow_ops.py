@@ -0,0 +1,145 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from pymongo import monitoring
+from src.config.settings import settings
+from src.db.explain import command_filter, explain_command, filter_shape, summarize_explain
+from src.utils.logger import logger
+
+# Handshakes and monitoring, never interesting and issued constantly
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "explain", "endSessions", "saslStart", "saslContinue"}
+
+class SlowOperationListener(monitoring.CommandListener):
+    """
+    Records MongoDB commands slower than a threshold in a ring buffer.
+
+    Explain plans are captured in a background thread with the
+    queryPlanner verbosity, which plans the query without running it. Each
+    query shape is explained at most once per `explain_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        explainer: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+        explain_ttl: float = 300.0,
+        max_pending_explains: int = 20
+    ):
+        self.threshold_ms = settings.slow_op_threshold_ms if threshold_ms is None else threshold_ms
+        self.operations: Deque[Dict[str, Any]] = deque(
+            maxlen=settings.slow_op_buffer_size if buffer_size is None else buffer_size
+        )
+        self.explainer = explainer
+        self.explain_ttl = explain_ttl
+        self.max_pending_explains = max_pending_explains
+        self._started: Dict[Tuple[Any, int], Tuple[str, str, Dict[str, Any]]] = {}
+        self._explained: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._pending_explains = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-op-explain")
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            # Bound memory if events are ever lost (e.g. a dropped connection)
+            if len(self._started) > 10_000:
+                self._started.clear()
+            self._started[(event.connection_id, event.request_id)] = (
+                event.command_name, event.database_name, event.command
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finished(event, None)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finished(event, event.failure.get("errmsg", "failed"))
+
+    def _finished(self, event, error: Optional[str]):
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        command_name, database_name, command = started
+        collection = command.get(command_name)
+        record = {
+            "timestamp": datetime.utcnow(),
+            "command": command_name,
+            "database": database_name,
+            "collection": collection if isinstance(collection, str) else None,
+            "filter_shape": filter_shape(command_filter(command_name, command)),
+            "duration_ms": round(duration_ms, 2),
+            "error": error,
+            "explain": None,
+        }
+        with self._lock:
+            self.operations.append(record)
+        logger.warning(
+            f"Slow MongoDB {command_name} on {database_name}.{record['collection']}: {record['duration_ms']} ms"
+        )
+        self._schedule_explain(record, command_name, database_name, command)
+
+    def _schedule_explain(self, record: Dict[str, Any], command_name: str, database_name: str, command: Dict[str, Any]):
+        if self.explainer is None:
+            return
+        explain = explain_command(command_name, command)
+        if explain is None:
+            return
+
+        shape_key = (f"{database_name}.{record['collection']}", repr(record["filter_shape"]))
+        with self._lock:
+            cached = self._explained.get(shape_key)
+            if cached and time.monotonic() - cached[0] < self.explain_ttl:
+                record["explain"] = cached[1]
+                return
+            if self._pending_explains >= self.max_pending_explains:
+                record["explain"] = {"skipped": "explain queue full"}
+                return
+            self._pending_explains += 1
+
+        self._executor.submit(self._run_explain, record, shape_key, database_name, explain)
+
+    def _run_explain(self, record: Dict[str, Any], shape_key: Tuple[str, str], database_name: str, explain: Dict[str, Any]):
+        try:
+            summary = summarize_explain(self.explainer(database_name, explain))
+        except Exception as e:
+            summary = {"error": str(e)}
+        finally:
+            with self._lock:
+                self._pending_explains -= 1
+        with self._lock:
+            record["explain"] = summary
+            if "error" not in summary:
+                self._explained[shape_key] = (time.monotonic(), summary)
+
+    def wait_for_explains(self, timeout: float = 5.0):
+        """Block until explains queued so far have completed"""
+        self._executor.submit(lambda: None).result(timeout)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded operations, newest first"""
+        with self._lock:
+            operations = [dict(record) for record in reversed(self.operations)]
+        return operations[:limit] if limit else operations
+
+    def clear(self):
+        with self._lock:
+            self.operations.clear()
+            self._explained.clear()
+
+def explain_with_manager(database_name: str, explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Run an explain command through the application's client"""
+    from src.db.mongo import mongo_manager
+    return mongo_manager.get_client()[database_name].command(explain)
+
+slow_op_listener = SlowOperationListener(
+    explainer=explain_with_manager if settings.slow_op_explain else None
+)
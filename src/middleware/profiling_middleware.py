@@ -0,0 +1,53 @@
+import sys
+import asyncio
+import logging
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.utils.profiler import PROFILE_HEADER, request_profiler
+
+logger = logging.getLogger(__name__)
+
+class ProfilingMiddleware:
+    """
+    Profiles selected requests on demand.
+
+    Requests carrying a valid signed X-Profile header, or picked by the
+    sample rate, are profiled; the response carries an X-Profile-Id header
+    naming the profile to fetch from /internal/profiles. Everything else
+    pays for one header lookup and one random draw.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = request_profiler.trigger(Headers(scope=scope).get(PROFILE_HEADER))
+        profile = request_profiler.begin(sys._getframe()) if trigger else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = request_profiler.new_profile_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["x-profile-id"] = profile_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profiler.finish(profile)
+            name = f"{scope['method']} {scope['path']} {status_code} ({trigger})"
+            try:
+                await asyncio.to_thread(request_profiler.save, profile_id, profile, name)
+                logger.info(f"Saved profile {profile_id} for {name}, {profile.duration_ms:.1f}ms")
+            except Exception as e:
+                logger.error(f"Failed to save profile {profile_id}: {str(e)}")
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from src.config.settings import settings
+from src.utils.jwt import verify_token
+from src.utils.rate_limiter import RateLimit, RateLimitResult, RateLimitStore, create_rate_limit_store
+
+logger = logging.getLogger(__name__)
+
+# Route prefix -> limit and the identities it is keyed by. The longest
+# matching prefix wins. "organization" and "admin" come from the bearer
+# token; requests without a valid token fall back to the client IP.
+DEFAULT_RATE_LIMIT_RULES: Dict[str, Dict[str, Any]] = {
+    # Each login costs a bcrypt verification shared by all tenants
+    "/admin/login": {"rate": 0.5, "burst": 10, "scopes": ["ip"]},
+    # Creating an organization hashes a password as well
+    "/org/create": {"rate": 0.2, "burst": 5, "scopes": ["ip"]},
+    "/org": {"rate": 20, "burst": 40, "scopes": ["organization", "admin"]},
+    "/jobs": {"rate": 10, "burst": 20, "scopes": ["admin"]},
+}
+
+class RateLimitRule:
+    """Rate limit applied to every path under a prefix"""
+
+    def __init__(self, prefix: str, rate: float, burst: int, scopes: List[str]):
+        unknown = set(scopes) - {"ip", "organization", "admin"}
+        if unknown:
+            raise ValueError(f"Unknown rate limit scopes for '{prefix}': {sorted(unknown)}")
+        self.prefix = prefix
+        self.limit = RateLimit(rate, burst)
+        self.scopes = scopes
+
+def load_rate_limit_rules(overrides: Optional[str] = None) -> List[RateLimitRule]:
+    """Build rules from defaults plus the RATE_LIMIT_RULES JSON overrides"""
+    rules = dict(DEFAULT_RATE_LIMIT_RULES)
+    overrides = settings.rate_limit_rules if overrides is None else overrides
+    if overrides:
+        for prefix, rule in json.loads(overrides).items():
+            if rule is None:
+                # null disables the default rule for this prefix
+                rules.pop(prefix, None)
+            else:
+                rules[prefix] = {**rules.get(prefix, {}), **rule}
+
+    # Longest prefix first so the most specific rule matches
+    return sorted(
+        (RateLimitRule(prefix, rule["rate"], rule["burst"], rule.get("scopes", ["ip"]))
+         for prefix, rule in rules.items()),
+        key=lambda rule: len(rule.prefix),
+        reverse=True
+    )
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(
+        self,
+        app,
+        rules: Optional[List[RateLimitRule]] = None,
+        store: Optional[RateLimitStore] = None
+    ):
+        super().__init__(app)
+        self.rules = rules if rules is not None else load_rate_limit_rules()
+        self.store = store or create_rate_limit_store()
+
+    def match_rule(self, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if path == rule.prefix or path.startswith(rule.prefix.rstrip("/") + "/"):
+                return rule
+        return None
+
+    async def dispatch(self, request: Request, call_next):
+        rule = None if request.method == "OPTIONS" else self.match_rule(request.url.path)
+        if rule is None:
+            return await call_next(request)
+
+        # Every identity must have tokens left, and none is charged for a
+        # rejected request; report the tightest bucket
+        keys = self.bucket_keys(request, rule)
+        if self.store.blocking:
+            results = await asyncio.to_thread(self.store.consume_all, keys, rule.limit)
+        else:
+            results = self.store.consume_all(keys, rule.limit)
+        denied = [(key, result) for key, result in zip(keys, results) if not result.allowed]
+        if denied:
+            key, result = max(denied, key=lambda item: item[1].retry_after)
+            logger.warning(f"Rate limit exceeded: {key} on {request.method} {request.url.path}")
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded, retry later"},
+                headers={
+                    "Retry-After": result.retry_after_header,
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0",
+                }
+            )
+        tightest: RateLimitResult = min(results, key=lambda result: result.remaining)
+
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(tightest.limit)
+        response.headers["X-RateLimit-Remaining"] = str(int(tightest.remaining))
+        return response
+
+    def bucket_keys(self, request: Request, rule: RateLimitRule) -> List[str]:
+        claims = None
+        if "organization" in rule.scopes or "admin" in rule.scopes:
+            claims = self.token_claims(request)
+
+        keys = []
+        for scope in rule.scopes:
+            identity = self.identity(request, scope, claims)
+            keys.append(f"{rule.prefix}:{identity[0]}:{identity[1]}")
+        # de-duplicate fallbacks to the client IP
+        return list(dict.fromkeys(keys))
+
+    def identity(self, request: Request, scope: str, claims: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        if scope == "organization" and claims and claims.get("org_id"):
+            return "org", claims["org_id"]
+        if scope == "admin" and claims and claims.get("sub"):
+            return "admin", claims["sub"]
+        return "ip", self.client_ip(request)
+
+    @staticmethod
+    def token_claims(request: Request) -> Optional[Dict[str, Any]]:
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return verify_token(token)
+
+    @staticmethod
+    def client_ip(request: Request) -> str:
+        """
+        Client address, from X-Forwarded-For when running behind proxies.
+
+        Each proxy appends the address it received the request from, so
+        only the last RATE_LIMIT_TRUSTED_PROXY_HOPS entries were written by
+        our own infrastructure. Entries further left come from the client
+        and are ignored, otherwise a fresh fake address per request would
+        get a fresh bucket.
+        """
+        if settings.rate_limit_trust_forwarded_for:
+            forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",")]
+            forwarded = [entry for entry in forwarded if entry]
+            hops = max(1, settings.rate_limit_trusted_proxy_hops)
+            if len(forwarded) >= hops:
+                return forwarded[-hops]
+        return request.client.host if request.client else "unknown"
@@ -0,0 +1,46 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.utils.tracing import SPAN_KIND_SERVER, STATUS_ERROR, tracer
+
+class TracingMiddleware:
+    """
+    Server span per HTTP request.
+
+    Continues the caller's trace from an incoming W3C traceparent header and
+    returns the request's own traceparent so clients can look the trace up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        with tracer.span(
+            f"{scope['method']} {scope['path']}",
+            SPAN_KIND_SERVER,
+            {"http.method": scope["method"], "http.target": scope["path"]},
+            traceparent=headers.get("traceparent")
+        ) as span:
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status_code = STATUS_ERROR
+                    response_headers = MutableHeaders(scope=message)
+                    response_headers["traceparent"] = span.traceparent()
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # FastAPI stores the matched route in the scope; name the
+                # span after its template so spans group by endpoint
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -0,0 +1,40 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.services.usage_service import usage_recorder
+
+class UsageMiddleware:
+    """
+    Attributes request counts and latency to the caller's organization.
+
+    get_current_admin leaves the authenticated tenant in the request state;
+    requests without one (login, health checks) are not counted.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            tenant = scope.get("state", {}).get("tenant")
+            if tenant is not None:
+                usage_recorder.record(
+                    tenant["organization_id"],
+                    tenant["organization_name"],
+                    (time.perf_counter() - start) * 1000,
+                    status_code
+                )
@@ -1,9 +1,15 @@
 from datetime import datetime
 from bson import ObjectId
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from src.db.mongo import mongo_manager
+from src.utils.cache import model_cache
+from src.utils.single_flight import single_flight
 from typing import List, Dict, Any, Optional
 
+# Never cached: with CACHE_BACKEND=redis the cache is readable outside the
+# service, so cached admin documents leave their password hash behind
+CACHED_PROJECTION = {"hashed_password": 0}
+
 class AdminUserBase(BaseModel):
     email: EmailStr
     password: str
@@ -21,19 +27,13 @@ class AdminUserInDB(BaseModel):
     updated_at: datetime
     is_active: bool = True
     
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class AdminUserResponse(BaseModel):
     id: str
     email: EmailStr
     organization_id: str
     created_at: datetime
-    
-    class Config:
-        json_encoders = {ObjectId: str}
 
 class AdminUserLogin(BaseModel):
     email: EmailStr
@@ -62,29 +62,113 @@ class AdminUserModel:
         """Create necessary indexes"""
         collection = AdminUserModel.get_collection()
         collection.create_index("email", unique=True)
-        collection.create_index("organization_id")
+        # Admins are only ever looked up by email or id; drop the
+        # organization_id index older versions created
+        if "organization_id_1" in collection.index_information():
+            collection.drop_index("organization_id_1")
+    
+    @staticmethod
+    def cache_key(field: str, value) -> str:
+        return model_cache.key("admin", field, value)
+    
+    @staticmethod
+    def invalidate_cache(user_id=None, email: str = None):
+        """Drop cached entries after a write; emails may hold negative entries"""
+        keys = []
+        if user_id is not None:
+            keys.append(AdminUserModel.cache_key("id", user_id))
+        if email is not None:
+            keys.append(AdminUserModel.cache_key("email", email))
+        model_cache.invalidate(*keys)
     
     @staticmethod
     def find_by_email(email: str):
-        return AdminUserModel.get_collection().find_one({"email": email})
+        """Admin by email, without credentials"""
+        return model_cache.get_or_load_aliased(
+            AdminUserModel.cache_key("email", email),
+            lambda user_id: AdminUserModel.cache_key("id", user_id),
+            lambda: single_flight.do(
+                "admin_users.find_by_email", email,
+                lambda: AdminUserModel.get_collection().find_one({"email": email}, CACHED_PROJECTION)
+            ),
+            AdminUserModel._find_by_id_uncached,
+            lambda user: user["email"] == email
+        )
+    
+    @staticmethod
+    def find_credentials_by_email(email: str):
+        """Admin by email including the password hash, always from MongoDB"""
+        return single_flight.do(
+            "admin_users.find_credentials_by_email", email,
+            lambda: AdminUserModel.get_collection().find_one({"email": email})
+        )
     
     @staticmethod
     def find_by_id(user_id: str):
-        return AdminUserModel.get_collection().find_one({"_id": ObjectId(user_id)})
+        """Admin by id, without credentials"""
+        return model_cache.get_or_load(
+            AdminUserModel.cache_key("id", user_id),
+            lambda: AdminUserModel._find_by_id_uncached(user_id)
+        )
+    
+    @staticmethod
+    def _find_by_id_uncached(user_id: str):
+        return AdminUserModel.get_collection().find_one({"_id": ObjectId(user_id)}, CACHED_PROJECTION)
     
     @staticmethod
     def create(user_data: dict):
-        return AdminUserModel.get_collection().insert_one(user_data)
+        result = AdminUserModel.get_collection().insert_one(user_data)
+        AdminUserModel.invalidate_cache(result.inserted_id, user_data.get("email"))
+        return result
     
     @staticmethod
     def update(user_id: str, update_data: dict):
-        return AdminUserModel.get_collection().update_one(
+        result = AdminUserModel.get_collection().update_one(
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        AdminUserModel.invalidate_cache(user_id, update_data.get("email"))
+        return result
+    
+    @staticmethod
+    def replace_password_hash(user_id: str, old_hash: str, new_hash: str):
+        """Swap the hash only if the password was not changed in the meantime"""
+        result = AdminUserModel.get_collection().update_one(
+            {"_id": ObjectId(user_id), "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}}
+        )
+        AdminUserModel.invalidate_cache(user_id)
+        return result
+    
+    @staticmethod
+    def hash_cost_distribution() -> Dict[str, int]:
+        """Count stored password hashes per bcrypt cost factor"""
+        pipeline = [
+            {"$group": {
+                "_id": {"$substrBytes": ["$hashed_password", 4, 2]},
+                "count": {"$sum": 1}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        return {
+            row["_id"]: row["count"]
+            for row in AdminUserModel.get_collection().aggregate(pipeline)
+        }
+    
+    @staticmethod
+    def link_organization(user_id: str, organization_id: str):
+        """Reference the organization by id instead of by display name"""
+        result = AdminUserModel.get_collection().update_one(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"organization_id": organization_id}, "$unset": {"organization_name": ""}}
+        )
+        AdminUserModel.invalidate_cache(user_id)
+        return result
     
     @staticmethod
     def delete(user_id: str):
-        return AdminUserModel.get_collection().delete_one(
+        result = AdminUserModel.get_collection().delete_one(
             {"_id": ObjectId(user_id)}
-        )
\ No newline at end of file
+        )
+        AdminUserModel.invalidate_cache(user_id)
+        return result
\ No newline at end of file
@@ -0,0 +1,114 @@
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from src.db.mongo import mongo_manager
+
+AUDIT_PARTITION_PREFIX = "audit_log_"
+_PARTITION_PATTERN = re.compile(rf"^{AUDIT_PARTITION_PREFIX}\d{{6}}$")
+
+class AuditLogModel:
+    """
+    Organization lifecycle events, one collection per calendar month.
+
+    Events land in audit_log_<YYYYMM> by their own timestamp. Every
+    partition is indexed on (organization_id, at, _id) for the newest-first
+    per-organization query; expiring a month is dropping its collection,
+    which costs nothing compared with deleting millions of documents.
+    """
+
+    # Partitions this process already created indexes on
+    _indexed = set()
+    _indexed_lock = threading.Lock()
+
+    @staticmethod
+    def partition_name(moment: datetime) -> str:
+        return f"{AUDIT_PARTITION_PREFIX}{moment:%Y%m}"
+
+    @staticmethod
+    def partitions() -> List[str]:
+        """Existing partitions, newest first"""
+        names = mongo_manager.get_master_db().list_collection_names()
+        return sorted((name for name in names if _PARTITION_PATTERN.match(name)), reverse=True)
+
+    @staticmethod
+    def ensure_indexes(name: str):
+        """Create the partition's indexes once per process"""
+        with AuditLogModel._indexed_lock:
+            if name in AuditLogModel._indexed:
+                return
+        mongo_manager.get_master_db()[name].create_index(
+            [("organization_id", ASCENDING), ("at", DESCENDING), ("_id", DESCENDING)]
+        )
+        with AuditLogModel._indexed_lock:
+            AuditLogModel._indexed.add(name)
+
+    @staticmethod
+    def insert_batch(events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Write events to their partitions with one insert_many each.
+
+        Events carry their _id, so retrying a batch that was partly
+        written skips the duplicates instead of writing them twice.
+        Returns the partitions written.
+        """
+        by_partition: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_partition.setdefault(AuditLogModel.partition_name(event["at"]), []).append(event)
+
+        master_db = mongo_manager.get_master_db()
+        for name, batch in by_partition.items():
+            AuditLogModel.ensure_indexes(name)
+            try:
+                master_db[name].insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+        return list(by_partition)
+
+    @staticmethod
+    def page(
+        organization_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, ObjectId]] = None,
+        events: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest events of an organization, older than `before` (at, _id) when given.
+
+        Walks the partitions newest first and stops as soon as `limit`
+        events are found, so a page usually reads one collection.
+        """
+        query: Dict[str, Any] = {"organization_id": organization_id}
+        if events:
+            query["event"] = {"$in": events}
+        if before:
+            at, event_id = before
+            query["$or"] = [{"at": {"$lt": at}}, {"at": at, "_id": {"$lt": event_id}}]
+
+        master_db = mongo_manager.get_master_db()
+        results: List[Dict[str, Any]] = []
+        for name in AuditLogModel.partitions():
+            if before and name > AuditLogModel.partition_name(before[0]):
+                continue
+            results += master_db[name].find(query).sort(
+                [("at", DESCENDING), ("_id", DESCENDING)]
+            ).limit(limit - len(results))
+            if len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def drop_partitions_before(moment: datetime) -> List[str]:
+        """Drop the partitions of months before `moment`'s month"""
+        oldest_kept = AuditLogModel.partition_name(moment)
+        dropped = [name for name in AuditLogModel.partitions() if name < oldest_kept]
+        master_db = mongo_manager.get_master_db()
+        for name in dropped:
+            master_db[name].drop()
+            with AuditLogModel._indexed_lock:
+                AuditLogModel._indexed.discard(name)
+        return dropped
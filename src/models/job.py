@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from bson import ObjectId
+from pymongo import ReturnDocument, ASCENDING, DESCENDING
+from src.db.mongo import mongo_manager
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+
+class JobModel:
+    """Background job model for database operations"""
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_master_db().jobs
+
+    @staticmethod
+    def create_indexes():
+        """Create necessary indexes"""
+        collection = JobModel.get_collection()
+        collection.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+        collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        collection.create_index([("organization_id", ASCENDING), ("created_at", DESCENDING)])
+
+    @staticmethod
+    def create(job_data: dict):
+        return JobModel.get_collection().insert_one(job_data)
+
+    @staticmethod
+    def find_by_id(job_id: str):
+        if not ObjectId.is_valid(job_id):
+            return None
+        return JobModel.get_collection().find_one({"_id": ObjectId(job_id)})
+
+    @staticmethod
+    def claim_next(worker_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the next runnable job.
+
+        A job is runnable when it is queued and due, or when it is running
+        but its lease expired (the worker holding it died or stalled) and
+        it has attempts left; see fail_abandoned for the others.
+        """
+        now = datetime.utcnow()
+        return JobModel.get_collection().find_one_and_update(
+            {"$or": [
+                {"status": JOB_STATUS_QUEUED, "run_at": {"$lte": now}},
+                {
+                    "status": JOB_STATUS_RUNNING,
+                    "lease_expires_at": {"$lte": now},
+                    "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+                }
+            ]},
+            {
+                "$set": {
+                    "status": JOB_STATUS_RUNNING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "started_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def fail_abandoned() -> int:
+        """
+        Fail running jobs whose lease expired on their last attempt.
+
+        A handler that kills or hangs its worker never raises, so these
+        would otherwise stay running forever. Returns how many were failed.
+        """
+        now = datetime.utcnow()
+        result = JobModel.get_collection().update_many(
+            {
+                "status": JOB_STATUS_RUNNING,
+                "lease_expires_at": {"$lte": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+            },
+            {"$set": {
+                "status": JOB_STATUS_FAILED,
+                "error": "Lease expired on the last attempt; the worker died or hung",
+                "lease_expires_at": None,
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def renew_lease(job_id: ObjectId, worker_id: str, lease_seconds: int) -> bool:
+        now = datetime.utcnow()
+        result = JobModel.get_collection().update_one(
+            {"_id": job_id, "status": JOB_STATUS_RUNNING, "worker_id": worker_id},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count == 1
+
+    @staticmethod
+    def mark_succeeded(job_id: ObjectId, worker_id: str, result: Optional[Dict[str, Any]]):
+        now = datetime.utcnow()
+        return JobModel.get_collection().update_one(
+            {"_id": job_id, "worker_id": worker_id},
+            {"$set": {
+                "status": JOB_STATUS_SUCCEEDED,
+                "result": result,
+                "error": None,
+                "lease_expires_at": None,
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+
+    @staticmethod
+    def mark_retry(job_id: ObjectId, worker_id: str, error: str, run_at: datetime):
+        return JobModel.get_collection().update_one(
+            {"_id": job_id, "worker_id": worker_id},
+            {"$set": {
+                "status": JOB_STATUS_QUEUED,
+                "error": error,
+                "run_at": run_at,
+                "lease_expires_at": None,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def mark_failed(job_id: ObjectId, worker_id: str, error: str):
+        now = datetime.utcnow()
+        return JobModel.get_collection().update_one(
+            {"_id": job_id, "worker_id": worker_id},
+            {"$set": {
+                "status": JOB_STATUS_FAILED,
+                "error": error,
+                "lease_expires_at": None,
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+
+    @staticmethod
+    def update_progress(job_id: str, progress: Dict[str, Any]):
+        return JobModel.get_collection().update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"progress": progress, "updated_at": datetime.utcnow()}}
+        )
@@ -1,8 +1,16 @@
+import re
 from datetime import datetime
 from typing import Optional
 from bson import ObjectId
-from pydantic import BaseModel, Field, EmailStr
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from src.db.mongo import mongo_manager
+from src.utils.cache import model_cache
+from src.utils.single_flight import single_flight
+from src.utils.search import search_fields
+
+# Fields that version an organization document; enough to build its ETag
+VERSION_PROJECTION = {"updated_at": 1}
 
 class OrganizationBase(BaseModel):
     organization_name: str = Field(..., min_length=1, max_length=100)
@@ -20,10 +28,7 @@ class OrganizationInDB(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class OrganizationResponse(BaseModel):
     id: str
@@ -31,9 +36,6 @@ class OrganizationResponse(BaseModel):
     collection_name: str
     admin_email: str
     created_at: datetime
-    
-    class Config:
-        json_encoders = {ObjectId: str}
 
 class OrganizationUpdate(BaseModel):
     new_organization_name: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -54,32 +56,224 @@ class OrganizationModel:
         collection.create_index("organization_name", unique=True)
         collection.create_index("admin_email", unique=True)
         collection.create_index("collection_name", unique=True)
+        # /org/list returns the newest organizations first
+        collection.create_index([("created_at", DESCENDING)])
+        # /org/search: anchored prefix scans and trigram lookups (multikey)
+        collection.create_index([("search_name", ASCENDING)])
+        collection.create_index([("name_trigrams", ASCENDING)])
+    
+    @staticmethod
+    def cache_key(field: str, value) -> str:
+        return model_cache.key("org", field, value)
+    
+    @staticmethod
+    def invalidate_cache(organization_id=None, organization_name: str = None, admin_email: str = None):
+        """Drop cached entries after a write; names and emails may hold negative entries"""
+        keys = []
+        if organization_id is not None:
+            keys.append(OrganizationModel.cache_key("id", organization_id))
+        if organization_name is not None:
+            keys.append(OrganizationModel.cache_key("name", organization_name))
+        if admin_email is not None:
+            keys.append(OrganizationModel.cache_key("email", admin_email))
+        model_cache.invalidate(*keys)
     
     @staticmethod
     def find_by_name(organization_name: str):
+        return model_cache.get_or_load_aliased(
+            OrganizationModel.cache_key("name", organization_name),
+            lambda org_id: OrganizationModel.cache_key("id", org_id),
+            lambda: single_flight.do(
+                "organizations.find_by_name", organization_name,
+                lambda: OrganizationModel.get_collection().find_one({"organization_name": organization_name})
+            ),
+            OrganizationModel._find_by_id_uncached,
+            lambda org: org["organization_name"] == organization_name
+        )
+    
+    @staticmethod
+    def find_by_id(organization_id: str):
+        return model_cache.get_or_load(
+            OrganizationModel.cache_key("id", organization_id),
+            lambda: OrganizationModel._find_by_id_uncached(organization_id)
+        )
+    
+    @staticmethod
+    def _find_by_id_uncached(organization_id: str):
         return OrganizationModel.get_collection().find_one(
-            {"organization_name": organization_name}
+            {"_id": ObjectId(organization_id)}
         )
     
     @staticmethod
-    def find_by_email(email: str):
+    def find_many(field: str, values: list, projection: dict = None):
+        """Organizations whose `field` (_id or organization_name) is in `values`, in one query"""
+        return list(OrganizationModel.get_collection().find({field: {"$in": values}}, projection))
+    
+    @staticmethod
+    def find_version_by_name(organization_name: str):
+        """Fetch only _id and updated_at through the organization_name index"""
+        return OrganizationModel.get_collection().find_one(
+            {"organization_name": organization_name},
+            VERSION_PROJECTION
+        )
+    
+    @staticmethod
+    def find_version_by_id(organization_id: str):
+        """Fetch only _id and updated_at"""
         return OrganizationModel.get_collection().find_one(
-            {"admin_email": email}
+            {"_id": ObjectId(organization_id)},
+            VERSION_PROJECTION
+        )
+    
+    @staticmethod
+    def list_recent(limit: int = 50):
+        """Newest organizations first, basic fields only"""
+        return list(OrganizationModel.get_collection().find(
+            {},
+            {"organization_name": 1, "admin_email": 1, "created_at": 1}
+        ).sort("created_at", DESCENDING).limit(limit))
+    
+    @staticmethod
+    def page_after(after_id=None, limit: int = 100, projection: dict = None):
+        """Organizations in _id order after `after_id`, for walking the whole registry"""
+        query = {"_id": {"$gt": after_id}} if after_id is not None else {}
+        return list(OrganizationModel.get_collection().find(query, projection).sort("_id", ASCENDING).limit(limit))
+    
+    @staticmethod
+    def find_by_name_prefix(prefix: str, limit: int, projection: dict = None):
+        """Organizations whose normalized name starts with `prefix` (already normalized)"""
+        return list(OrganizationModel.get_collection().find(
+            {"search_name": {"$regex": f"^{re.escape(prefix)}"}},
+            projection
+        ).sort("search_name", ASCENDING).limit(limit))
+    
+    @staticmethod
+    def trigram_frequency(gram: str, cap: int) -> int:
+        """Organizations holding `gram`, counted on the trigram index up to `cap`"""
+        return OrganizationModel.get_collection().count_documents({"name_trigrams": gram}, limit=cap)
+    
+    @staticmethod
+    def find_by_trigrams(grams: list, min_common: int, limit: int, projection: dict = None,
+                         probe: list = None, scan_limit: int = None):
+        """
+        Organizations sharing at least `min_common` name trigrams with `grams`,
+        most shared first, each with the count as `common`.
+        
+        Only organizations holding one of the `probe` trigrams (all of
+        `grams` by default) are read, at most `scan_limit` of them, before
+        they are counted and sorted.
+        """
+        pipeline = [{"$match": {"name_trigrams": {"$in": probe or grams}}}]
+        if scan_limit:
+            pipeline.append({"$limit": scan_limit})
+        pipeline += [
+            {"$addFields": {"common": {"$size": {"$filter": {
+                "input": "$name_trigrams",
+                "cond": {"$in": ["$$this", grams]}
+            }}}}},
+            {"$match": {"common": {"$gte": min_common}}},
+            {"$sort": {"common": DESCENDING, "search_name": ASCENDING}},
+            {"$limit": limit}
+        ]
+        if projection:
+            pipeline.append({"$project": {**projection, "common": 1}})
+        return list(OrganizationModel.get_collection().aggregate(pipeline))
+    
+    @staticmethod
+    def backfill_search_fields(batch_size: int = 1000) -> int:
+        """
+        Add search fields to organizations created before /org/search, and
+        redo empty ones left by the ASCII-only normalization; returns how many.
+        """
+        collection = OrganizationModel.get_collection()
+        missing = {"$or": [{"search_name": {"$exists": False}}, {"search_name": ""}]}
+        updated, after_id = 0, None
+        while True:
+            query = missing if after_id is None else {"$and": [missing, {"_id": {"$gt": after_id}}]}
+            batch = list(collection.find(query, {"organization_name": 1}).sort("_id", ASCENDING).limit(batch_size))
+            if not batch:
+                return updated
+            collection.bulk_write([
+                UpdateOne({"_id": org["_id"]}, {"$set": search_fields(org["organization_name"])})
+                for org in batch
+            ], ordered=False)
+            updated += len(batch)
+            after_id = batch[-1]["_id"]
+    
+    @staticmethod
+    def find_by_email(email: str):
+        return model_cache.get_or_load_aliased(
+            OrganizationModel.cache_key("email", email),
+            lambda org_id: OrganizationModel.cache_key("id", org_id),
+            lambda: single_flight.do(
+                "organizations.find_by_email", email,
+                lambda: OrganizationModel.get_collection().find_one({"admin_email": email})
+            ),
+            OrganizationModel._find_by_id_uncached,
+            lambda org: org["admin_email"] == email
         )
     
     @staticmethod
     def create(organization_data: dict):
-        return OrganizationModel.get_collection().insert_one(organization_data)
+        result = OrganizationModel.get_collection().insert_one(
+            {**organization_data, **search_fields(organization_data["organization_name"])}
+        )
+        OrganizationModel.invalidate_cache(
+            result.inserted_id,
+            organization_data.get("organization_name"),
+            organization_data.get("admin_email")
+        )
+        return result
+    
+    @staticmethod
+    def with_search_fields(update_data: dict) -> dict:
+        """Keep the search fields in step with a renamed organization"""
+        if "organization_name" not in update_data:
+            return update_data
+        return {**update_data, **search_fields(update_data["organization_name"])}
     
     @staticmethod
     def update(organization_name: str, update_data: dict):
-        return OrganizationModel.get_collection().update_one(
+        org = OrganizationModel.get_collection().find_one_and_update(
             {"organization_name": organization_name},
-            {"$set": update_data}
+            {"$set": OrganizationModel.with_search_fields(update_data)},
+            projection={"_id": 1}
+        )
+        if org:
+            OrganizationModel.invalidate_cache(
+                org["_id"],
+                update_data.get("organization_name"),
+                update_data.get("admin_email")
+            )
+        return org
+    
+    @staticmethod
+    def update_by_id(organization_id: str, update_data: dict):
+        result = OrganizationModel.get_collection().update_one(
+            {"_id": ObjectId(organization_id)},
+            {"$set": OrganizationModel.with_search_fields(update_data)}
         )
+        OrganizationModel.invalidate_cache(
+            organization_id,
+            update_data.get("organization_name"),
+            update_data.get("admin_email")
+        )
+        return result
     
     @staticmethod
     def delete(organization_name: str):
-        return OrganizationModel.get_collection().delete_one(
-            {"organization_name": organization_name}
-        )
\ No newline at end of file
+        org = OrganizationModel.get_collection().find_one_and_delete(
+            {"organization_name": organization_name},
+            projection={"_id": 1}
+        )
+        if org:
+            OrganizationModel.invalidate_cache(org["_id"])
+        return org
+    
+    @staticmethod
+    def delete_by_id(organization_id: str):
+        result = OrganizationModel.get_collection().delete_one(
+            {"_id": ObjectId(organization_id)}
+        )
+        OrganizationModel.invalidate_cache(organization_id)
+        return result
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING, IndexModel
+from src.db.mongo import mongo_manager
+
+class TenantIndexModel:
+    """
+    Secondary indexes declared on tenant collections.
+
+    A spec with `organization_id` None applies to every tenant collection,
+    otherwise to that organization's collection only. Specs are applied to
+    existing collections by a background build job and to new collections
+    when the organization is created.
+    """
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_master_db().tenant_indexes
+
+    @staticmethod
+    def create_indexes():
+        """Create necessary indexes"""
+        collection = TenantIndexModel.get_collection()
+        collection.create_index([("organization_id", ASCENDING), ("name", ASCENDING)], unique=True)
+
+    @staticmethod
+    def create(spec: Dict[str, Any]):
+        return TenantIndexModel.get_collection().insert_one(spec)
+
+    @staticmethod
+    def find(organization_id: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        return TenantIndexModel.get_collection().find_one({"organization_id": organization_id, "name": name})
+
+    @staticmethod
+    def name_taken(organization_id: Optional[str], name: str) -> bool:
+        """Whether `name` is declared in a scope overlapping the given one"""
+        query = {"name": name}
+        if organization_id is not None:
+            query["organization_id"] = {"$in": [None, organization_id]}
+        return TenantIndexModel.get_collection().count_documents(query, limit=1) > 0
+
+    @staticmethod
+    def list(organization_id: Optional[str] = None, include_global: bool = True) -> List[Dict[str, Any]]:
+        """Specs of one organization (with the all-tenant ones), or only the all-tenant specs"""
+        scopes = [None, organization_id] if organization_id and include_global else [organization_id]
+        return list(TenantIndexModel.get_collection().find({"organization_id": {"$in": scopes}}).sort("created_at", 1))
+
+    @staticmethod
+    def scoped_by_organization() -> Dict[str, List[Dict[str, Any]]]:
+        """Specs declared for single organizations, grouped by organization id"""
+        specs: Dict[str, List[Dict[str, Any]]] = {}
+        for spec in TenantIndexModel.get_collection().find({"organization_id": {"$ne": None}}).sort("created_at", 1):
+            specs.setdefault(spec["organization_id"], []).append(spec)
+        return specs
+
+    @staticmethod
+    def update_build(spec_id, build: Dict[str, Any]):
+        """Record the outcome of the latest build of a spec"""
+        return TenantIndexModel.get_collection().update_one(
+            {"_id": spec_id},
+            {"$set": {"build": build, "updated_at": datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def delete(organization_id: Optional[str], name: str):
+        return TenantIndexModel.get_collection().delete_one({"organization_id": organization_id, "name": name})
+
+    @staticmethod
+    def to_index_model(spec: Dict[str, Any]) -> IndexModel:
+        """pymongo IndexModel for a stored spec"""
+        options = {"name": spec["name"]}
+        if spec.get("unique"):
+            options["unique"] = True
+        if spec.get("sparse"):
+            options["sparse"] = True
+        if spec.get("partial_filter"):
+            options["partialFilterExpression"] = spec["partial_filter"]
+        return IndexModel([tuple(key) for key in spec["keys"]], **options)
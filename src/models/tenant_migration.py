@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from src.db.mongo import mongo_manager
+
+MIGRATION_STATUS_RUNNING = "running"
+MIGRATION_STATUS_COMPLETED = "completed"
+MIGRATION_STATUS_FAILED = "failed"
+MIGRATION_STATUS_PAUSED = "paused"
+
+class TenantMigrationModel:
+    """
+    Schema migration state of each tenant collection, keyed by organization id.
+
+    `schema_version` is the last version fully applied. While a migration
+    runs, `migration` names the version being applied and `last_id` the
+    last tenant document it finished, so an interrupted run resumes there.
+    A runner holds a lease on the tenant while working on it.
+    """
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_master_db().tenant_migrations
+
+    @staticmethod
+    def create_indexes():
+        """Create necessary indexes"""
+        collection = TenantMigrationModel.get_collection()
+        collection.create_index([("status", ASCENDING), ("schema_version", ASCENDING)])
+
+    @staticmethod
+    def find(organization_id: str) -> Optional[Dict[str, Any]]:
+        return TenantMigrationModel.get_collection().find_one({"_id": organization_id})
+
+    @staticmethod
+    def claim(
+        organization_id: str,
+        collection_name: str,
+        schema_version: str,
+        runner_id: str,
+        lease_seconds: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lease a tenant for migration, creating its state on first use.
+
+        Returns None while another runner holds an unexpired lease.
+        `schema_version` seeds the state of tenants never migrated before.
+        """
+        now = datetime.utcnow()
+        try:
+            return TenantMigrationModel.get_collection().find_one_and_update(
+                {"_id": organization_id, "$or": [
+                    {"runner_id": None},
+                    {"runner_id": runner_id},
+                    {"lease_expires_at": {"$lte": now}}
+                ]},
+                {
+                    "$set": {
+                        "collection_name": collection_name,
+                        "status": MIGRATION_STATUS_RUNNING,
+                        "runner_id": runner_id,
+                        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                        "error": None,
+                        "updated_at": now
+                    },
+                    "$setOnInsert": {
+                        "schema_version": schema_version,
+                        "migration": None,
+                        "last_id": None,
+                        "migrated": 0,
+                        "created_at": now
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The state exists and is leased by another runner
+            return None
+
+    @staticmethod
+    def checkpoint(organization_id: str, runner_id: str, fields: Dict[str, Any], lease_seconds: int, migrated: int = 0) -> bool:
+        """Record progress and renew the lease; False when the lease was lost"""
+        now = datetime.utcnow()
+        result = TenantMigrationModel.get_collection().update_one(
+            {"_id": organization_id, "runner_id": runner_id},
+            {
+                "$set": {**fields, "lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now},
+                "$inc": {"migrated": migrated}
+            }
+        )
+        return result.matched_count == 1
+
+    @staticmethod
+    def release(organization_id: str, runner_id: str, status: str, error: Optional[str] = None):
+        """Give up the lease, recording how the run ended"""
+        return TenantMigrationModel.get_collection().update_one(
+            {"_id": organization_id, "runner_id": runner_id},
+            {"$set": {
+                "status": status,
+                "error": error,
+                "runner_id": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def summary() -> List[Dict[str, Any]]:
+        """Tenant counts per schema version and status"""
+        return list(TenantMigrationModel.get_collection().aggregate([
+            {"$group": {
+                "_id": {"schema_version": "$schema_version", "status": "$status"},
+                "tenants": {"$sum": 1},
+                "documents": {"$sum": "$migrated"}
+            }},
+            {"$sort": {"_id.schema_version": 1, "_id.status": 1}}
+        ]))
+
+    @staticmethod
+    def failed(limit: int = 50) -> List[Dict[str, Any]]:
+        return list(TenantMigrationModel.get_collection().find(
+            {"status": MIGRATION_STATUS_FAILED},
+            {"collection_name": 1, "schema_version": 1, "migration": 1, "error": 1, "updated_at": 1}
+        ).limit(limit))
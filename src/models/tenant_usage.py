@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from src.db.mongo import mongo_manager
+
+# Upper bounds (ms) of the request latency histogram; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+def latency_bucket_field(latency_ms: float) -> str:
+    for bound in LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+            return f"le_{bound}"
+    return "le_inf"
+
+class TenantUsageModel:
+    """
+    Per-organization usage rollups in the master database.
+
+    `tenant_usage` holds one document per organization per hour with
+    request, error and latency counters; `tenant_storage` holds the latest
+    collStats sample of each tenant collection, keyed by organization id.
+    """
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_master_db().tenant_usage
+
+    @staticmethod
+    def get_storage_collection():
+        return mongo_manager.get_master_db().tenant_storage
+
+    @staticmethod
+    def create_indexes(retention_days: int):
+        """Create necessary indexes; hourly rollups expire after `retention_days`"""
+        collection = TenantUsageModel.get_collection()
+        collection.create_index([("organization_id", ASCENDING), ("bucket", ASCENDING)], unique=True)
+        collection.create_index([("bucket", ASCENDING)], expireAfterSeconds=retention_days * 86400)
+
+    @staticmethod
+    def hour_bucket(moment: datetime) -> datetime:
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def apply_counters(bucket: datetime, counters: Dict[str, Dict[str, Any]]):
+        """Add one flush worth of per-organization counters to the hourly rollups"""
+        now = datetime.utcnow()
+        operations = []
+        for organization_id, counter in counters.items():
+            increments = {
+                "requests": counter["requests"],
+                "errors": counter["errors"],
+                "latency_ms_sum": counter["latency_ms_sum"],
+            }
+            for field, count in counter["latency_buckets"].items():
+                increments[f"latency_buckets.{field}"] = count
+            operations.append(UpdateOne(
+                {"organization_id": organization_id, "bucket": bucket},
+                {
+                    "$inc": increments,
+                    "$max": {"latency_ms_max": counter["latency_ms_max"]},
+                    "$set": {"organization_name": counter["organization_name"], "updated_at": now}
+                },
+                upsert=True
+            ))
+        if operations:
+            TenantUsageModel.get_collection().bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def summarize(since: datetime, limit: int, sort_field: str) -> List[Dict[str, Any]]:
+        """Usage per organization since `since`, with the latest storage sample"""
+        pipeline = [
+            {"$match": {"bucket": {"$gte": since}}},
+            {"$sort": {"bucket": ASCENDING}},
+            {"$group": {
+                "_id": "$organization_id",
+                "organization_name": {"$last": "$organization_name"},
+                "requests": {"$sum": "$requests"},
+                "errors": {"$sum": "$errors"},
+                "latency_ms_sum": {"$sum": "$latency_ms_sum"},
+                "latency_ms_max": {"$max": "$latency_ms_max"},
+            }},
+            {"$sort": {sort_field: DESCENDING}},
+            {"$limit": limit},
+        ]
+        rows = list(TenantUsageModel.get_collection().aggregate(pipeline))
+        storage = {
+            doc.pop("_id"): doc
+            for doc in TenantUsageModel.get_storage_collection().find(
+                {"_id": {"$in": [row["_id"] for row in rows]}}
+            )
+        }
+        for row in rows:
+            row["storage"] = storage.get(row["_id"])
+        return rows
+
+    @staticmethod
+    def hourly(organization_id: str, since: datetime) -> List[Dict[str, Any]]:
+        return list(TenantUsageModel.get_collection().find(
+            {"organization_id": organization_id, "bucket": {"$gte": since}},
+            {"_id": 0}
+        ).sort("bucket", ASCENDING))
+
+    @staticmethod
+    def find_storage(organization_id: str) -> Optional[Dict[str, Any]]:
+        return TenantUsageModel.get_storage_collection().find_one({"_id": organization_id}, {"_id": 0})
+
+    @staticmethod
+    def save_storage(organization: Dict[str, Any], stats: Dict[str, Any]):
+        TenantUsageModel.get_storage_collection().replace_one(
+            {"_id": str(organization["_id"])},
+            {
+                "organization_name": organization["organization_name"],
+                "collection_name": organization["collection_name"],
+                "count": stats.get("count", 0),
+                "size": stats.get("size", 0),
+                "storage_size": stats.get("storageSize", 0),
+                "total_index_size": stats.get("totalIndexSize", 0),
+                "index_count": stats.get("nindexes", 0),
+                "sampled_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    def collection_stats(collection_name: str) -> Dict[str, Any]:
+        return mongo_manager.get_master_db().command("collStats", collection_name)
+
+    @staticmethod
+    def since_hours(hours: int) -> datetime:
+        return TenantUsageModel.hour_bucket(datetime.utcnow() - timedelta(hours=hours - 1))
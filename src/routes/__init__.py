@@ -1,4 +1,6 @@
 from .auth import router as auth_router
 from .organization import router as organization_router
+from .jobs import router as jobs_router
+from .internal import router as internal_router
 
-__all__ = ["auth_router", "organization_router"]
\ No newline at end of file
+__all__ = ["auth_router", "organization_router", "jobs_router", "internal_router"]
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from src.schemas.admin import AdminLoginSchema, TokenResponseSchema
 from src.services.admin_service import AdminService
+from src.services.organization_service import OrganizationService
+from src.utils.etag import etag_matches, not_modified, validator_headers
+from src.utils.json_response import FastJSONResponse
 from src.utils.jwt import verify_token
 import logging
 
@@ -10,7 +13,7 @@ router = APIRouter(prefix="/admin", tags=["Authentication"])
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
-def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def get_current_admin(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to get current authenticated admin"""
     token = credentials.credentials
     admin_info = verify_token(token)
@@ -22,16 +25,29 @@ def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(securi
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Map JWT claims (see AdminService.login_admin) to admin fields
+    admin_info = {
+        "admin_id": admin_info.get("sub"),
+        "email": admin_info.get("email"),
+        "organization_id": admin_info.get("org_id"),
+        "organization_name": admin_info.get("org_name")
+    }
+    
     # Make sure all required fields are present
-    required_fields = ["admin_id", "email", "organization_id", "organization_name"]
-    for field in required_fields:
-        if field not in admin_info:
+    for field, value in admin_info.items():
+        if not value:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Malformed token: missing {field}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
     
+    # Lets UsageMiddleware attribute the request to this tenant
+    request.state.tenant = {
+        "organization_id": admin_info["organization_id"],
+        "organization_name": admin_info["organization_name"]
+    }
+    
     return admin_info
 
 @router.post("/login", response_model=TokenResponseSchema)
@@ -63,6 +79,8 @@ async def admin_login(login_data: AdminLoginSchema):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(
@@ -71,13 +89,43 @@ async def admin_login(login_data: AdminLoginSchema):
         )
 
 @router.get("/verify")
-async def verify_admin_token(current_admin: dict = Depends(get_current_admin)):
+async def verify_admin_token(request: Request, current_admin: dict = Depends(get_current_admin)):
     """
     Verify admin token.
     
-    Returns current admin information if token is valid.
+    Returns current admin information if token is valid and the organization
+    still exists. Supports If-None-Match with the returned ETag.
     """
-    return {
+    try:
+        version = await OrganizationService.get_organization_version(
+            organization_id=current_admin["organization_id"]
+        )
+    except Exception as e:
+        logger.error(f"Token verification error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during token verification"
+        )
+    
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Organization no longer exists",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # The body echoes the token claims, so they are part of the validator
+    etag = OrganizationService.etag_for(
+        version,
+        current_admin["admin_id"],
+        current_admin["email"],
+        current_admin["organization_name"]
+    )
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    return FastJSONResponse({
         "message": "Token is valid",
         "admin": {
             "id": current_admin.get("admin_id"),
@@ -85,4 +133,4 @@ async def verify_admin_token(current_admin: dict = Depends(get_current_admin)):
             "organization_id": current_admin.get("organization_id"),
             "organization_name": current_admin.get("organization_name")
         }
-    }
\ No newline at end of file
+    }, headers=validator_headers(etag))
@@ -0,0 +1,407 @@
+import time
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from typing import List, Optional
+from src.config.settings import settings
+from src.models.admin_user import AdminUserModel
+from src.db.slow_ops import slow_op_listener
+from src.services.admin_service import AdminService
+from src.services.job_service import JobService
+from src.services.index_service import IndexService
+from src.services.audit_service import AuditService, audit_writer
+from src.services.migration_service import MigrationService
+from src.services.organization_service import OrganizationService
+from src.services.usage_service import UsageService, usage_collector
+from src.utils.password import bcrypt_calibration
+from src.utils.cache import model_cache
+from src.utils.single_flight import single_flight
+from src.utils.json_response import FastJSONResponse
+from src.utils.loop_monitor import loop_monitor
+from src.utils.profiler import request_profiler, sign_profile_token, speedscope_to_collapsed
+from src.schemas.job import JobAcceptedSchema, JobStatusSchema
+from src.schemas.organization import OrganizationRestoreSchema
+from src.schemas.tenant_index import TenantIndexCreateSchema
+from fastapi.responses import PlainTextResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Dependency guarding operator-only endpoints with a shared token"""
+    if not settings.internal_api_token:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Internal API is disabled"
+        )
+    
+    if not x_internal_token or not secrets.compare_digest(x_internal_token, settings.internal_api_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token"
+        )
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(verify_internal_token)]
+)
+
+@router.get("/password-hashes")
+async def password_hash_metrics():
+    """
+    Password hashing metrics.
+    
+    Returns the calibrated bcrypt cost, the cost distribution of stored
+    admin password hashes and background rehash counters.
+    """
+    try:
+        return {
+            "calibration": bcrypt_calibration,
+            "stored_hash_costs": AdminUserModel.hash_cost_distribution(),
+            "rehash": AdminService.rehash_stats
+        }
+    except Exception as e:
+        logger.error(f"Error collecting password hash metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to collect password hash metrics"
+        )
+
+@router.get("/cache")
+async def cache_metrics():
+    """
+    Model cache metrics.
+    
+    Returns the configured backend and hit, miss and refresh counters for
+    this process.
+    """
+    return {
+        "backend": settings.cache_backend,
+        "enabled": model_cache.enabled,
+        "ttl_seconds": model_cache.ttl,
+        "negative_ttl_seconds": model_cache.negative_ttl,
+        "stats": model_cache.stats
+    }
+
+@router.get("/coalescing")
+async def coalescing_metrics():
+    """
+    Single-flight lookup metrics.
+    
+    Returns per lookup how many queries ran and how many concurrent
+    callers shared an in-flight query instead.
+    """
+    return {"lookups": single_flight.stats}
+
+@router.get("/slow-ops")
+async def slow_operations(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Recent slow MongoDB operations.
+    
+    - **limit**: Maximum number of operations to return, newest first
+    
+    Each entry has the collection, filter shape, duration and a summary of
+    the explain plan (filled in shortly after the operation is recorded).
+    """
+    return FastJSONResponse({
+        "enabled": settings.slow_op_enabled,
+        "threshold_ms": slow_op_listener.threshold_ms,
+        "operations": slow_op_listener.recent(limit)
+    })
+
+@router.get("/usage")
+async def tenant_usage(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    limit: int = Query(50, ge=1, le=1000),
+    sort: str = Query("requests")
+):
+    """
+    Per-organization usage.
+    
+    - **hours**: Window to aggregate, in whole hours up to now
+    - **limit**: Number of organizations to return
+    - **sort**: requests, errors, latency_ms_sum or latency_ms_max
+    
+    Returns request counts and latency per organization with the latest
+    collStats sample of its tenant collection. Counters reach MongoDB on
+    each collector flush, so the current minute may be missing.
+    """
+    try:
+        organizations = await UsageService.summary(hours, limit, sort)
+        return FastJSONResponse({
+            "hours": hours,
+            "collector": usage_collector.stats,
+            "organizations": organizations
+        })
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error collecting tenant usage: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to collect tenant usage"
+        )
+
+@router.get("/usage/{organization_id}")
+async def organization_usage(organization_id: str, hours: int = Query(24, ge=1, le=24 * 90)):
+    """
+    Hourly usage of one organization.
+    
+    - **organization_id**: Organization id
+    - **hours**: Window to return, in whole hours up to now
+    
+    Returns one rollup per hour (requests, errors, latency sum, max and
+    histogram buckets) and the latest storage sample.
+    """
+    try:
+        return FastJSONResponse(await UsageService.organization_usage(organization_id, hours))
+    except Exception as e:
+        logger.error(f"Error collecting usage for organization {organization_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to collect organization usage"
+        )
+
+@router.get("/migrations")
+async def migration_status():
+    """
+    Tenant schema migration status.
+    
+    Returns the registered migrations, the number of tenants at each
+    schema version and migration status, and the tenants whose last
+    migration failed. Run src/scripts/migrate_tenants.py to migrate.
+    """
+    try:
+        return FastJSONResponse(await MigrationService.status())
+    except Exception as e:
+        logger.error(f"Error collecting migration status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to collect migration status"
+        )
+
+@router.post("/tenant-indexes", status_code=status.HTTP_202_ACCEPTED, response_model=JobAcceptedSchema)
+async def create_tenant_index(index_data: TenantIndexCreateSchema):
+    """
+    Declare a secondary index on every tenant collection.
+    
+    Takes the same fields as POST /org/indexes. Existing collections are
+    indexed by a throttled background job (INDEX_BUILD_WORKERS at a time,
+    INDEX_BUILDS_PER_SECOND); new organizations get the index on creation.
+    Returns 202 with a job id; the job progress lists failed collections.
+    """
+    try:
+        result = await IndexService.create_index(None, index_data.model_dump(), created_by="internal")
+        await audit_writer.record("index.created", None, "internal", {
+            "keys": [[key.field, key.direction] for key in index_data.keys],
+            "job_id": result["job_id"]
+        })
+        return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error declaring tenant index: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to declare tenant index"
+        )
+
+@router.get("/tenant-indexes")
+async def list_tenant_indexes(organization_id: Optional[str] = Query(None)):
+    """
+    Indexes declared for all tenants, or for one organization.
+    
+    - **organization_id**: Also list that organization's own indexes and whether each is built
+    """
+    try:
+        indexes = await IndexService.list_indexes(organization_id)
+        return FastJSONResponse({"count": len(indexes), "indexes": indexes})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error listing tenant indexes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list tenant indexes"
+        )
+
+@router.delete("/tenant-indexes/{name}", status_code=status.HTTP_202_ACCEPTED, response_model=JobAcceptedSchema)
+async def drop_tenant_index(name: str):
+    """
+    Drop an index declared for all tenants from every tenant collection.
+    
+    - **name**: Index name
+    """
+    try:
+        result = await IndexService.drop_index(None, name)
+        await audit_writer.record("index.dropped", None, "internal", {"name": name, "job_id": result["job_id"]})
+        return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error dropping tenant index: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to drop tenant index"
+        )
+
+@router.get("/audit/{organization_id}")
+async def organization_audit_log(
+    organization_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    event: Optional[List[str]] = Query(None)
+):
+    """
+    Audit log of any organization, newest first, with the writer's counters.
+    
+    - **organization_id**: Organization id (deleted organizations included)
+    - **limit**: Number of events to return
+    - **cursor**: next_cursor of the previous page
+    - **event**: Only these event types (repeatable)
+    """
+    try:
+        page = await AuditService.organization_events(organization_id, limit, cursor, event)
+        return FastJSONResponse({**page, "writer": {**audit_writer.stats, "buffered": audit_writer.buffered}})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error reading audit log of organization {organization_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to read audit log"
+        )
+
+@router.get("/event-loop")
+async def event_loop_metrics():
+    """
+    Event loop lag metrics.
+    
+    Returns the cumulative lag histogram (Prometheus-style `le` buckets in
+    ms), stall counts per offending code location and the stacks captured
+    for recent stalls.
+    """
+    return FastJSONResponse(loop_monitor.snapshot())
+
+@router.post("/profiles/token")
+async def create_profile_token(ttl_seconds: int = Query(300, ge=1, le=3600)):
+    """
+    Issue a token for profiling requests on demand.
+    
+    - **ttl_seconds**: How long the token stays valid
+    
+    Send the token in an X-Profile header; each profiled response names its
+    profile in an X-Profile-Id header.
+    """
+    if not settings.profiling_enabled or not settings.profiling_secret:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Header-triggered profiling is not enabled"
+        )
+    
+    expires_at = int(time.time()) + ttl_seconds
+    return {
+        "header": "X-Profile",
+        "token": sign_profile_token(expires_at, settings.profiling_secret),
+        "expires_at": expires_at
+    }
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    Stored request profiles, newest first, with profiler counters.
+    """
+    profiles = sorted(request_profiler.list_profiles(), key=lambda p: p["created_at"], reverse=True)
+    return {
+        "enabled": settings.profiling_enabled,
+        "sample_rate": request_profiler.sample_rate,
+        "stats": request_profiler.stats,
+        "profiles": profiles
+    }
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("speedscope", pattern="^(speedscope|collapsed)$")):
+    """
+    Download a request profile.
+    
+    - **profile_id**: Value of the X-Profile-Id response header
+    - **format**: `speedscope` (open at speedscope.app) or `collapsed` (flamegraph.pl input)
+    """
+    document = request_profiler.load(profile_id)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    if format == "collapsed":
+        return PlainTextResponse(speedscope_to_collapsed(document))
+    return FastJSONResponse(document)
+
+@router.post(
+    "/organizations/{organization_id}/restore",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAcceptedSchema
+)
+async def restore_organization(organization_id: str, restore_data: OrganizationRestoreSchema):
+    """
+    Restore one organization from a backup.
+    
+    - **organization_id**: Id of the organization to recreate
+    - **backup_id**: Backup to restore from; the newest one holding the organization by default
+    - **replace**: Overwrite the organization if it still exists
+    
+    Returns 202 with a job id; poll /internal/jobs/{job_id} for progress.
+    Other organizations stay online throughout.
+    """
+    try:
+        result = await OrganizationService.restore_organization(
+            organization_id, restore_data.backup_id, restore_data.replace
+        )
+        await audit_writer.record("organization.restore_requested", organization_id, "internal", {
+            "backup_id": restore_data.backup_id,
+            "replace": restore_data.replace,
+            "job_id": result["job_id"]
+        })
+        return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error scheduling restore of organization {organization_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to schedule organization restore"
+        )
+
+@router.get("/jobs/{job_id}", response_model=JobStatusSchema)
+async def get_job_status(job_id: str):
+    """
+    Status and progress of any background job.
+    
+    - **job_id**: Id returned by an endpoint that answered 202 Accepted
+    """
+    job = await JobService.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found"
+        )
+    return FastJSONResponse(job)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
+from src.schemas.job import JobStatusSchema
+from src.services.job_service import JobService
+from src.routes.auth import get_current_admin
+from src.utils.json_response import FastJSONResponse
+import logging
+
+router = APIRouter(prefix="/jobs", tags=["Background Jobs"])
+logger = logging.getLogger(__name__)
+
+@router.get("/{job_id}", response_model=JobStatusSchema)
+async def get_job_status(
+    job_id: str,
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Get background job status.
+    
+    - **job_id**: Id returned by an endpoint that answered 202 Accepted
+    
+    Returns job status, attempts, progress and result or error.
+    """
+    try:
+        job = await JobService.get_job(job_id)
+        
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job '{job_id}' not found"
+            )
+        
+        # Jobs are scoped to the organization that created them
+        if job["organization_id"] != current_admin["organization_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this job"
+            )
+        
+        return FastJSONResponse(job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch job status"
+        )
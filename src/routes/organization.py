@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Dict, Any, List, Optional
 from src.schemas.organization import (
     OrganizationCreateSchema,
     OrganizationResponseSchema,
     OrganizationUpdateSchema,
     OrganizationDeleteSchema,
-    OrganizationGetSchema
+    OrganizationExportSchema,
+    OrganizationGetSchema,
+    OrganizationBatchGetSchema
 )
+from src.schemas.job import JobAcceptedSchema
+from src.schemas.tenant_index import TenantIndexCreateSchema
+from src.utils.json_response import FastJSONResponse
+from src.utils.etag import etag_matches, not_modified, validator_headers
 from src.services.organization_service import OrganizationService
+from src.services.index_service import IndexService
+from src.services.audit_service import AuditService, audit_writer
+from src.models.organization import OrganizationModel
 from src.routes.auth import get_current_admin
 import logging
 
@@ -16,8 +25,7 @@ logger = logging.getLogger(__name__)
 
 @router.post("/create", response_model=OrganizationResponseSchema)
 async def create_organization(
-    org_data: OrganizationCreateSchema,
-    background_tasks: BackgroundTasks
+    org_data: OrganizationCreateSchema
 ):
     """
     Create a new organization.
@@ -31,11 +39,11 @@ async def create_organization(
     try:
         result = await OrganizationService.create_organization(org_data.dict())
         
-        # Log creation in background
-        background_tasks.add_task(
-            logger.info,
-            f"Organization created: {org_data.organization_name} by {org_data.email}"
-        )
+        logger.info(f"Organization created: {org_data.organization_name} by {org_data.email}")
+        await audit_writer.record("organization.created", result["id"], org_data.email, {
+            "organization_name": org_data.organization_name,
+            "collection_name": result["collection_name"]
+        })
         
         return result
         
@@ -54,6 +62,7 @@ async def create_organization(
 @router.get("/get", response_model=OrganizationResponseSchema)
 async def get_organization(
     org_name: str,
+    request: Request,
     current_admin: Dict[str, Any] = Depends(get_current_admin)
 ):
     """
@@ -61,25 +70,38 @@ async def get_organization(
     
     - **organization_name**: Name of the organization to fetch
     
-    Returns organization metadata from Master Database.
+    Returns organization metadata from Master Database with an ETag.
+    Send it back in If-None-Match to get 304 Not Modified while unchanged.
     """
     try:
-        org_data = await OrganizationService.get_organization(org_name)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Conditional poll: id and updated_at are enough to answer it
+            version = await OrganizationService.get_organization_version(organization_name=org_name)
+            if not version:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Organization '{org_name}' not found"
+                )
+            check_organization_access(current_admin, version["id"])
+            
+            etag = OrganizationService.etag_for(version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        
+        result = await OrganizationService.get_organization_with_etag(org_name)
         
-        if not org_data:
+        if not result:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Organization '{org_name}' not found"
             )
+        org_data, etag = result
         
-        # Check if current admin has access to this organization
-        if current_admin["organization_name"] != org_data["organization_name"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this organization"
-            )
+        check_organization_access(current_admin, org_data["id"])
         
-        return org_data
+        # Already shaped by the service; skip response_model re-validation
+        return FastJSONResponse(org_data, headers=validator_headers(etag))
         
     except HTTPException:
         raise
@@ -90,6 +112,71 @@ async def get_organization(
             detail="Failed to fetch organization details"
         )
 
+@router.post("/batch-get")
+async def batch_get_organizations(
+    batch_data: OrganizationBatchGetSchema,
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Get several organizations in one request.
+    
+    - **names**: Organization names to fetch (up to 100)
+    - **ids**: Organization ids to fetch, instead of names
+    
+    Returns one entry per requested key, in request order. Each entry has
+    the key, a status (200, 403 or 404) and, when 200, the organization
+    with its ETag. Access is checked per organization as in /org/get.
+    """
+    try:
+        results = await OrganizationService.batch_get_organizations(batch_data.names, batch_data.ids)
+        keys = batch_data.names if batch_data.names is not None else batch_data.ids
+        
+        items = []
+        for key, result in zip(keys, results):
+            if result is None:
+                items.append({"key": key, "status": status.HTTP_404_NOT_FOUND, "error": "Organization not found"})
+            elif not can_access_organization(current_admin, result[0]["id"]):
+                items.append({"key": key, "status": status.HTTP_403_FORBIDDEN, "error": "Access denied to this organization"})
+            else:
+                items.append({"key": key, "status": status.HTTP_200_OK, "organization": result[0], "etag": result[1]})
+        
+        return FastJSONResponse({"count": len(items), "items": items})
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error batch fetching organizations: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch organizations"
+        )
+
+def can_access_organization(current_admin: Dict[str, Any], organization_id: str) -> bool:
+    """Whether the token belongs to the organization's admin"""
+    # By id, so tokens issued before a rename keep working
+    return current_admin["organization_id"] == organization_id
+
+def check_organization_access(
+    current_admin: Dict[str, Any],
+    organization_id: str,
+    detail: str = "Access denied to this organization"
+):
+    """Raise 403 unless the token belongs to the organization's admin"""
+    if not can_access_organization(current_admin, organization_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+async def check_organization_access_by_name(current_admin: Dict[str, Any], organization_name: str, action: str):
+    """Resolve a name from the request body and check access by the organization's id"""
+    version = await OrganizationService.get_organization_version(organization_name=organization_name)
+    if not version:
+        raise ValueError(f"Organization '{organization_name}' not found")
+    check_organization_access(
+        current_admin, version["id"], f"Unauthorized: You can only {action} your own organization"
+    )
+
 @router.put("/update")
 async def update_organization(
     update_data: OrganizationUpdateSchema,
@@ -103,20 +190,21 @@ async def update_organization(
     - **email** (optional): New admin email
     - **password** (optional): New admin password
     
-    Updates organization metadata and handles collection renaming if needed.
+    Updates organization metadata. Renames only change the display name;
+    the organization's collection is keyed by its id and is not moved.
     """
     try:
         # Verify current admin owns the organization
-        if current_admin["organization_name"] != update_data.organization_name:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Unauthorized: You can only update your own organization"
-            )
+        await check_organization_access_by_name(current_admin, update_data.organization_name, "update")
         
-        result = await OrganizationService.update_organization(
-            update_data.dict(exclude_none=True),
-            current_admin["email"]
-        )
+        changes = update_data.dict(exclude_none=True)
+        result = await OrganizationService.update_organization(changes, current_admin["organization_id"])
+        
+        # Field names only: the audit log never holds passwords
+        await audit_writer.record("organization.updated", current_admin["organization_id"], current_admin["email"], {
+            "fields": sorted(field for field in changes if field != "organization_name"),
+            **({"new_organization_name": changes["new_organization_name"]} if "new_organization_name" in changes else {})
+        })
         
         return {"message": "Organization updated successfully", **result}
         
@@ -134,7 +222,7 @@ async def update_organization(
             detail="Failed to update organization"
         )
 
-@router.delete("/delete")
+@router.delete("/delete", status_code=status.HTTP_202_ACCEPTED, response_model=JobAcceptedSchema)
 async def delete_organization(
     delete_data: OrganizationDeleteSchema,
     current_admin: Dict[str, Any] = Depends(get_current_admin)
@@ -144,21 +232,22 @@ async def delete_organization(
     
     - **organization_name**: Name of organization to delete
     
-    Deletes organization metadata and its dynamic collection.
+    Schedules deletion of organization metadata and its dynamic collection.
+    Returns 202 with a job id; poll /jobs/{job_id} for completion.
     Only authenticated admin of the organization can delete it.
     """
     try:
         # Verify current admin owns the organization
-        if current_admin["organization_name"] != delete_data.organization_name:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Unauthorized: You can only delete your own organization"
-            )
+        await check_organization_access_by_name(current_admin, delete_data.organization_name, "delete")
         
         result = await OrganizationService.delete_organization(
             delete_data.organization_name,
-            current_admin["email"]
+            current_admin["organization_id"]
         )
+        await audit_writer.record("organization.delete_requested", current_admin["organization_id"], current_admin["email"], {
+            "organization_name": delete_data.organization_name,
+            "job_id": result["job_id"]
+        })
         
         return result
         
@@ -176,6 +265,45 @@ async def delete_organization(
             detail="Failed to delete organization"
         )
 
+@router.post("/export", status_code=status.HTTP_202_ACCEPTED, response_model=JobAcceptedSchema)
+async def export_organization(
+    export_data: OrganizationExportSchema,
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Export an organization's collection.
+    
+    - **organization_name**: Name of organization to export
+    
+    Schedules a background export to a gzipped NDJSON file.
+    Returns 202 with a job id; the job result holds the export path.
+    """
+    try:
+        await check_organization_access_by_name(current_admin, export_data.organization_name, "export")
+        
+        result = await OrganizationService.export_organization(
+            export_data.organization_name,
+            current_admin["organization_id"]
+        )
+        await audit_writer.record("organization.export_requested", current_admin["organization_id"], current_admin["email"], {
+            "job_id": result["job_id"]
+        })
+        return result
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting organization: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to export organization"
+        )
+
 @router.get("/list")
 async def list_organizations(
     current_admin: Dict[str, Any] = Depends(get_current_admin)
@@ -183,30 +311,189 @@ async def list_organizations(
     """
     List organizations (for demonstration - in production would be admin-only).
     
-    Returns basic info about all organizations.
+    Returns basic info about the 50 newest organizations.
     """
     try:
-        from src.db.mongo import mongo_manager
-        master_db = mongo_manager.get_master_db()
+        # Newest first through the created_at index (limited for security)
+        organizations = OrganizationModel.list_recent(50)
         
-        # Get all organizations (limited for security)
-        organizations = list(master_db.organizations.find(
-            {}, 
-            {"organization_name": 1, "admin_email": 1, "created_at": 1}
-        ).limit(50))
-        
-        # Convert ObjectId to string
         for org in organizations:
-            org["id"] = str(org.pop("_id"))
+            org["id"] = org.pop("_id")
         
-        return {
+        # ObjectId and datetime are encoded natively by the response class
+        return FastJSONResponse({
             "count": len(organizations),
             "organizations": organizations
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error listing organizations: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to list organizations"
-        )
\ No newline at end of file
+        )
+@router.get("/search")
+async def search_organizations(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Search organizations by name.
+    
+    - **q**: Name or part of it; case, accents and punctuation are ignored
+    - **limit**: Number of matches to return
+    - **offset**: Number of matches to skip
+    
+    Returns exact matches first, then names starting with the query, then
+    similar names (typos, word order), each with its score and match type.
+    """
+    try:
+        return FastJSONResponse(await OrganizationService.search_organizations(q, limit, offset))
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error searching organizations: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search organizations"
+        )
+
+@router.post("/indexes", status_code=status.HTTP_202_ACCEPTED, response_model=JobAcceptedSchema)
+async def create_index(
+    index_data: TenantIndexCreateSchema,
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Declare a secondary index on your organization's collection.
+    
+    - **keys**: Indexed fields in order, each with a direction (1, -1, text, hashed or 2dsphere)
+    - **name**: Index name (default: derived from the keys)
+    - **unique**: Reject documents with duplicate keys
+    - **sparse**: Skip documents without the indexed fields
+    - **partial_filter**: Only index documents matching this filter
+    
+    The index is built in the background. Returns 202 with a job id;
+    poll /jobs/{job_id} for progress.
+    """
+    try:
+        result = await IndexService.create_index(
+            current_admin["organization_id"],
+            index_data.model_dump(),
+            created_by=current_admin["email"]
+        )
+        await audit_writer.record("index.created", current_admin["organization_id"], current_admin["email"], {
+            "keys": [[key.field, key.direction] for key in index_data.keys],
+            "job_id": result["job_id"]
+        })
+        return result
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error declaring index: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to declare index"
+        )
+
+@router.get("/indexes")
+async def list_indexes(
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    List the indexes declared on your organization's collection.
+    
+    Includes indexes declared for all tenants; `built` tells whether the
+    collection has the index yet.
+    """
+    try:
+        indexes = await IndexService.list_indexes(current_admin["organization_id"])
+        return FastJSONResponse({"count": len(indexes), "indexes": indexes})
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error listing indexes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list indexes"
+        )
+
+@router.delete("/indexes/{name}", status_code=status.HTTP_202_ACCEPTED, response_model=JobAcceptedSchema)
+async def drop_index(
+    name: str,
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Drop an index declared on your organization's collection.
+    
+    - **name**: Index name
+    
+    Indexes declared for all tenants can only be dropped through /internal.
+    Returns 202 with a job id.
+    """
+    try:
+        result = await IndexService.drop_index(current_admin["organization_id"], name)
+        await audit_writer.record("index.dropped", current_admin["organization_id"], current_admin["email"], {
+            "name": name,
+            "job_id": result["job_id"]
+        })
+        return result
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error dropping index: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to drop index"
+        )
+
+@router.get("/audit")
+async def organization_audit_log(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    event: Optional[List[str]] = Query(None),
+    current_admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    Audit log of your organization, newest first.
+    
+    - **limit**: Number of events to return
+    - **cursor**: next_cursor of the previous page
+    - **event**: Only these event types (repeatable), e.g. organization.updated
+    
+    Events are written in batches, so the last second or so may not be
+    visible yet.
+    """
+    try:
+        return FastJSONResponse(await AuditService.organization_events(
+            current_admin["organization_id"], limit, cursor, event
+        ))
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error reading audit log: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to read audit log"
+        )
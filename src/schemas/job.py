@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class JobAcceptedSchema(BaseModel):
+    message: str
+    job_id: str = Field(..., description="Id of the background job, poll /jobs/{job_id} for status")
+
+class JobStatusSchema(BaseModel):
+    id: str
+    type: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    organization_id: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
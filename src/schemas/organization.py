@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
+from typing import List, Optional
 from datetime import datetime
 
 class OrganizationCreateSchema(BaseModel):
@@ -14,8 +14,7 @@ class OrganizationResponseSchema(BaseModel):
     admin_email: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class OrganizationUpdateSchema(BaseModel):
     organization_name: str = Field(..., description="Current organization name")
@@ -27,4 +26,17 @@ class OrganizationDeleteSchema(BaseModel):
     organization_name: str = Field(..., description="Name of organization to delete")
 
 class OrganizationGetSchema(BaseModel):
-    organization_name: str = Field(..., description="Name of organization to fetch")
\ No newline at end of file
+    organization_name: str = Field(..., description="Name of organization to fetch")
+class OrganizationExportSchema(BaseModel):
+    organization_name: str = Field(..., description="Name of organization to export")
+
+class OrganizationRestoreSchema(BaseModel):
+    backup_id: Optional[str] = Field(None, pattern=r"^\d{8}_\d{6}(_\d+)?$", description="Backup to restore from (default: newest backup holding the organization)")
+    replace: bool = Field(False, description="Overwrite the organization if it still exists")
+
+# Most organizations one /org/batch-get request may resolve
+MAX_BATCH_GET_ITEMS = 100
+
+class OrganizationBatchGetSchema(BaseModel):
+    names: Optional[List[str]] = Field(None, max_length=MAX_BATCH_GET_ITEMS, description="Organization names to fetch")
+    ids: Optional[List[str]] = Field(None, max_length=MAX_BATCH_GET_ITEMS, description="Organization ids to fetch (instead of names)")
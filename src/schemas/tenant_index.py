@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Union
+
+class IndexKeySchema(BaseModel):
+    field: str = Field(..., min_length=1, description="Document field, dotted for nested fields")
+    direction: Union[int, str] = Field(1, description="1, -1, text, hashed or 2dsphere")
+
+class TenantIndexCreateSchema(BaseModel):
+    keys: List[IndexKeySchema] = Field(..., min_length=1, description="Indexed fields in order")
+    name: Optional[str] = Field(None, min_length=1, max_length=120, description="Index name (default: derived from the keys)")
+    unique: bool = Field(False, description="Reject documents with duplicate keys")
+    sparse: bool = Field(False, description="Skip documents without the indexed fields")
+    partial_filter: Optional[Dict[str, Any]] = Field(None, description="Only index documents matching this filter")
@@ -1,129 +1,182 @@
 #!/usr/bin/env python3
 """
 Database backup script.
-Exports all collections to JSON files.
+Streams the master database (registry plus every org_* tenant collection),
+or a single tenant, into compressed chunk files with a manifest and
+checksums. Interrupted backups can be resumed with --resume.
+
+`incremental` backs up only the changes since the previous backup, read
+from the change stream (replica sets only); restore_db.py rebuilds any
+point in time from a full backup plus its increments.
+
+Chunks are content-addressed and shared between backups, so unchanged
+data is stored once. `gc` applies the retention policy and deletes chunks
+no remaining backup uses; `verify` checks every chunk's checksum.
 """
 
 import sys
 import os
 import json
-import subprocess
-from datetime import datetime
-from pathlib import Path
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.config.settings import settings
+from src.db.backup import BackupEngine, list_backups as list_backup_manifests
+from src.db.backup_store import apply_retention, verify_backups
+from src.db.incremental_backup import IncrementalBackup
+from src.models.organization import OrganizationModel
 from src.utils.logger import logger
 
-def backup_database():
-    """Backup MongoDB database using mongodump"""
+def find_organization(identifier: str):
+    """Organization by id or name"""
+    return OrganizationModel.find_by_id(identifier) or OrganizationModel.find_by_name(identifier)
+
+def backup_database(args) -> bool:
+    """Run (or resume) a backup with the engine"""
     try:
-        # Create backup directory with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = Path(f"backups/{timestamp}")
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        
-        logger.info(f"Starting database backup to {backup_dir}")
-        
-        # Run mongodump command
-        cmd = [
-            "mongodump",
-            "--uri", settings.mongodb_uri,
-            "--db", settings.master_db_name,
-            "--out", str(backup_dir)
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            logger.info(f"✅ Backup completed successfully: {backup_dir}")
-            
-            # Create metadata file
-            metadata = {
-                "backup_timestamp": timestamp,
-                "database": settings.master_db_name,
-                "mongodb_uri": settings.mongodb_uri,
-                "backup_dir": str(backup_dir),
-                "size": get_directory_size(backup_dir)
-            }
-            
-            metadata_file = backup_dir / "metadata.json"
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            logger.info(f"Metadata saved to: {metadata_file}")
-            
-            # Clean up old backups (keep last 7 days)
-            cleanup_old_backups()
-            
-            return True
-        else:
-            logger.error(f"❌ Backup failed: {result.stderr}")
+        organization = None
+        if args.org:
+            organization = find_organization(args.org)
+            if not organization:
+                logger.error(f"❌ Organization '{args.org}' not found")
+                return False
+
+        engine = BackupEngine(
+            root=args.output,
+            workers=args.workers,
+            compression=args.compression,
+            fmt=args.format
+        )
+
+        def report(name, entry):
+            logger.info(f"Backed up {name}: {entry['documents']} documents in {len(entry['chunks'])} chunks")
+
+        manifest = engine.run(backup_id=args.resume, organization=organization, progress=report if args.verbose else None)
+
+        if manifest["status"] != "completed":
+            logger.error(f"❌ Backup {manifest['backup_id']} failed for: {', '.join(manifest['errors'])}")
+            logger.error(f"Resume with: --resume {manifest['backup_id']}")
             return False
-            
+
+        run = manifest.get("last_run", {})
+        logger.info(
+            f"✅ Backup completed: {os.path.join(engine.root, manifest['backup_id'])} "
+            f"({run.get('documents', 0)} documents, {run.get('stored_bytes', 0) / 1_048_576:.2f} MB newly stored, "
+            f"{run.get('reused_chunks', 0)}/{run.get('chunks', 0)} chunks unchanged, "
+            f"{run.get('documents_per_second')} docs/s)"
+        )
+
+        apply_retention(root=engine.root)
+
+        return True
+
     except Exception as e:
         logger.error(f"❌ Backup error: {e}")
         return False
 
-def get_directory_size(path):
-    """Calculate directory size in MB"""
-    total_size = 0
-    for dirpath, dirnames, filenames in os.walk(path):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-            total_size += os.path.getsize(filepath)
-    return f"{total_size / (1024 * 1024):.2f} MB"
-
-def cleanup_old_backups(days_to_keep=7):
-    """Remove backups older than specified days"""
+def incremental_backup(args) -> bool:
+    """Back up the changes since the previous (or --from) backup"""
     try:
-        backup_path = Path("backups")
-        if not backup_path.exists():
-            return
-        
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        
-        for item in backup_path.iterdir():
-            if item.is_dir():
-                try:
-                    # Extract timestamp from directory name
-                    dir_timestamp = datetime.strptime(item.name.split('_')[0], "%Y%m%d")
-                    
-                    if dir_timestamp < cutoff_date:
-                        import shutil
-                        shutil.rmtree(item)
-                        logger.info(f"Removed old backup: {item.name}")
-                except (ValueError, IndexError):
-                    continue
-                    
+        manifest = IncrementalBackup(root=args.output, compression=args.compression).run(parent_id=args.parent)
+        logger.info(
+            f"✅ Incremental backup completed: {manifest['backup_id']} on top of {manifest['parent_id']} "
+            f"({manifest['events']['count']} changes in {len(manifest['events']['by_collection'])} collections)"
+        )
+        apply_retention(root=args.output)
+        return True
+
     except Exception as e:
-        logger.error(f"Error cleaning up old backups: {e}")
+        logger.error(f"❌ Incremental backup error: {e}")
+        return False
 
-def list_backups():
+def collect_garbage(args) -> bool:
+    """Apply the retention policy and sweep unreferenced chunks"""
+    try:
+        result = apply_retention(root=args.output, days=args.days, dry_run=args.dry_run)
+        prefix = "Would remove" if args.dry_run else "Removed"
+        logger.info(
+            f"{prefix} {len(result['removed_backups'])} backups and {result['removed_chunks']} chunks "
+            f"({result['freed_bytes'] / 1_048_576:.2f} MB); kept {len(result['kept_backups'])} backups"
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Garbage collection error: {e}")
+        return False
+
+def verify(args) -> bool:
+    """Check the chunks of the given (default: all) backups"""
+    report = verify_backups(root=args.output, backup_ids=args.backup, workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for backup_id, result in report["backups"].items():
+            print(f"{backup_id} - {result['status']}")
+            for chunk in result.get("bad_chunks", []):
+                print(f"    {chunk}: {report['damaged_chunks'][chunk]}")
+        print(f"\n{report['chunks']} chunks verified in {report['seconds']}s")
+    return report["ok"]
+
+def list_backups(root=None):
     """List all available backups"""
-    backup_path = Path("backups")
-    if not backup_path.exists():
+    backups = list_backup_manifests(root)
+    if not backups:
         print("No backups found")
         return
-    
+
     print("Available backups:")
     print("-" * 60)
-    for item in sorted(backup_path.iterdir()):
-        if item.is_dir():
-            size = get_directory_size(item)
-            print(f"{item.name} - {size}")
+    for backup in backups:
+        if backup["type"] == "incremental":
+            contents = f"{backup['events']} changes since {backup['parent_id']}"
+        else:
+            contents = f"{backup['collections']} collections, {backup['documents']} documents"
+        print(
+            f"{backup['backup_id']} - {backup['type']:<11} {backup['status']:<9} "
+            f"{contents}, {backup['stored_bytes'] / (1024 * 1024):.2f} MB"
+        )
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Back up the master database or one tenant")
+    parser.add_argument("command", nargs="?", choices=["run", "incremental", "list", "gc", "verify"], default="run")
+    parser.add_argument("--org", help="Back up only this organization (id or name)")
+    parser.add_argument("--resume", metavar="BACKUP_ID", help="Backup id to continue if interrupted, or to create")
+    parser.add_argument("--from", dest="parent", metavar="BACKUP_ID", help="Backup an increment continues from (default: latest)")
+    parser.add_argument("--output", default=settings.backup_dir, help="Backup root directory")
+    parser.add_argument("--workers", type=int, default=settings.backup_workers)
+    parser.add_argument("--format", choices=["bson", "ndjson"], default="bson")
+    parser.add_argument("--compression", choices=["zstd", "gzip", "none"], default=None)
+    parser.add_argument("--verbose", action="store_true", help="Log each collection as it finishes")
+    parser.add_argument("--days", type=int, default=settings.backup_retention_days, help="gc: keep backups this recent")
+    parser.add_argument("--dry-run", action="store_true", help="gc: report what would be removed")
+    parser.add_argument("--backup", action="append", metavar="BACKUP_ID", help="verify: only these backups (repeatable)")
+    parser.add_argument("--json", action="store_true", help="verify: print the full report as JSON")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Organization Management Service - Database Backup")
     print("=" * 60)
-    
-    if len(sys.argv) > 1 and sys.argv[1] == "list":
-        list_backups()
+
+    if args.command == "list":
+        list_backups(args.output)
+    elif args.command == "gc":
+        if not collect_garbage(args):
+            sys.exit(1)
+    elif args.command == "verify":
+        if verify(args):
+            print("\n✅ All backups verified")
+        else:
+            print("\n❌ Verification found problems!")
+            sys.exit(1)
+    elif args.command == "incremental":
+        if incremental_backup(args):
+            print("\n✅ Incremental backup completed successfully!")
+        else:
+            print("\n❌ Incremental backup failed!")
+            sys.exit(1)
     else:
-        if backup_database():
+        if backup_database(args):
             print("\n✅ Backup completed successfully!")
         else:
             print("\n❌ Backup failed!")
-            sys.exit(1)
\ No newline at end of file
+            sys.exit(1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Backup throughput benchmark.
+Runs full backups of the master database into a scratch directory for each
+worker count and compression, reporting documents/s, MB/s and the
+compression ratio. Scratch backups are deleted afterwards.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.db.backup import BackupEngine, CHUNK_STORE_DIR, zstandard
+
+def run_benchmark(worker_counts: list, compressions: list, fmt: str, chunk_mb: int):
+    scratch = tempfile.mkdtemp(prefix="backup-benchmark-")
+    try:
+        print(f"{'workers':>8}{'codec':>7}{'docs':>10}{'raw MB':>9}{'stored MB':>11}{'ratio':>7}{'docs/s':>10}{'MB/s':>8}")
+        print("-" * 70)
+        for compression in compressions:
+            for workers in worker_counts:
+                engine = BackupEngine(
+                    root=scratch, workers=workers, compression=compression, fmt=fmt,
+                    chunk_bytes=chunk_mb * 1024 * 1024
+                )
+                manifest = engine.run(backup_id=f"bench_{compression}_{workers}")
+                run = manifest["last_run"]
+                ratio = run["raw_bytes"] / run["stored_bytes"] if run["stored_bytes"] else 0.0
+                print(
+                    f"{workers:>8}{compression:>7}{run['documents']:>10}"
+                    f"{run['raw_bytes'] / 1_048_576:>9.1f}{run['stored_bytes'] / 1_048_576:>11.1f}{ratio:>7.2f}"
+                    f"{run['documents_per_second'] or 0:>10.0f}{run['raw_mb_per_second'] or 0:>8.1f}"
+                )
+                # Drop the chunk store too, or the next run would only reference these chunks
+                shutil.rmtree(os.path.join(scratch, manifest["backup_id"]))
+                shutil.rmtree(os.path.join(scratch, CHUNK_STORE_DIR), ignore_errors=True)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark backup throughput")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument(
+        "--compression", default="zstd,gzip" if zstandard is not None else "gzip",
+        help="Comma-separated codecs (zstd, gzip, none)"
+    )
+    parser.add_argument("--format", choices=["bson", "ndjson"], default="bson")
+    parser.add_argument("--chunk-mb", type=int, default=16)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Organization Management Service - Backup Benchmark")
+    print("=" * 70)
+    run_benchmark(
+        [int(count) for count in args.workers.split(",")],
+        args.compression.split(","),
+        args.format,
+        args.chunk_mb
+    )
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark.
+Reports bytes on the wire and CPU time per response for each available
+encoding and level, using /org/get, /org/list and OpenAPI-sized payloads.
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.middleware.compression_middleware import available_encoders
+from src.scripts.benchmark_json import make_organization, fast_get, fast_list
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 11],
+    "zstd": [1, 3, 19],
+}
+
+def compress_once(encoder_class, level: int, payload: bytes) -> bytes:
+    return encoder_class(level).finish(payload)
+
+def cpu_us(func, iterations: int) -> float:
+    """Return CPU microseconds per call"""
+    func()  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1_000_000
+
+def build_payloads(list_size: int) -> list:
+    payloads = [
+        ("/org/get", fast_get(make_organization(0))),
+        (f"/org/list ({list_size})", fast_list([make_organization(i) for i in range(list_size)])),
+    ]
+    try:
+        from main import app
+        from src.utils.json_response import dumps
+        payloads.append(("/openapi.json", dumps(app.openapi())))
+    except Exception as e:
+        print(f"Skipping /openapi.json payload: {str(e)}")
+    return payloads
+
+def run_benchmark(iterations: int, list_size: int):
+    encoders = available_encoders()
+    missing = sorted(set(LEVELS) - set(encoders))
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+
+    print(f"{'payload':<20}{'encoding':>10}{'level':>7}{'bytes':>10}{'ratio':>8}{'cpu µs':>10}")
+    print("-" * 65)
+    for name, payload in build_payloads(list_size):
+        print(f"{name:<20}{'identity':>10}{'-':>7}{len(payload):>10}{1.0:>8.2f}{0.0:>10.1f}")
+        for encoding, levels in LEVELS.items():
+            if encoding not in encoders:
+                continue
+            for level in levels:
+                compressed = compress_once(encoders[encoding], level, payload)
+                us = cpu_us(lambda: compress_once(encoders[encoding], level, payload), iterations)
+                ratio = len(payload) / len(compressed)
+                print(f"{'':<20}{encoding:>10}{level:>7}{len(compressed):>10}{ratio:>8.2f}{us:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--list-size", type=int, default=50, help="Organizations per /org/list page")
+    args = parser.parse_args()
+
+    print("=" * 65)
+    print("Organization Management Service - Compression Benchmark")
+    print("=" * 65)
+    run_benchmark(args.iterations, args.list_size)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Organization search benchmark.
+Seeds a scratch master database with synthetic organizations, then times
+OrganizationService._search for exact, prefix, typo and single-letter
+queries, reporting p50/p95/max latency in milliseconds. The scratch
+database is dropped afterwards.
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.utils.search import search_fields
+
+WORDS = [
+    "acme", "apex", "atlas", "blue", "bright", "cedar", "city", "cloud", "core", "crest",
+    "delta", "east", "echo", "forge", "global", "green", "harbor", "iron", "labs", "lake",
+    "metro", "north", "nova", "oak", "orbit", "peak", "pine", "prime", "river", "rock",
+    "silver", "solar", "south", "star", "stone", "summit", "tech", "urban", "valley", "west"
+]
+SUFFIXES = ["inc", "llc", "gmbh", "ltd", "group", "systems", "partners", "holdings"]
+
+def seed(count: int, batch_size: int = 5000) -> list:
+    """Insert `count` organizations with search fields; returns their names"""
+    from src.models.organization import OrganizationModel
+    collection = OrganizationModel.get_collection()
+    OrganizationModel.create_indexes()
+    rng = random.Random(42)
+    names, batch = [], []
+    for index in range(count):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(SUFFIXES).title()} {index}"
+        names.append(name)
+        batch.append({
+            "organization_name": name,
+            "admin_email": f"admin{index}@search-benchmark.example.com",
+            "collection_name": f"org_search_benchmark_{index}",
+            "created_at": datetime.utcnow(),
+            **search_fields(name)
+        })
+        if len(batch) == batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    return names
+
+def typo(name: str, rng: random.Random) -> str:
+    """Drop one letter of the first word"""
+    first, _, rest = name.partition(" ")
+    position = rng.randrange(1, len(first))
+    return f"{first[:position]}{first[position + 1:]} {rest}"
+
+def run_benchmark(count: int, queries: int):
+    from src.services.organization_service import OrganizationService
+    print(f"Seeding {count} organizations...")
+    started = time.perf_counter()
+    names = seed(count)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    rng = random.Random(7)
+    samples = rng.sample(names, min(queries, len(names)))
+    workloads = {
+        "exact": samples,
+        "prefix": [" ".join(name.split()[:2]) for name in samples],
+        "typo": [typo(name, rng) for name in samples],
+        "one letter": [rng.choice(WORDS)[0] for _ in samples],
+    }
+
+    print(f"{'query':>12}{'runs':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'avg hits':>10}")
+    print("-" * 56)
+    for label, terms in workloads.items():
+        timings, hits = [], 0
+        for term in terms:
+            started = time.perf_counter()
+            result = OrganizationService._search(term, 20, 0)
+            timings.append((time.perf_counter() - started) * 1000)
+            hits += result["total"]
+        timings.sort()
+        print(
+            f"{label:>12}{len(timings):>7}{timings[len(timings) // 2]:>9.1f}"
+            f"{timings[int(len(timings) * 0.95)]:>9.1f}{timings[-1]:>9.1f}{hits / len(terms):>10.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark organization search")
+    parser.add_argument("--organizations", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200, help="Queries per workload")
+    parser.add_argument("--database", default="search_benchmark", help="Scratch master database, dropped afterwards")
+    args = parser.parse_args()
+
+    print("=" * 56)
+    print("Organization Management Service - Search Benchmark")
+    print("=" * 56)
+    settings.master_db_name = args.database
+    try:
+        run_benchmark(args.organizations, args.queries)
+    finally:
+        mongo_manager.get_client().drop_database(args.database)
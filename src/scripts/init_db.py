@@ -1,22 +1,97 @@
 #!/usr/bin/env python3
 """
 Database initialization script.
-Creates necessary collections and indexes.
+Creates necessary collections and indexes: the master collections' indexes
+concurrently, then every index declared for tenant collections on each
+collection in the organization registry, with a bounded worker pool.
+Indexes already in place are skipped, so it is safe to re-run.
+
+Run with --non-interactive (or without a terminal) in deployments.
 """
 
 import sys
 import os
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from src.config.settings import settings
 from src.db.mongo import mongo_manager
 from src.models.organization import OrganizationModel
 from src.models.admin_user import AdminUserModel
+from src.models.job import JobModel
+from src.models.tenant_usage import TenantUsageModel
+from src.models.tenant_migration import TenantMigrationModel
+from src.models.tenant_index import TenantIndexModel
+from src.services.index_service import TenantIndexBootstrap
 from src.utils.logger import logger
 
-def initialize_database():
+MASTER_INDEXES = {
+    "organizations": OrganizationModel.create_indexes,
+    "admin_users": AdminUserModel.create_indexes,
+    "jobs": JobModel.create_indexes,
+    "tenant_usage": lambda: TenantUsageModel.create_indexes(settings.usage_retention_days),
+    "tenant_migrations": TenantMigrationModel.create_indexes,
+    "tenant_indexes": TenantIndexModel.create_indexes
+}
+
+def create_master_indexes(workers: int) -> bool:
+    """Create the master collections' indexes concurrently, timing each collection"""
+    def create(name):
+        started = time.monotonic()
+        MASTER_INDEXES[name]()
+        return time.monotonic() - started
+
+    ok = True
+    with ThreadPoolExecutor(max_workers=min(workers, len(MASTER_INDEXES)), thread_name_prefix="init-db") as pool:
+        futures = {name: pool.submit(create, name) for name in MASTER_INDEXES}
+        for name, future in futures.items():
+            try:
+                logger.info(f"✅ {name}: indexes ready in {future.result() * 1000:.0f} ms")
+            except Exception as e:
+                ok = False
+                logger.error(f"❌ {name}: {e}")
+    return ok
+
+def bootstrap_tenant_indexes(workers: int, verbose: bool = False, report_path: str = None) -> bool:
+    """Ensure the declared indexes on every tenant collection"""
+    report = open(report_path, "w", encoding="utf-8") if report_path else None
+
+    def on_collection(record):
+        if report:
+            report.write(json.dumps(record) + "\n")
+        if record["status"] == "failed":
+            logger.error(f"❌ {record['collection_name']}: {record['error']}")
+        elif record["status"] == "missing":
+            logger.warning(f"⚠️ {record['collection_name']} is in the registry but does not exist")
+        elif verbose or record["created"]:
+            logger.info(f"{record['collection_name']}: {record['created'] or 'up to date'} in {record['seconds'] * 1000:.0f} ms")
+
+    try:
+        stats = TenantIndexBootstrap(workers=workers).run(on_collection)
+    finally:
+        if report:
+            report.close()
+
+    rate = stats["collections"] / stats["seconds"] if stats["seconds"] else 0
+    logger.info(
+        f"Tenant collections: {stats['collections']} checked, {stats['changed']} indexed, "
+        f"{stats['unchanged']} up to date, {stats['missing']} missing, {stats['failed']} failed "
+        f"in {stats['seconds']:.1f}s ({rate:.0f}/s)"
+    )
+    for record in stats["slowest"][:5]:
+        logger.info(f"  slowest: {record['collection_name']} {record['seconds'] * 1000:.0f} ms")
+    return stats["failed"] == 0
+
+def initialize_database(workers: int = None, skip_tenants: bool = False, verbose: bool = False, report_path: str = None):
     """Initialize database with required collections and indexes"""
     try:
         logger.info("Starting database initialization...")
+        started = time.monotonic()
+        workers = workers or settings.index_bootstrap_workers
         
         # Get master database
         master_db = mongo_manager.get_master_db()
@@ -31,15 +106,17 @@ def initialize_database():
                 logger.info(f"Created collection: {collection}")
         
         # Create indexes
-        OrganizationModel.create_indexes()
-        AdminUserModel.create_indexes()
-        
-        logger.info("✅ Database initialization completed successfully")
-        
-        # Print collection info
-        collections = master_db.list_collection_names()
-        logger.info(f"Available collections: {collections}")
+        ok = create_master_indexes(workers)
+        backfilled = OrganizationModel.backfill_search_fields()
+        if backfilled:
+            logger.info(f"Added search fields to {backfilled} organizations")
+        if not skip_tenants:
+            ok = bootstrap_tenant_indexes(workers, verbose, report_path) and ok
+        if not ok:
+            logger.error("❌ Database initialization finished with errors")
+            return False
         
+        logger.info(f"✅ Database initialization completed successfully in {time.monotonic() - started:.1f}s")
         return True
         
     except Exception as e:
@@ -50,7 +127,6 @@ def create_sample_data():
     """Create sample organization for testing"""
     try:
         from src.services.organization_service import OrganizationService
-        from datetime import datetime
         
         sample_org = {
             "organization_name": "SampleOrganization",
@@ -65,7 +141,7 @@ def create_sample_data():
         )
         
         if not existing:
-            result = OrganizationService.create_organization(sample_org)
+            result = asyncio.run(OrganizationService.create_organization(sample_org))
             logger.info(f"✅ Created sample organization: {result}")
         else:
             logger.info("ℹ Sample organization already exists")
@@ -77,16 +153,29 @@ def create_sample_data():
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create collections and indexes")
+    parser.add_argument("--non-interactive", "-y", action="store_true", help="Never prompt (implied without a terminal)")
+    parser.add_argument("--sample-data", action="store_true", help="Create the sample organization without asking")
+    parser.add_argument("--workers", type=int, help="Collections indexed concurrently")
+    parser.add_argument("--skip-tenants", action="store_true", help="Only index the master collections")
+    parser.add_argument("--verbose", action="store_true", help="Log every tenant collection, not just changed ones")
+    parser.add_argument("--report", help="Write per-collection timings to this JSON lines file")
+    args = parser.parse_args()
+    interactive = not args.non_interactive and sys.stdin.isatty()
+    
     print("=" * 60)
     print("Organization Management Service - Database Initialization")
     print("=" * 60)
     
-    if initialize_database():
-        print("\nWould you like to create sample data? (y/n): ", end="")
-        choice = input().strip().lower()
-        
-        if choice == 'y':
+    if initialize_database(args.workers, args.skip_tenants, args.verbose, args.report):
+        if args.sample_data:
             create_sample_data()
+        elif interactive:
+            print("\nWould you like to create sample data? (y/n): ", end="")
+            choice = input().strip().lower()
+            
+            if choice == 'y':
+                create_sample_data()
         
         print("\n✅ Database setup completed!")
         print("\nYou can now start the application with:")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tenant index management script.
+Declares secondary indexes on one tenant collection (--org) or on all of
+them, and builds them here with the same throttling the background job
+uses. Declared indexes are also created on every new tenant collection.
+Re-running `build` retries the collections a previous build failed on.
+"""
+
+import sys
+import os
+import json
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.models.tenant_index import TenantIndexModel
+from src.services.index_service import TenantIndexBuilder, declare_index
+from src.utils.logger import logger
+
+def parse_key(value: str) -> list:
+    """field or field:direction, e.g. sku, created_at:-1 or title:text"""
+    field, _, direction = value.partition(":")
+    direction = direction or "1"
+    return [field, int(direction) if direction.lstrip("-").isdigit() else direction]
+
+def report(progress: dict):
+    logger.info(
+        f"{progress['phase']}: {progress['changed'] + progress['unchanged']}/{progress['total_collections']} "
+        f"collections, {progress['failed']} failed"
+    )
+
+def list_indexes(args) -> bool:
+    for spec in TenantIndexModel.list(args.org, include_global=not args.org or args.all):
+        scope = spec["organization_id"] or "all tenants"
+        options = ", ".join(option for option in ("unique", "sparse") if spec.get(option))
+        print(f"{spec['name']:<30} {scope:<26} {spec['keys']} {options}")
+        if spec.get("build"):
+            build = spec["build"]
+            print(f"{'':<30} last build: {build['changed']} built, {build['unchanged']} existing, {build['failed']} failed")
+    return True
+
+def build_index(args, spec: dict) -> bool:
+    builder = TenantIndexBuilder(workers=args.workers, rate=args.rate)
+    result = builder.build(spec, progress=report)
+    TenantIndexModel.update_build(spec["_id"], {
+        "job_id": None,
+        "changed": result["changed"],
+        "unchanged": result["unchanged"],
+        "failed": result["failed"]
+    })
+    if result["failures"]:
+        print(json.dumps(result["failures"], indent=2))
+    if result["failed"]:
+        logger.error(f"❌ Index '{spec['name']}' failed on {result['failed']} collections")
+        return False
+    logger.info(f"✅ Index '{spec['name']}' built on {result['changed']} collections in {result['seconds']}s")
+    return True
+
+def create_index(args) -> bool:
+    try:
+        spec = declare_index(
+            args.org,
+            [parse_key(key) for key in args.key],
+            name=args.name,
+            unique=args.unique,
+            sparse=args.sparse,
+            partial_filter=json.loads(args.partial_filter) if args.partial_filter else None,
+            created_by="cli"
+        )
+    except ValueError as e:
+        logger.error(f"❌ {str(e)}")
+        return False
+    return build_index(args, spec)
+
+def rebuild_index(args) -> bool:
+    spec = TenantIndexModel.find(args.org, args.name)
+    if not spec:
+        logger.error(f"❌ Index '{args.name}' is not declared")
+        return False
+    return build_index(args, spec)
+
+def drop_index(args) -> bool:
+    spec = TenantIndexModel.find(args.org, args.name)
+    if not spec:
+        logger.error(f"❌ Index '{args.name}' is not declared")
+        return False
+    TenantIndexModel.delete(args.org, args.name)
+    result = TenantIndexBuilder(workers=args.workers, rate=args.rate).drop(spec, progress=report)
+    if result["failed"]:
+        logger.error(f"❌ Dropping '{args.name}' failed on {result['failed']} collections")
+        return False
+    logger.info(f"✅ Index '{args.name}' dropped from {result['changed']} collections")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage secondary indexes on tenant collections")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(subparser):
+        subparser.add_argument("--org", help="Organization id (default: all tenants)")
+        subparser.add_argument("--workers", type=int, help="Collections indexed in parallel")
+        subparser.add_argument("--rate", type=float, help="Index builds started per second")
+
+    list_parser = subparsers.add_parser("list", help="List declared indexes")
+    list_parser.add_argument("--org", help="Organization id (default: indexes declared for all tenants)")
+    list_parser.add_argument("--all", action="store_true", help="With --org, also list the all-tenant indexes")
+
+    create_parser = subparsers.add_parser("create", help="Declare an index and build it")
+    add_common(create_parser)
+    create_parser.add_argument("--key", action="append", required=True, help="field[:direction], repeatable and in order")
+    create_parser.add_argument("--name", help="Index name (default: derived from the keys)")
+    create_parser.add_argument("--unique", action="store_true")
+    create_parser.add_argument("--sparse", action="store_true")
+    create_parser.add_argument("--partial-filter", help="JSON filter of the documents to index")
+
+    build_parser = subparsers.add_parser("build", help="Build a declared index on collections missing it")
+    add_common(build_parser)
+    build_parser.add_argument("--name", required=True)
+
+    drop_parser = subparsers.add_parser("drop", help="Forget an index and drop it")
+    add_common(drop_parser)
+    drop_parser.add_argument("--name", required=True)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Organization Management Service - Tenant Indexes")
+    print("=" * 60)
+
+    commands = {"list": list_indexes, "create": create_index, "build": rebuild_index, "drop": drop_index}
+    if not commands[args.command](args):
+        sys.exit(1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tenant collection id migration script.
+Moves tenant collections from name-derived names (org_<sanitized name>) to
+id-based names (org_<organization id>) and links admin users by organization id.
+Safe to re-run: already migrated organizations are skipped.
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.models.organization import OrganizationModel
+from src.models.admin_user import AdminUserModel
+from src.services.organization_service import OrganizationService, run_rename_collection_job
+from src.services.job_service import JobService
+from src.utils.logger import logger
+
+def migrate_organization(org: dict, dry_run: bool = False, background: bool = False) -> bool:
+    """Migrate a single organization, returns True if anything changed"""
+    org_id = str(org["_id"])
+    target_collection = OrganizationService.collection_name_for(org_id)
+    changed = False
+    
+    if org["collection_name"] != target_collection:
+        changed = True
+        logger.info(f"{org['organization_name']}: {org['collection_name']} -> {target_collection}")
+        if not dry_run:
+            payload = {
+                "organization_id": org_id,
+                "old_collection_name": org["collection_name"],
+                "new_collection_name": target_collection
+            }
+            if background:
+                job_id = asyncio.run(
+                    JobService.enqueue("rename_collection", payload, organization_id=org_id)
+                )
+                logger.info(f"Enqueued rename job {job_id}")
+            else:
+                run_rename_collection_job(payload, job_id=None)
+    
+    admin_user = AdminUserModel.find_by_id(org["admin_user_id"])
+    if admin_user and admin_user.get("organization_id") != org_id:
+        changed = True
+        if not dry_run:
+            AdminUserModel.link_organization(org["admin_user_id"], org_id)
+    
+    return changed
+
+def migrate_all(dry_run: bool = False, background: bool = False) -> dict:
+    """Migrate every organization in the master database"""
+    stats = {"checked": 0, "migrated": 0, "skipped": 0, "failed": 0}
+    
+    cursor = OrganizationModel.get_collection().find(
+        {},
+        {"organization_name": 1, "collection_name": 1, "admin_user_id": 1, "deletion_job_id": 1}
+    )
+    for org in cursor:
+        stats["checked"] += 1
+        
+        # Organizations being deleted are left alone
+        if org.get("deletion_job_id"):
+            stats["skipped"] += 1
+            continue
+        
+        try:
+            if migrate_organization(org, dry_run=dry_run, background=background):
+                stats["migrated"] += 1
+        except Exception as e:
+            stats["failed"] += 1
+            logger.error(f"❌ Failed to migrate '{org['organization_name']}': {e}")
+    
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move tenant collections to id-based names")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--background", action="store_true", help="Rename collections through the job queue")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("Organization Management Service - Collection Id Migration")
+    print("=" * 60)
+    
+    stats = migrate_all(dry_run=args.dry_run, background=args.background)
+    
+    print(f"\nChecked: {stats['checked']}  Migrated: {stats['migrated']}  "
+          f"Skipped: {stats['skipped']}  Failed: {stats['failed']}")
+    if stats["failed"]:
+        print("\n❌ Migration finished with errors!")
+        sys.exit(1)
+    print("\n✅ Migration completed!")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tenant schema migration script.
+Applies the registered tenant migrations (src/services/migration_service.py)
+to every tenant collection while the service keeps running: tenants are
+migrated in parallel, documents in throttled batches, and progress is
+checkpointed per tenant in the tenant_migrations collection. Interrupting
+the script (Ctrl+C) finishes the current batches; re-running it resumes
+each tenant where it stopped. Safe to run on several hosts at once.
+"""
+
+import sys
+import os
+import json
+import signal
+import asyncio
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.services.migration_service import MigrationService, TenantMigrationRunner
+from src.utils.logger import logger
+
+def show_status() -> bool:
+    """Print registered migrations and tenant counts per schema version"""
+    try:
+        status = asyncio.run(MigrationService.status())
+        print(f"Current schema version: {status['current_version']}")
+        for migration in status["migrations"]:
+            print(f"  {migration['version']:<10} {migration['description']}")
+        print(f"\nOrganizations: {status['organizations']}")
+        for group in status["tenants"]:
+            print(f"  schema {group['schema_version']:<10} {group['status']:<10} "
+                  f"{group['tenants']} tenants, {group['documents']} documents migrated")
+        for failure in status["failed"]:
+            print(f"  ❌ {failure['collection_name']} at {failure.get('migration')}: {failure['error']}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to read migration status: {str(e)}")
+        return False
+
+def run_migrations(args) -> bool:
+    """Migrate tenants to the target schema version"""
+    try:
+        runner = TenantMigrationRunner(
+            workers=args.workers,
+            batch_size=args.batch_size,
+            rate=args.rate,
+            target_version=args.to
+        )
+        signal.signal(signal.SIGINT, lambda *_: (logger.info("Stopping after the current batches..."), runner.stop()))
+        stats = runner.run(args.org)
+        print(json.dumps(stats, indent=2))
+        if stats["failed"]:
+            logger.error(f"❌ {stats['failed']} tenants failed to migrate; see the status command")
+            return False
+        logger.info(f"✅ Migrated {stats['documents']} documents in {stats['migrated']} tenants")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate tenant collections to the current schema")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Show registered migrations and tenant schema versions")
+
+    run_parser = subparsers.add_parser("run", help="Apply pending migrations")
+    run_parser.add_argument("--to", help="Schema version to stop at (default: the newest)")
+    run_parser.add_argument("--org", action="append", help="Organization id to migrate (repeatable; default: all)")
+    run_parser.add_argument("--workers", type=int, help="Tenants migrated in parallel")
+    run_parser.add_argument("--batch-size", type=int, help="Documents read per batch")
+    run_parser.add_argument("--rate", type=float, help="Documents per second across all workers")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Organization Management Service - Tenant Schema Migration")
+    print("=" * 60)
+
+    if args.command == "status":
+        ok = show_status()
+    else:
+        ok = run_migrations(args)
+    if not ok:
+        sys.exit(1)
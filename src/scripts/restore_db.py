@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Database restore script.
+Rebuilds the master database as of a point in time from the newest full
+backup taken before it plus the incremental backups that follow, replaying
+their changes in parallel. Restores into a separate database by default;
+point the service at it (MASTER_DB_NAME) or copy back once verified.
+
+With --org, recreates a single organization (registry entry, admin user
+and tenant collection) in the live master database from the newest backup
+holding it, while every other organization stays online.
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.db.restore import RestoreEngine
+from src.models.organization import OrganizationModel
+from src.models.admin_user import AdminUserModel
+from src.utils.logger import logger
+
+def restore_organization(args) -> bool:
+    """Recreate one organization in the live master database"""
+    try:
+        engine = RestoreEngine(mongo_manager.get_master_db(), root=args.input, workers=args.workers)
+
+        def report(progress):
+            total = progress["total_documents"] or 1
+            logger.info(
+                f"{progress['phase']}: {progress['documents']}/{progress['total_documents']} documents "
+                f"({100 * progress['documents'] / total:.0f}%)"
+            )
+
+        result = engine.restore_tenant(args.org, backup_id=args.backup, replace=args.replace, progress=report)
+        # Running instances cache lookups in Redis when CACHE_BACKEND=redis
+        OrganizationModel.invalidate_cache(args.org, result["organization_name"], result["admin_email"])
+        AdminUserModel.invalidate_cache(result["admin_user_id"], result["admin_email"])
+        logger.info(
+            f"✅ Restored organization '{result['organization_name']}' from {result['backup_id']}: "
+            f"{result['documents']} documents in {result['seconds']}s"
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Restore error: {e}")
+        return False
+
+def restore_database(args) -> bool:
+    """Restore the chain covering --until (or ending at --backup) into --target-db"""
+    try:
+        until = datetime.fromisoformat(args.until) if args.until else None
+        target_db = args.target_db or f"{settings.master_db_name}_restored"
+        db = mongo_manager.get_client()[target_db]
+        if db.list_collection_names() and not args.force:
+            logger.error(f"❌ Database '{target_db}' is not empty; pass --force to restore into it anyway")
+            return False
+
+        engine = RestoreEngine(db, root=args.input, workers=args.workers)
+        result = engine.restore(until=until, backup_id=args.backup)
+        logger.info(
+            f"✅ Restored {target_db} from {result['base_id']} + {len(result['increments'])} increments: "
+            f"{result['documents']} documents, {result['events']} changes in {result['seconds']}s"
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Restore error: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Restore the master database to a point in time")
+    parser.add_argument("--until", help="UTC time to restore to, ISO 8601 (default: latest backup)")
+    parser.add_argument("--backup", metavar="BACKUP_ID", help="Restore the chain ending at this backup instead")
+    parser.add_argument("--org", metavar="ORGANIZATION_ID", help="Restore only this organization, into the live database")
+    parser.add_argument("--replace", action="store_true", help="With --org, overwrite the organization if it exists")
+    parser.add_argument("--target-db", help="Database to restore into (default: <master db>_restored)")
+    parser.add_argument("--input", default=settings.backup_dir, help="Backup root directory")
+    parser.add_argument("--workers", type=int, default=settings.backup_workers)
+    parser.add_argument("--force", action="store_true", help="Restore into a database that already has collections")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Organization Management Service - Database Restore")
+    print("=" * 60)
+
+    if restore_organization(args) if args.org else restore_database(args):
+        print("\n✅ Restore completed successfully!")
+    else:
+        print("\n❌ Restore failed!")
+        sys.exit(1)
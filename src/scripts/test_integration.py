@@ -76,7 +76,16 @@ def test_full_organization_lifecycle():
         delete_response = client.delete("/org/delete", json={
             "organization_name": "UpdatedLifecycleOrg"
         }, headers=new_headers)
-        assert delete_response.status_code == 200
+        assert delete_response.status_code == 202
+        job_id = delete_response.json()["job_id"]
+        
+        # Deletion runs as a background job
+        for _ in range(50):
+            job = client.get(f"/jobs/{job_id}", headers=new_headers).json()
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.2)
+        assert job["status"] == "succeeded"
         print("Organization deleted successfully")
         
         # 7. Verify organization is deleted
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Index coverage verification script.
+Runs every master database query issued by the models and routes through
+explain and reports collection scans, in-memory sorts and unused indexes.
+Exits non-zero when any are found, so it can gate CI.
+"""
+
+import sys
+import os
+import json
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.db.index_coverage import verify_index_coverage
+from src.models.organization import OrganizationModel
+from src.models.admin_user import AdminUserModel
+from src.models.tenant_usage import TenantUsageModel
+from src.config.settings import settings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify master database queries are index-backed")
+    parser.add_argument("--create-indexes", action="store_true", help="Apply the model index definitions first")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Organization Management Service - Index Coverage")
+    print("=" * 60)
+
+    if args.create_indexes:
+        OrganizationModel.create_indexes()
+        AdminUserModel.create_indexes()
+        TenantUsageModel.create_indexes(settings.usage_retention_days)
+
+    report = verify_index_coverage()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        for query in report["queries"]:
+            print(f"{query['query']:<45} {query['collection']:<14} {query['plan']}")
+
+    print(f"\nCaptured {report['captured']} queries")
+    if report["problems"]:
+        for problem in report["problems"]:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    print("\n✅ All queries are index-backed!")
@@ -1,21 +1,33 @@
+import asyncio
+import threading
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 from src.models.admin_user import AdminUserModel
 from src.models.organization import OrganizationModel
-from src.utils.password import verify_password
+from src.utils.password import verify_password, password_needs_update, hash_password
 from src.utils.jwt import create_access_token
 from src.config.settings import settings
 from src.utils.logger import logger
+from src.utils.tracing import traced
+
+# Keep references so pending rehash tasks are not garbage collected
+_rehash_tasks: Set[asyncio.Future] = set()
 
 class AdminService:
     """Service for admin authentication and management"""
     
+    rehash_stats: Dict[str, int] = {"scheduled": 0, "completed": 0, "skipped": 0, "failed": 0}
+    # Rehashes finish on executor threads
+    _rehash_stats_lock = threading.Lock()
+    
     @staticmethod
+    @traced()
     async def authenticate_admin(email: str, password: str) -> Optional[Dict[str, Any]]:
         """Authenticate admin user"""
         try:
-            # Find admin user
-            admin_user = AdminUserModel.find_by_email(email)
+            # Find admin user; off the event loop so a burst of logins for
+            # the same admin can share one query. The hash is never cached.
+            admin_user = await asyncio.to_thread(AdminUserModel.find_credentials_by_email, email)
             if not admin_user:
                 return None
             
@@ -27,8 +39,18 @@ class AdminService:
             if not admin_user.get("is_active", True):
                 raise ValueError("Admin account is deactivated")
             
-            # Get organization info
-            org_data = OrganizationModel.find_by_name(admin_user["organization_name"])
+            # Upgrade hashes below the cost floor off the request path
+            if password_needs_update(admin_user["hashed_password"]):
+                AdminService.schedule_rehash(
+                    str(admin_user["_id"]), password, admin_user["hashed_password"]
+                )
+            
+            # Get organization info; admins created before stable collection
+            # ids only reference the organization by name
+            if admin_user.get("organization_id"):
+                org_data = await asyncio.to_thread(OrganizationModel.find_by_id, admin_user["organization_id"])
+            else:
+                org_data = await asyncio.to_thread(OrganizationModel.find_by_name, admin_user["organization_name"])
             if not org_data:
                 raise ValueError("Organization not found")
             
@@ -44,6 +66,32 @@ class AdminService:
             return None
     
     @staticmethod
+    def schedule_rehash(admin_id: str, password: str, old_hash: str):
+        """Rehash a password with the current cost in a worker thread"""
+        future = asyncio.get_running_loop().run_in_executor(
+            None, AdminService._rehash_password, admin_id, password, old_hash
+        )
+        _rehash_tasks.add(future)
+        future.add_done_callback(_rehash_tasks.discard)
+        AdminService.count_rehash("scheduled")
+    
+    @staticmethod
+    def count_rehash(outcome: str):
+        with AdminService._rehash_stats_lock:
+            AdminService.rehash_stats[outcome] += 1
+    
+    @staticmethod
+    def _rehash_password(admin_id: str, password: str, old_hash: str):
+        try:
+            result = AdminUserModel.replace_password_hash(admin_id, old_hash, hash_password(password))
+            # Not modified when the password changed since the login started
+            AdminService.count_rehash("completed" if result.modified_count else "skipped")
+        except Exception as e:
+            AdminService.count_rehash("failed")
+            logger.error(f"Password rehash failed for admin {admin_id}: {str(e)}")
+    
+    @staticmethod
+    @traced()
     async def login_admin(email: str, password: str) -> Optional[Dict[str, Any]]:
         """Login admin and return JWT token"""
         try:
@@ -75,6 +123,7 @@ class AdminService:
             return None
     
     @staticmethod
+    @traced()
     async def verify_token(token: str) -> Optional[Dict[str, Any]]:
         """Verify JWT token and return admin info"""
         try:
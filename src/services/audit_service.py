@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from src.config.settings import settings
+from src.models.audit_log import AuditLogModel
+from src.utils.logger import logger
+
+class AuditWriter:
+    """
+    Buffers audit events in memory and writes them in batches.
+
+    Events are queued as they happen and written with insert_many once
+    `batch_size` are waiting or every `flush_interval` seconds, whichever
+    comes first. The buffer holds at most `max_buffer` events: when
+    MongoDB falls behind, `record` waits up to `enqueue_timeout` seconds
+    for room (backpressure on the request), and only then drops the event,
+    logging it so it is not lost silently. Failed batches stay queued and
+    are retried on the next flush; stop() flushes what is left.
+    """
+
+    def __init__(
+        self,
+        max_buffer: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        enqueue_timeout: Optional[float] = None
+    ):
+        self.max_buffer = max_buffer or settings.audit_buffer_size
+        self.batch_size = batch_size or settings.audit_batch_size
+        self.flush_interval = flush_interval or settings.audit_flush_interval_seconds
+        self.enqueue_timeout = settings.audit_enqueue_timeout_seconds if enqueue_timeout is None else enqueue_timeout
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "flushes": 0, "flush_errors": 0}
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._partitions = set()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Audit writer started")
+
+    async def stop(self):
+        """Stop the writer after a final flush"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        logger.info("Audit writer stopped")
+
+    @staticmethod
+    def make_event(
+        event: str,
+        organization_id: Optional[str],
+        actor: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return {
+            "_id": ObjectId(),
+            "at": datetime.utcnow(),
+            "event": event,
+            "organization_id": organization_id,
+            "actor": actor,
+            "details": details or {}
+        }
+
+    def _offer(self, event: Dict[str, Any]) -> bool:
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                return False
+            self._buffer.append(event)
+            self.stats["recorded"] += 1
+            full_batch = len(self._buffer) >= self.batch_size
+        if full_batch:
+            self._wake()
+        return True
+
+    def _wake(self):
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _drop(self, event: Dict[str, Any]) -> bool:
+        with self._lock:
+            self.stats["dropped"] += 1
+        logger.error(f"❌ Audit buffer full, dropped event: {event['event']} {event['organization_id']} {event['details']}")
+        return False
+
+    async def record(
+        self,
+        event: str,
+        organization_id: Optional[str],
+        actor: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Queue an event, waiting for room while the buffer is full; False if dropped"""
+        if not settings.audit_enabled:
+            return False
+        audit_event = self.make_event(event, organization_id, actor, details)
+        deadline = time.monotonic() + self.enqueue_timeout
+        while not self._offer(audit_event):
+            self._wake()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.running:
+                return self._drop(audit_event)
+            await asyncio.sleep(min(remaining, 0.05))
+        return True
+
+    def record_nowait(
+        self,
+        event: str,
+        organization_id: Optional[str],
+        actor: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Queue an event from a worker thread without waiting; False if dropped"""
+        if not settings.audit_enabled:
+            return False
+        audit_event = self.make_event(event, organization_id, actor, details)
+        return self._offer(audit_event) or self._drop(audit_event)
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write every queued event in batches; returns events written"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            return await self._flush()
+
+    async def _flush(self) -> int:
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._buffer[i] for i in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return written
+            try:
+                partitions = await asyncio.to_thread(AuditLogModel.insert_batch, batch)
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                logger.error(f"❌ Failed to write {len(batch)} audit events: {str(e)}")
+                return written
+            with self._lock:
+                # Only flushes remove events, one at a time, so the batch is still at the front
+                for _ in batch:
+                    self._buffer.popleft()
+                self.stats["written"] += len(batch)
+            self.stats["flushes"] += 1
+            written += len(batch)
+            if not self._partitions.issuperset(partitions):
+                # First write to a new month: expire the old ones
+                self._partitions.update(partitions)
+                await self.apply_retention()
+
+    async def apply_retention(self) -> List[str]:
+        """Drop the partitions older than AUDIT_RETENTION_MONTHS"""
+        if settings.audit_retention_months <= 0:
+            return []
+        cutoff = datetime.utcnow().replace(day=1)
+        for _ in range(settings.audit_retention_months - 1):
+            cutoff = (cutoff - timedelta(days=1)).replace(day=1)
+        try:
+            dropped = await asyncio.to_thread(AuditLogModel.drop_partitions_before, cutoff)
+        except Exception as e:
+            logger.error(f"❌ Failed to expire audit partitions: {str(e)}")
+            return []
+        for name in dropped:
+            logger.info(f"Dropped expired audit partition {name}")
+        return dropped
+
+class AuditService:
+    """Service for reading the audit log"""
+
+    @staticmethod
+    def encode_cursor(event: Dict[str, Any]) -> str:
+        return f"{event['at'].isoformat(timespec='milliseconds')}_{event['_id']}"
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        try:
+            at, event_id = cursor.rsplit("_", 1)
+            return datetime.fromisoformat(at), ObjectId(event_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    async def organization_events(
+        organization_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        events: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """A page of an organization's events, newest first, with the cursor of the next page"""
+        before = AuditService.decode_cursor(cursor) if cursor else None
+        try:
+            page = await asyncio.to_thread(AuditLogModel.page, organization_id, limit, before, events)
+        except Exception as e:
+            logger.error(f"Error reading audit log of organization {organization_id}: {str(e)}")
+            raise
+        next_cursor = AuditService.encode_cursor(page[-1]) if len(page) == limit else None
+        return {
+            "organization_id": organization_id,
+            "events": [{"id": str(event.pop("_id")), **event} for event in page],
+            "next_cursor": next_cursor
+        }
+
+audit_writer = AuditWriter()
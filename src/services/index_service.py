@@ -0,0 +1,399 @@
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.models.job import JobModel
+from src.models.organization import OrganizationModel
+from src.models.tenant_index import TenantIndexModel
+from src.services.job_service import JobService, job_handler
+from src.utils.rate_limiter import RateLimit, RateLimitStore, create_rate_limit_store
+from src.utils.logger import logger
+
+INDEX_DIRECTIONS = (1, -1, "text", "hashed", "2dsphere")
+
+# Failures kept on a build's progress and result; the rest are only counted
+MAX_REPORTED_FAILURES = 50
+
+def index_name(keys: List[List[Any]]) -> str:
+    """Default index name, as MongoDB would generate it"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+def declare_index(
+    organization_id: Optional[str],
+    keys: List[List[Any]],
+    name: Optional[str] = None,
+    unique: bool = False,
+    sparse: bool = False,
+    partial_filter: Optional[Dict[str, Any]] = None,
+    created_by: Optional[str] = None
+) -> Dict[str, Any]:
+    """Validate and store an index spec for one tenant (or all when organization_id is None)"""
+    if not keys:
+        raise ValueError("An index needs at least one key")
+    keys = [[field, direction] for field, direction in keys]
+    for field, direction in keys:
+        if not field or field.startswith("$"):
+            raise ValueError(f"Invalid index field '{field}'")
+        if direction not in INDEX_DIRECTIONS:
+            raise ValueError(f"Invalid direction {direction!r} for '{field}'; use one of {INDEX_DIRECTIONS}")
+    name = name or index_name(keys)
+    if name == "_id_":
+        raise ValueError("The _id index cannot be redeclared")
+    if organization_id is not None and not OrganizationModel.find_by_id(organization_id):
+        raise ValueError(f"Organization '{organization_id}' not found")
+    if TenantIndexModel.name_taken(organization_id, name):
+        raise ValueError(f"Index '{name}' is already declared")
+
+    spec = {
+        "_id": ObjectId(),
+        "organization_id": organization_id,
+        "name": name,
+        "keys": keys,
+        "unique": unique,
+        "sparse": sparse,
+        "partial_filter": partial_filter,
+        "build": None,
+        "created_by": created_by,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    try:
+        TenantIndexModel.create(spec)
+    except DuplicateKeyError:
+        raise ValueError(f"Index '{name}' is already declared")
+    logger.info(f"Declared index '{name}' on {organization_id or 'all tenants'}")
+    return spec
+
+def apply_declared_indexes(collection_name: str, organization_id: str) -> List[str]:
+    """Create the declared indexes on a (new) tenant collection"""
+    specs = TenantIndexModel.list(organization_id)
+    if not specs:
+        return []
+    return mongo_manager.get_master_db()[collection_name].create_indexes(
+        [TenantIndexModel.to_index_model(spec) for spec in specs]
+    )
+
+class TenantIndexBuilder:
+    """
+    Builds (or drops) one declared index across tenant collections.
+
+    Collections are processed `workers` at a time; starting a build on a
+    collection takes a token from a bucket refilled at `rate` per second,
+    shared by every builder (cluster-wide with RATE_LIMIT_BACKEND=redis),
+    so a spec declared for all tenants does not start thousands of index
+    builds at once. Collections that already have the index are skipped,
+    which makes a build safe to re-run after a crash. A failing collection
+    is recorded and the build moves on.
+    """
+
+    RATE_LIMIT_KEY = "tenant-index-builds"
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        rate: Optional[float] = None,
+        rate_limit_store: Optional[RateLimitStore] = None
+    ):
+        self.workers = workers or settings.index_build_workers
+        rate = rate or settings.index_builds_per_second
+        self.limit = RateLimit(rate, max(self.workers, int(rate)))
+        self.store = rate_limit_store or create_rate_limit_store()
+        self._lock = threading.Lock()
+
+    def _organizations(self, organization_id: Optional[str]) -> Iterator[Dict[str, Any]]:
+        if organization_id is not None:
+            organization = OrganizationModel.find_by_id(organization_id)
+            if organization is None:
+                raise ValueError(f"Organization '{organization_id}' not found")
+            yield organization
+            return
+        after_id = None
+        projection = {"collection_name": 1, "deletion_job_id": 1}
+        while page := OrganizationModel.page_after(after_id, 100, projection):
+            yield from page
+            after_id = page[-1]["_id"]
+
+    def _throttle(self):
+        while True:
+            result = self.store.consume(self.RATE_LIMIT_KEY, self.limit)
+            if result.allowed:
+                return
+            time.sleep(result.retry_after)
+
+    @staticmethod
+    def build_one(collection_name: str, spec: Dict[str, Any]) -> bool:
+        """Create the index unless the collection has it; True when created"""
+        collection = mongo_manager.get_master_db()[collection_name]
+        if spec["name"] in collection.index_information():
+            return False
+        collection.create_indexes([TenantIndexModel.to_index_model(spec)])
+        return True
+
+    @staticmethod
+    def drop_one(collection_name: str, spec: Dict[str, Any]) -> bool:
+        """Drop the index if the collection has it; True when dropped"""
+        collection = mongo_manager.get_master_db()[collection_name]
+        if spec["name"] not in collection.index_information():
+            return False
+        collection.drop_index(spec["name"])
+        return True
+
+    def build(self, spec: Dict[str, Any], progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Create the index on every collection the spec applies to"""
+        return self._run(spec, self.build_one, progress)
+
+    def drop(self, spec: Dict[str, Any], progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Drop the index from every collection the spec applied to"""
+        return self._run(spec, self.drop_one, progress)
+
+    def _run(self, spec: Dict[str, Any], action: Callable[[str, Dict[str, Any]], bool], progress) -> Dict[str, Any]:
+        organization_id = spec["organization_id"]
+        started = time.monotonic()
+        state = {
+            "index": spec["name"],
+            "phase": "building" if action == self.build_one else "dropping",
+            "total_collections": 1 if organization_id else OrganizationModel.get_collection().estimated_document_count(),
+            "changed": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "failures": []
+        }
+        last_report = [0.0]
+
+        def report(force: bool = False):
+            if progress and (force or time.monotonic() - last_report[0] >= 1.0):
+                last_report[0] = time.monotonic()
+                progress({**state, "failures": list(state["failures"])})
+
+        def work(organization):
+            self._throttle()
+            try:
+                changed = action(organization["collection_name"], spec)
+            except Exception as e:
+                logger.error(f"❌ Index '{spec['name']}' on {organization['collection_name']} failed: {str(e)}")
+                with self._lock:
+                    state["failed"] += 1
+                    if len(state["failures"]) < MAX_REPORTED_FAILURES:
+                        state["failures"].append({
+                            "organization_id": str(organization["_id"]),
+                            "collection_name": organization["collection_name"],
+                            "error": str(e)
+                        })
+                return
+            with self._lock:
+                state["changed" if changed else "unchanged"] += 1
+                report()
+
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="index-build") as pool:
+            for organization in self._organizations(organization_id):
+                # Collections of organizations being deleted are about to go away
+                if organization.get("deletion_job_id"):
+                    continue
+                if len(in_flight) >= self.workers * 2:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight.add(pool.submit(work, organization))
+            wait(in_flight)
+
+        state["phase"] = "completed"
+        state["seconds"] = round(time.monotonic() - started, 3)
+        report(force=True)
+        logger.info(
+            f"Index '{spec['name']}': {state['changed']} collections changed, "
+            f"{state['unchanged']} unchanged, {state['failed']} failed in {state['seconds']}s"
+        )
+        return state
+
+class TenantIndexBootstrap:
+    """
+    Ensures every declared index exists on every tenant collection.
+
+    Used by init_db after restores, migrations or a new deployment. The
+    specs are loaded once; each tenant collection then costs one
+    listIndexes round trip, plus one createIndexes for the indexes it is
+    missing, on `workers` threads with a bounded queue, so the registry is
+    streamed rather than loaded. Collections that have everything are
+    skipped. Unlike TenantIndexBuilder this is not throttled: it is meant
+    for deploys and maintenance windows, not a live cluster under load.
+    """
+
+    # Slowest collections kept in the result
+    SLOWEST = 10
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or settings.index_bootstrap_workers
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def ensure(collection_name: str, specs: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """Create the specs missing from a collection; None when the collection does not exist"""
+        collection = mongo_manager.get_master_db()[collection_name]
+        existing = collection.index_information()
+        if not existing:
+            return None
+        missing = [spec for spec in specs if spec["name"] not in existing]
+        if missing:
+            collection.create_indexes([TenantIndexModel.to_index_model(spec) for spec in missing])
+        return [spec["name"] for spec in missing]
+
+    def run(self, on_collection: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        global_specs = TenantIndexModel.list()
+        scoped_specs = TenantIndexModel.scoped_by_organization()
+        stats = {"collections": 0, "changed": 0, "unchanged": 0, "missing": 0, "failed": 0, "failures": [], "slowest": []}
+        if not global_specs and not scoped_specs:
+            stats["seconds"] = round(time.monotonic() - started, 3)
+            return stats
+
+        def work(organization):
+            organization_id = str(organization["_id"])
+            record = {"organization_id": organization_id, "collection_name": organization["collection_name"]}
+            collection_started = time.monotonic()
+            try:
+                created = self.ensure(organization["collection_name"], global_specs + scoped_specs.get(organization_id, []))
+                outcome = "missing" if created is None else "changed" if created else "unchanged"
+                record["created"] = created or []
+            except Exception as e:
+                outcome = "failed"
+                record["error"] = str(e)
+            record["status"] = outcome
+            record["seconds"] = round(time.monotonic() - collection_started, 4)
+            with self._lock:
+                stats["collections"] += 1
+                stats[outcome] += 1
+                if outcome == "failed" and len(stats["failures"]) < MAX_REPORTED_FAILURES:
+                    stats["failures"].append(record)
+                stats["slowest"] = sorted(stats["slowest"] + [record], key=lambda item: -item["seconds"])[:self.SLOWEST]
+            if on_collection:
+                on_collection(record)
+
+        in_flight = set()
+        projection = {"collection_name": 1, "deletion_job_id": 1}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="index-bootstrap") as pool:
+            after_id = None
+            while page := OrganizationModel.page_after(after_id, 1000, projection):
+                for organization in page:
+                    if organization.get("deletion_job_id"):
+                        continue
+                    if len(in_flight) >= self.workers * 4:
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    in_flight.add(pool.submit(work, organization))
+                after_id = page[-1]["_id"]
+            wait(in_flight)
+
+        stats["seconds"] = round(time.monotonic() - started, 3)
+        return stats
+
+class IndexService:
+    """Service for declaring secondary indexes on tenant collections"""
+
+    @staticmethod
+    def to_response(spec: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": spec["name"],
+            "scope": "organization" if spec["organization_id"] else "all",
+            "keys": spec["keys"],
+            "unique": spec.get("unique", False),
+            "sparse": spec.get("sparse", False),
+            "partial_filter": spec.get("partial_filter"),
+            "build": spec.get("build"),
+            "created_at": spec["created_at"]
+        }
+
+    @staticmethod
+    async def create_index(organization_id: Optional[str], index_data: Dict[str, Any], created_by: Optional[str] = None) -> Dict[str, Any]:
+        """Declare an index and schedule its background build"""
+        try:
+            spec = declare_index(
+                organization_id,
+                [[key["field"], key["direction"]] for key in index_data["keys"]],
+                name=index_data.get("name"),
+                unique=index_data.get("unique", False),
+                sparse=index_data.get("sparse", False),
+                partial_filter=index_data.get("partial_filter"),
+                created_by=created_by
+            )
+            job_id = await JobService.enqueue(
+                "build_tenant_index",
+                {"index_id": str(spec["_id"])},
+                organization_id=organization_id
+            )
+            return {
+                "message": f"Build of index '{spec['name']}' scheduled",
+                "job_id": job_id
+            }
+        except Exception as e:
+            logger.error(f"Error declaring tenant index: {str(e)}")
+            raise
+
+    @staticmethod
+    async def list_indexes(organization_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Declared indexes of an organization, or the all-tenant ones.
+
+        For an organization, `built` tells whether its collection has the
+        index yet.
+        """
+        try:
+            specs = [IndexService.to_response(spec) for spec in TenantIndexModel.list(organization_id)]
+            if organization_id:
+                organization = OrganizationModel.find_by_id(organization_id)
+                if not organization:
+                    raise ValueError(f"Organization '{organization_id}' not found")
+                existing = mongo_manager.get_master_db()[organization["collection_name"]].index_information()
+                for spec in specs:
+                    spec["built"] = spec["name"] in existing
+            return specs
+        except Exception as e:
+            logger.error(f"Error listing tenant indexes: {str(e)}")
+            raise
+
+    @staticmethod
+    async def drop_index(organization_id: Optional[str], name: str) -> Dict[str, Any]:
+        """Forget a declared index and schedule dropping it"""
+        try:
+            spec = TenantIndexModel.find(organization_id, name)
+            if not spec:
+                raise ValueError(f"Index '{name}' is not declared")
+            TenantIndexModel.delete(organization_id, name)
+            job_id = await JobService.enqueue(
+                "drop_tenant_index",
+                {"organization_id": organization_id, "name": name},
+                organization_id=organization_id
+            )
+            logger.info(f"Scheduled drop of index '{name}' on {organization_id or 'all tenants'}")
+            return {
+                "message": f"Drop of index '{name}' scheduled",
+                "job_id": job_id
+            }
+        except Exception as e:
+            logger.error(f"Error dropping tenant index: {str(e)}")
+            raise
+
+@job_handler("build_tenant_index")
+def run_build_tenant_index_job(payload: Dict[str, Any], job_id: str) -> Dict[str, Any]:
+    """Build a declared index on its tenant collections, reporting progress on the job"""
+    spec = TenantIndexModel.get_collection().find_one({"_id": ObjectId(payload["index_id"])})
+    if not spec:
+        # Dropped before the build started
+        return {"skipped": True}
+    result = TenantIndexBuilder().build(spec, progress=lambda progress: JobModel.update_progress(job_id, progress))
+    TenantIndexModel.update_build(spec["_id"], {
+        "job_id": job_id,
+        "changed": result["changed"],
+        "unchanged": result["unchanged"],
+        "failed": result["failed"],
+        "finished_at": datetime.utcnow()
+    })
+    return result
+
+@job_handler("drop_tenant_index")
+def run_drop_tenant_index_job(payload: Dict[str, Any], job_id: str) -> Dict[str, Any]:
+    """Drop an index that is no longer declared from its tenant collections"""
+    spec = {"organization_id": payload["organization_id"], "name": payload["name"]}
+    return TenantIndexBuilder().drop(spec, progress=lambda progress: JobModel.update_progress(job_id, progress))
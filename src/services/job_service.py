@@ -0,0 +1,209 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable, List
+from src.models.job import JobModel, JOB_STATUS_QUEUED
+from src.config.settings import settings
+from src.utils.logger import logger
+
+# Registered job handlers: job type -> callable(payload, job_id) -> result dict.
+# Handlers run in a worker thread and must be idempotent, because a job whose
+# lease expires is picked up again by another worker.
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], str], Optional[Dict[str, Any]]]] = {}
+
+MAX_RETRY_BACKOFF_SECONDS = 300
+
+def job_handler(job_type: str):
+    """Register a function as the handler for a job type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+class JobService:
+    """Service for enqueuing and inspecting background jobs"""
+
+    @staticmethod
+    async def enqueue(
+        job_type: str,
+        payload: Dict[str, Any],
+        organization_id: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> str:
+        """Persist a new job and return its id"""
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type '{job_type}'")
+
+        now = datetime.utcnow()
+        job_data = {
+            "type": job_type,
+            "payload": payload,
+            "organization_id": organization_id,
+            "status": JOB_STATUS_QUEUED,
+            "attempts": 0,
+            "max_attempts": max_attempts or settings.job_max_attempts,
+            "run_at": now,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "result": None,
+            "error": None,
+            "progress": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None
+        }
+        result = JobModel.create(job_data)
+        job_id = str(result.inserted_id)
+        logger.info(f"Enqueued job {job_id} ({job_type})")
+        return job_id
+
+    @staticmethod
+    async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job status by id"""
+        job = JobModel.find_by_id(job_id)
+        if not job:
+            return None
+        return JobService.serialize_job(job)
+
+    @staticmethod
+    def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a job document into its public representation"""
+        return {
+            "id": str(job["_id"]),
+            "type": job["type"],
+            "status": job["status"],
+            "organization_id": job.get("organization_id"),
+            "attempts": job.get("attempts", 0),
+            "max_attempts": job.get("max_attempts", settings.job_max_attempts),
+            "progress": job.get("progress"),
+            "result": job.get("result"),
+            "error": job.get("error"),
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "finished_at": job.get("finished_at")
+        }
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Exponential backoff for the next attempt"""
+        delay = settings.job_retry_backoff_seconds * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, MAX_RETRY_BACKOFF_SECONDS))
+
+class JobWorker:
+    """Pool of worker coroutines that lease and execute jobs from the queue"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        self.concurrency = concurrency if concurrency is not None else settings.job_workers
+        self.poll_interval = poll_interval or settings.job_poll_interval_seconds
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self._tasks: List[asyncio.Task] = []
+        # worker id -> id of the job its handler thread is running
+        self._running_jobs: Dict[str, Any] = {}
+        self._stopping: Optional[asyncio.Event] = None
+        self._worker_prefix = f"{socket.gethostname()}-{os.getpid()}"
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Start worker coroutines"""
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._stopping = asyncio.Event()
+        for index in range(self.concurrency):
+            worker_id = f"{self._worker_prefix}-{index}"
+            self._tasks.append(asyncio.create_task(self._run(worker_id)))
+        logger.info(f"Started {self.concurrency} job worker(s)")
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Stop workers, giving in-flight jobs `timeout` seconds to finish.
+
+        Handlers run in threads, which cannot be cancelled: a handler still
+        running after the timeout carries on in its thread until it
+        returns, but its outcome is no longer recorded. The job keeps its
+        lease until it expires and is then retried by another worker,
+        which is why handlers must be idempotent.
+        """
+        if not self._tasks:
+            return
+        self._stopping.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for worker_id, job_id in self._running_jobs.items():
+            logger.warning(f"Job {job_id} still running on worker {worker_id} at shutdown; it will be retried")
+        for task in pending:
+            task.cancel()
+        self._tasks = []
+        logger.info("Job workers stopped")
+
+    async def _run(self, worker_id: str):
+        while not self._stopping.is_set():
+            try:
+                abandoned = await asyncio.to_thread(JobModel.fail_abandoned)
+                if abandoned:
+                    logger.error(f"Failed {abandoned} job(s) whose lease expired on their last attempt")
+                job = await asyncio.to_thread(JobModel.claim_next, worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed to claim job: {str(e)}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._execute(job, worker_id)
+
+    async def _execute(self, job: Dict[str, Any], worker_id: str):
+        job_id = job["_id"]
+        handler = JOB_HANDLERS.get(job["type"])
+        if handler is None:
+            await asyncio.to_thread(
+                JobModel.mark_failed, job_id, worker_id, f"No handler for job type '{job['type']}'"
+            )
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id))
+        self._running_jobs[worker_id] = job_id
+        try:
+            result = await asyncio.to_thread(handler, job.get("payload") or {}, str(job_id))
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            attempts = job.get("attempts", 1)
+            if attempts >= job.get("max_attempts", settings.job_max_attempts):
+                logger.error(f"Job {job_id} ({job['type']}) failed permanently: {error}")
+                await asyncio.to_thread(JobModel.mark_failed, job_id, worker_id, error)
+            else:
+                run_at = datetime.utcnow() + JobService.retry_delay(attempts)
+                logger.warning(f"Job {job_id} ({job['type']}) attempt {attempts} failed, retrying: {error}")
+                await asyncio.to_thread(JobModel.mark_retry, job_id, worker_id, error, run_at)
+        else:
+            await asyncio.to_thread(JobModel.mark_succeeded, job_id, worker_id, result)
+            logger.info(f"Job {job_id} ({job['type']}) succeeded")
+        finally:
+            heartbeat.cancel()
+            self._running_jobs.pop(worker_id, None)
+
+    async def _heartbeat(self, job_id, worker_id: str):
+        """Keep the lease alive while the handler is running"""
+        interval = max(self.lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await asyncio.to_thread(JobModel.renew_lease, job_id, worker_id, self.lease_seconds)
+                if not renewed:
+                    logger.warning(f"Job {job_id} lease lost by worker {worker_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to renew lease for job {job_id}: {str(e)}")
+
+job_worker = JobWorker()
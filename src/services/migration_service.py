@@ -0,0 +1,253 @@
+import os
+import uuid
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from pymongo import UpdateOne
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.models.organization import OrganizationModel
+from src.models.tenant_migration import (
+    TenantMigrationModel, MIGRATION_STATUS_COMPLETED, MIGRATION_STATUS_FAILED, MIGRATION_STATUS_PAUSED
+)
+from src.utils.rate_limiter import RateLimit, RateLimitStore, create_rate_limit_store
+from src.utils.logger import logger
+
+# Version of the seed document create_organization wrote before any migration existed
+BASE_SCHEMA_VERSION = "1.0"
+
+class TenantMigration:
+    """A registered migration of tenant documents to `version`"""
+
+    def __init__(self, version: str, description: str, transform: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]], query: Dict[str, Any]):
+        self.version = version
+        self.description = description
+        self.transform = transform
+        self.query = query
+
+# Registered migrations: schema version -> migration. A transform receives a
+# tenant document matching `query` and returns the update to apply to it, or
+# None to leave it alone. Transforms must be idempotent: a batch interrupted
+# before its checkpoint is migrated again on resume.
+TENANT_MIGRATIONS: Dict[str, TenantMigration] = {}
+
+def parse_version(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+def tenant_migration(version: str, description: str, query: Optional[Dict[str, Any]] = None):
+    """Register a function migrating tenant documents to schema `version`"""
+    parse_version(version)
+
+    def decorator(func):
+        if version in TENANT_MIGRATIONS:
+            raise ValueError(f"Migration to schema {version} is already registered")
+        TENANT_MIGRATIONS[version] = TenantMigration(version, description, func, query or {})
+        return func
+    return decorator
+
+def current_schema_version() -> str:
+    """Schema version new tenant collections start at"""
+    return max(TENANT_MIGRATIONS, key=parse_version, default=BASE_SCHEMA_VERSION)
+
+def pending_migrations(from_version: str, to_version: Optional[str] = None) -> List[TenantMigration]:
+    """Registered migrations after `from_version` up to `to_version` (default: all), oldest first"""
+    low = parse_version(from_version)
+    high = parse_version(to_version) if to_version else None
+    return [
+        TENANT_MIGRATIONS[version] for version in sorted(TENANT_MIGRATIONS, key=parse_version)
+        if parse_version(version) > low and (high is None or parse_version(version) <= high)
+    ]
+
+class MigrationLeaseLost(Exception):
+    """Another runner took over the tenant after this runner's lease expired"""
+
+class TenantMigrationRunner:
+    """
+    Applies registered migrations to every tenant collection, online.
+
+    Tenants are migrated `workers` at a time. Each migration walks the
+    tenant collection in _id order, `batch_size` documents per read, and
+    applies the transform's updates with an unordered bulk write. After
+    every batch the last _id is checkpointed in the tenant's
+    tenant_migrations state, which also renews the runner's lease, so a
+    stopped or crashed run resumes where it left off and two runners never
+    migrate the same tenant. Documents read are throttled by a token bucket
+    of `rate` per second shared by all workers (and by every runner, with
+    RATE_LIMIT_BACKEND=redis), which bounds the extra load on production.
+    """
+
+    RATE_LIMIT_KEY = "tenant-migrations"
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        rate: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+        target_version: Optional[str] = None,
+        rate_limit_store: Optional[RateLimitStore] = None
+    ):
+        self.workers = workers or settings.migration_workers
+        self.batch_size = batch_size or settings.migration_batch_size
+        rate = rate or settings.migration_docs_per_second
+        self.limit = RateLimit(rate, max(self.batch_size, int(rate)))
+        self.lease_seconds = lease_seconds or settings.migration_lease_seconds
+        self.target_version = target_version
+        if target_version and target_version != BASE_SCHEMA_VERSION and target_version not in TENANT_MIGRATIONS:
+            raise ValueError(f"No migration to schema {target_version} is registered")
+        self.store = rate_limit_store or create_rate_limit_store()
+        self.runner_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.stats = {"tenants": 0, "migrated": 0, "up_to_date": 0, "busy": 0, "failed": 0, "documents": 0}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Finish the current batches and leave every tenant resumable"""
+        self._stopping.set()
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _organizations(self, organization_ids: Optional[List[str]]) -> Iterator[Dict[str, Any]]:
+        projection = {"collection_name": 1, "organization_name": 1, "deletion_job_id": 1}
+        if organization_ids:
+            for organization_id in organization_ids:
+                organization = OrganizationModel.find_by_id(organization_id)
+                if organization is None:
+                    raise ValueError(f"Organization '{organization_id}' not found")
+                yield organization
+            return
+        after_id = None
+        while page := OrganizationModel.page_after(after_id, 100, projection):
+            yield from page
+            after_id = page[-1]["_id"]
+
+    def run(self, organization_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Migrate the given organizations (default: all) to the target version"""
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="migrate") as pool:
+            for organization in self._organizations(organization_ids):
+                if self._stopping.is_set():
+                    break
+                # Organizations being deleted are left alone
+                if organization.get("deletion_job_id"):
+                    continue
+                if len(in_flight) >= self.workers * 2:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight.add(pool.submit(self.migrate_tenant, organization))
+            wait(in_flight)
+        return dict(self.stats)
+
+    @staticmethod
+    def collection_version(collection) -> str:
+        """Schema version recorded in the tenant's seed document"""
+        seed = collection.find_one({"metadata.schema_version": {"$exists": True}}, {"metadata.schema_version": 1})
+        return seed["metadata"]["schema_version"] if seed else BASE_SCHEMA_VERSION
+
+    def migrate_tenant(self, organization: Dict[str, Any]) -> Optional[str]:
+        """Apply the pending migrations to one tenant; returns its schema version afterwards"""
+        organization_id = str(organization["_id"])
+        collection = mongo_manager.get_master_db()[organization["collection_name"]]
+        self._count("tenants")
+
+        state = TenantMigrationModel.find(organization_id)
+        version = state["schema_version"] if state else self.collection_version(collection)
+        if not pending_migrations(version, self.target_version):
+            self._count("up_to_date")
+            return version
+
+        state = TenantMigrationModel.claim(
+            organization_id, organization["collection_name"], version, self.runner_id, self.lease_seconds
+        )
+        if state is None:
+            self._count("busy")
+            return None
+
+        try:
+            for migration in pending_migrations(state["schema_version"], self.target_version):
+                # Resume mid-collection only within the migration that was interrupted
+                last_id = state["last_id"] if state.get("migration") == migration.version else None
+                self._checkpoint(organization_id, {"migration": migration.version, "last_id": last_id})
+                if not self._apply(collection, organization_id, migration, last_id):
+                    TenantMigrationModel.release(organization_id, self.runner_id, MIGRATION_STATUS_PAUSED)
+                    return state["schema_version"]
+                collection.update_many(
+                    {"metadata.schema_version": {"$exists": True}},
+                    {"$set": {"metadata.schema_version": migration.version}}
+                )
+                self._checkpoint(organization_id, {"schema_version": migration.version, "migration": None, "last_id": None})
+                state["schema_version"] = migration.version
+                logger.info(f"Migrated {organization['collection_name']} to schema {migration.version}")
+        except Exception as e:
+            self._count("failed")
+            logger.error(f"❌ Migration of {organization['collection_name']} failed: {str(e)}")
+            TenantMigrationModel.release(organization_id, self.runner_id, MIGRATION_STATUS_FAILED, f"{type(e).__name__}: {str(e)}")
+            return None
+
+        TenantMigrationModel.release(organization_id, self.runner_id, MIGRATION_STATUS_COMPLETED)
+        self._count("migrated")
+        return state["schema_version"]
+
+    def _apply(self, collection, organization_id: str, migration: TenantMigration, last_id: Any) -> bool:
+        """Run one migration over a tenant collection; False when stopped part-way"""
+        while not self._stopping.is_set():
+            query = migration.query
+            if last_id is not None:
+                query = {"$and": [query, {"_id": {"$gt": last_id}}]} if query else {"_id": {"$gt": last_id}}
+            batch = list(collection.find(query).sort("_id", 1).limit(self.batch_size))
+            if not batch:
+                return True
+            self._throttle(len(batch))
+
+            operations = []
+            for document in batch:
+                update = migration.transform(document)
+                if update:
+                    operations.append(UpdateOne({"_id": document["_id"]}, update))
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+            last_id = batch[-1]["_id"]
+            self._checkpoint(organization_id, {"last_id": last_id}, migrated=len(operations))
+            self._count("documents", len(operations))
+        return False
+
+    def _checkpoint(self, organization_id: str, fields: Dict[str, Any], migrated: int = 0):
+        if not TenantMigrationModel.checkpoint(organization_id, self.runner_id, fields, self.lease_seconds, migrated):
+            raise MigrationLeaseLost(f"Lease on organization {organization_id} was taken over")
+
+    def _throttle(self, documents: int):
+        """Wait until the shared token bucket has room for `documents`"""
+        while not self._stopping.is_set():
+            result = self.store.consume(self.RATE_LIMIT_KEY, self.limit, documents)
+            if result.allowed:
+                return
+            self._stopping.wait(result.retry_after)
+
+class MigrationService:
+    """Service for inspecting tenant schema migrations"""
+
+    @staticmethod
+    async def status() -> Dict[str, Any]:
+        """Registered migrations and how many tenants are at each version"""
+        try:
+            return {
+                "current_version": current_schema_version(),
+                "migrations": [
+                    {"version": migration.version, "description": migration.description}
+                    for migration in pending_migrations(BASE_SCHEMA_VERSION)
+                ],
+                "organizations": OrganizationModel.get_collection().estimated_document_count(),
+                "tenants": [
+                    {**group["_id"], "tenants": group["tenants"], "documents": group["documents"]}
+                    for group in TenantMigrationModel.summary()
+                ],
+                "failed": [
+                    {"organization_id": state.pop("_id"), **state}
+                    for state in TenantMigrationModel.failed()
+                ]
+            }
+        except Exception as e:
+            logger.error(f"Error collecting migration status: {str(e)}")
+            raise
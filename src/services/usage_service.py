@@ -0,0 +1,217 @@
+import asyncio
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from src.config.settings import settings
+from src.models.organization import OrganizationModel
+from src.models.tenant_usage import TenantUsageModel, latency_bucket_field
+from src.utils.logger import logger
+
+class UsageRecorder:
+    """
+    In-process request counters per organization.
+
+    Requests are added as they finish; the collector drains the counters
+    into the hourly rollups, so the request path never touches MongoDB.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _new_counter(organization_name: str) -> Dict[str, Any]:
+        return {
+            "organization_name": organization_name,
+            "requests": 0,
+            "errors": 0,
+            "latency_ms_sum": 0.0,
+            "latency_ms_max": 0.0,
+            "latency_buckets": defaultdict(int)
+        }
+
+    def record(self, organization_id: str, organization_name: str, latency_ms: float, status_code: int):
+        with self._lock:
+            counter = self._counters.get(organization_id)
+            if counter is None:
+                counter = self._counters[organization_id] = self._new_counter(organization_name)
+            counter["organization_name"] = organization_name
+            counter["requests"] += 1
+            if status_code >= 500:
+                counter["errors"] += 1
+            counter["latency_ms_sum"] += latency_ms
+            counter["latency_ms_max"] = max(counter["latency_ms_max"], latency_ms)
+            counter["latency_buckets"][latency_bucket_field(latency_ms)] += 1
+
+    def drain(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        return counters
+
+    def restore(self, counters: Dict[str, Dict[str, Any]]):
+        """Put back counters that failed to flush so the next flush retries them"""
+        for organization_id, counter in counters.items():
+            with self._lock:
+                current = self._counters.get(organization_id)
+                if current is None:
+                    self._counters[organization_id] = counter
+                    continue
+                for field in ("requests", "errors", "latency_ms_sum"):
+                    current[field] += counter[field]
+                current["latency_ms_max"] = max(current["latency_ms_max"], counter["latency_ms_max"])
+                for field, count in counter["latency_buckets"].items():
+                    current["latency_buckets"][field] += count
+
+class UsageCollector:
+    """
+    Background task flushing request counters and sampling tenant storage.
+
+    Every `flush_interval` seconds the recorded counters are added to the
+    hourly rollups, then the next `collstats_batch_size` organizations of
+    the registry (walked in _id order, wrapping around) get their tenant
+    collection's collStats sampled, at most `collstats_per_second` commands
+    per second, so a full pass over thousands of tenants is spread out
+    instead of hitting the server at once.
+    """
+
+    def __init__(
+        self,
+        recorder: UsageRecorder,
+        flush_interval: Optional[float] = None,
+        collstats_batch_size: Optional[int] = None,
+        collstats_per_second: Optional[float] = None,
+        collection_stats: Callable[[str], Dict[str, Any]] = TenantUsageModel.collection_stats
+    ):
+        self.recorder = recorder
+        self.flush_interval = flush_interval or settings.usage_flush_interval_seconds
+        self.collstats_batch_size = (
+            collstats_batch_size if collstats_batch_size is not None else settings.usage_collstats_batch_size
+        )
+        self.collstats_per_second = collstats_per_second or settings.usage_collstats_per_second
+        self.collection_stats = collection_stats
+        self.stats = {"flushes": 0, "flush_errors": 0, "collstats_sampled": 0, "collstats_errors": 0, "passes": 0}
+        self._cursor = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Usage collector started")
+
+    async def stop(self):
+        """Stop the collector after a final flush"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Usage collector stopped")
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if not self._stopping.is_set():
+                await self.sample_storage()
+
+    async def flush(self) -> int:
+        """Write recorded counters to the hourly rollups; returns organizations flushed"""
+        counters = self.recorder.drain()
+        if not counters:
+            return 0
+        bucket = TenantUsageModel.hour_bucket(datetime.utcnow())
+        try:
+            await asyncio.to_thread(TenantUsageModel.apply_counters, bucket, counters)
+            self.stats["flushes"] += 1
+            return len(counters)
+        except Exception as e:
+            self.stats["flush_errors"] += 1
+            self.recorder.restore(counters)
+            logger.error(f"❌ Failed to flush usage counters for {len(counters)} organizations: {str(e)}")
+            return 0
+
+    async def sample_storage(self) -> List[str]:
+        """Sample collStats for the next batch of tenant collections; returns the organization ids sampled"""
+        if self.collstats_batch_size <= 0:
+            return []
+        try:
+            organizations = await asyncio.to_thread(
+                OrganizationModel.page_after,
+                self._cursor,
+                self.collstats_batch_size,
+                {"organization_name": 1, "collection_name": 1}
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to list organizations for storage sampling: {str(e)}")
+            return []
+
+        if len(organizations) < self.collstats_batch_size:
+            # End of the registry; the next batch starts over from the beginning
+            self._cursor = None
+            self.stats["passes"] += 1
+        else:
+            self._cursor = organizations[-1]["_id"]
+
+        sampled = []
+        for index, organization in enumerate(organizations):
+            if index:
+                await asyncio.sleep(1 / self.collstats_per_second)
+            try:
+                stats = await asyncio.to_thread(self.collection_stats, organization["collection_name"])
+                await asyncio.to_thread(TenantUsageModel.save_storage, organization, stats)
+                self.stats["collstats_sampled"] += 1
+                sampled.append(str(organization["_id"]))
+            except Exception as e:
+                self.stats["collstats_errors"] += 1
+                logger.warning(f"collStats failed for {organization['collection_name']}: {str(e)}")
+        return sampled
+
+class UsageService:
+    """Service for reading per-organization usage rollups"""
+
+    SORT_FIELDS = {"requests", "errors", "latency_ms_sum", "latency_ms_max"}
+
+    @staticmethod
+    async def summary(hours: int, limit: int, sort: str) -> List[Dict[str, Any]]:
+        """Top organizations by `sort` over the last `hours` hours"""
+        if sort not in UsageService.SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort}'")
+        rows = await asyncio.to_thread(
+            TenantUsageModel.summarize, TenantUsageModel.since_hours(hours), limit, sort
+        )
+        return [UsageService.serialize_row(row) for row in rows]
+
+    @staticmethod
+    async def organization_usage(organization_id: str, hours: int) -> Dict[str, Any]:
+        """Hourly rollups and the latest storage sample of one organization"""
+        since = TenantUsageModel.since_hours(hours)
+        hourly = await asyncio.to_thread(TenantUsageModel.hourly, organization_id, since)
+        storage = await asyncio.to_thread(TenantUsageModel.find_storage, organization_id)
+        return {"organization_id": organization_id, "hourly": hourly, "storage": storage}
+
+    @staticmethod
+    def serialize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        requests = row["requests"]
+        return {
+            "organization_id": row["_id"],
+            "organization_name": row["organization_name"],
+            "requests": requests,
+            "errors": row["errors"],
+            "latency_ms_avg": round(row["latency_ms_sum"] / requests, 1) if requests else None,
+            "latency_ms_max": round(row["latency_ms_max"], 1),
+            "storage": row.get("storage")
+        }
+
+usage_recorder = UsageRecorder()
+usage_collector = UsageCollector(usage_recorder)
@@ -0,0 +1,307 @@
+import time
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import bson
+from src.config.settings import settings
+from src.utils.logger import logger
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for the shared cache
+    redis = None
+
+# Part of every key. Bump when the shape of cached documents changes so
+# pods running old and new code during a rollout never read each other's
+# entries.
+CACHE_KEY_VERSION = 2
+
+class CacheBackend:
+    """Byte store with per-key expiry"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set only if the key is absent; used as a short-lived lock"""
+        raise NotImplementedError
+
+    def delete(self, *keys: str):
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget all entries"""
+        raise NotImplementedError
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process cache.
+
+    Invalidations only reach the current process, so with several workers
+    or pods other processes serve stale entries until they expire. Used as
+    the stand-in for the shared backend in tests.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+        self._clock = clock
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_keys:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > self._clock():
+                return False
+            self._entries[key] = (value, self._clock() + ttl)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every worker and pod through Redis"""
+
+    def __init__(self, client, key_prefix: str = "cache:"):
+        self._client = client
+        self._key_prefix = key_prefix
+
+    # Fail open everywhere: an unavailable cache must only cost latency
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(self._key_prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache unavailable, reading from MongoDB: {str(e)}")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        try:
+            self._client.set(self._key_prefix + key, value, px=int(ttl * 1000))
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        try:
+            return bool(self._client.set(self._key_prefix + key, value, px=int(ttl * 1000), nx=True))
+        except Exception:
+            return True
+
+    def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            self._client.delete(*(self._key_prefix + key for key in keys))
+        except Exception as e:
+            # Entries expire on their own; stale reads are bounded by the TTL
+            logger.error(f"❌ Cache invalidation failed for {keys}: {str(e)}")
+
+    def reset(self):
+        try:
+            for key in self._client.scan_iter(match=self._key_prefix + "*"):
+                self._client.delete(key)
+        except Exception as e:
+            logger.error(f"❌ Cache reset failed: {str(e)}")
+
+def create_cache_backend(backend: Optional[str] = None) -> Optional[CacheBackend]:
+    """Create the backend selected by settings.cache_backend, None when disabled"""
+    backend = backend or settings.cache_backend
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCacheBackend()
+    if backend == "redis":
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        return RedisCacheBackend(redis.Redis.from_url(settings.redis_url))
+    raise ValueError(f"Unknown cache backend '{backend}'")
+
+class ModelCache:
+    """
+    Read-through cache for master database documents.
+
+    Entries carry a soft expiry ahead of the backend TTL. Once it passes, the
+    first caller to take the refresh lock reloads the entry while everyone
+    else keeps serving the stale copy, so a hot key expiring does not send
+    every pod to MongoDB at once. Missing documents are cached too, for a
+    shorter time.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        lock_wait_ms: Optional[float] = None,
+        clock=time.time
+    ):
+        self.backend = backend
+        self.ttl = settings.cache_ttl_seconds if ttl is None else ttl
+        self.negative_ttl = settings.cache_negative_ttl_seconds if negative_ttl is None else negative_ttl
+        self.stale_ttl = settings.cache_stale_seconds if stale_ttl is None else stale_ttl
+        self.lock_wait = (settings.cache_lock_wait_ms if lock_wait_ms is None else lock_wait_ms) / 1000
+        self.lock_ttl = 5.0
+        self._clock = clock
+        self.stats: Dict[str, int] = {"hits": 0, "negative_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return f"v{CACHE_KEY_VERSION}:" + ":".join(str(part) for part in parts)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader on a miss"""
+        if self.backend is None:
+            return loader()
+
+        entry = self._read(key)
+        if entry is not None:
+            if entry["soft_expires_at"] > self._clock():
+                self.stats["negative_hits" if entry["value"] is None else "hits"] += 1
+                return entry["value"]
+            locked = self._lock(key)
+            if not locked:
+                # Someone else is refreshing; the stale copy is good enough
+                self.stats["stale_hits"] += 1
+                return entry["value"]
+            self.stats["refreshes"] += 1
+        else:
+            self.stats["misses"] += 1
+            locked = self._lock(key)
+            if not locked:
+                entry = self._wait_for(key)
+                if entry is not None:
+                    return entry["value"]
+                # Holder is slow or gone; load without the lock
+
+        try:
+            value = loader()
+            self.store(key, value)
+            return value
+        finally:
+            if locked:
+                self.backend.delete(self._lock_key(key))
+
+    def store(self, key: str, value: Any):
+        """Cache a value, None marks a missing document"""
+        if self.backend is None:
+            return
+        if value is None:
+            soft_ttl = hard_ttl = self.negative_ttl
+        else:
+            # Jitter keeps entries filled together from expiring together
+            soft_ttl = self.ttl * random.uniform(0.9, 1.0)
+            hard_ttl = self.ttl + self.stale_ttl
+        entry = {"value": value, "soft_expires_at": self._clock() + soft_ttl}
+        self.backend.set(key, bson.encode(entry), hard_ttl)
+
+    def invalidate(self, *keys: str):
+        if self.backend is not None:
+            self.backend.delete(*keys)
+
+    def get_or_load_aliased(
+        self,
+        alias_key: str,
+        id_key: Callable[[str], str],
+        load: Callable[[], Optional[dict]],
+        load_by_id: Callable[[str], Optional[dict]],
+        matches: Callable[[dict], bool]
+    ) -> Optional[dict]:
+        """
+        Resolve a secondary key such as a name or email to a document.
+
+        The alias only stores the document id; the document itself lives
+        under its id key, so writes invalidate one entry however many
+        aliases point at it.
+        """
+        if self.backend is None:
+            return load()
+
+        loaded = {}
+
+        def load_alias():
+            doc = load()
+            if doc is None:
+                return None
+            loaded["doc"] = doc
+            return str(doc["_id"])
+
+        doc_id = self.get_or_load(alias_key, load_alias)
+        if doc_id is None:
+            return None
+        if "doc" in loaded:
+            self.store(id_key(doc_id), loaded["doc"])
+            return loaded["doc"]
+
+        doc = self.get_or_load(id_key(doc_id), lambda: load_by_id(doc_id))
+        if doc is not None and matches(doc):
+            return doc
+
+        # Renamed or deleted since the alias was cached
+        doc = load()
+        self.store(alias_key, str(doc["_id"]) if doc else None)
+        if doc is not None:
+            self.store(id_key(str(doc["_id"])), doc)
+        return doc
+
+    def _read(self, key: str) -> Optional[dict]:
+        raw = self.backend.get(key)
+        if raw is None:
+            return None
+        try:
+            return bson.decode(raw)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"lock:{key}"
+
+    def _lock(self, key: str) -> bool:
+        return self.backend.add(self._lock_key(key), b"1", self.lock_ttl)
+
+    def _wait_for(self, key: str) -> Optional[dict]:
+        # Cold miss while another caller loads the same key: give it a
+        # moment rather than piling onto MongoDB as well
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.005)
+            entry = self._read(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry
+        return None
+
+model_cache = ModelCache(create_cache_backend())
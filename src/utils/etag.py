@@ -0,0 +1,48 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict
+from fastapi import Response
+
+def make_etag(*parts: Any) -> str:
+    """
+    ETag from the values a representation is derived from.
+
+    Always weak: the compression middleware has to weaken the tag of an
+    encoded 200, and the 304 for the same resource must carry the same
+    tag, which it cannot know it is encoded for.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, datetime):
+            # Fixed format so the same stored value always hashes the same
+            part = part.isoformat(timespec="microseconds")
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Evaluate If-None-Match against the current ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so tags
+    weakened by the compression middleware still match.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+def validator_headers(etag: str) -> Dict[str, str]:
+    """Headers for a response clients are expected to revalidate"""
+    # private: the body is tenant data behind a bearer token
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validator"""
+    return Response(status_code=304, headers=validator_headers(etag))
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from bisect import bisect_left
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+from src.config.settings import settings
+from src.utils.logger import logger
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is +Inf
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class EventLoopBlockedError(AssertionError):
+    """Raised in test mode when the event loop was blocked longer than allowed"""
+
+def _describe(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.relpath(code.co_filename, PROJECT_ROOT)}:{frame.f_lineno} in {code.co_name}"
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(PROJECT_ROOT) and "site-packages" not in filename and filename != __file__
+
+class EventLoopMonitor:
+    """
+    Measures event-loop scheduling lag and catches the code blocking it.
+
+    A heartbeat coroutine sleeps for `interval_ms` and records how late it
+    wakes up. A watchdog thread notices when the heartbeat is overdue by
+    more than `threshold_ms` and grabs the loop thread's stack while the
+    blocking call is still running; the stall is attributed to the
+    innermost frame in this project (the handler that made the call).
+    """
+
+    def __init__(self, interval_ms: float = 50, threshold_ms: float = 100, buffer_size: int = 100):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.lag_sum_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.offenders: Counter = Counter()
+        self.stalls: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._expected_wake = 0.0
+        self._pending_stall: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._expected_wake = time.perf_counter() + self.interval
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started (threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._watchdog.join)
+
+    async def _heartbeat(self):
+        while True:
+            self._expected_wake = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, time.perf_counter() - self._expected_wake))
+
+    def record_lag(self, lag: float):
+        """Add one lag measurement (seconds) and close any stall it ends"""
+        lag_ms = lag * 1000
+        with self._lock:
+            self.histogram[bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+            self.lag_sum_ms += lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            stall, self._pending_stall = self._pending_stall, None
+            if stall is None and lag >= self.threshold:
+                # Blocked and released between two watchdog checks; no stack available
+                stall = {"at": time.time(), "offender": "unknown", "stack": []}
+            if stall is None:
+                return
+            stall["lag_ms"] = round(lag_ms, 1)
+            self.offenders[stall["offender"]] += 1
+            self.stalls.append(stall)
+        logger.warning(f"⚠️ Event loop blocked for {lag_ms:.0f}ms by {stall['offender']}")
+
+    def _watch(self):
+        check_every = min(self.interval, self.threshold) / 2
+        while not self._stopping.wait(check_every):
+            overdue = time.perf_counter() - self._expected_wake
+            if overdue < self.threshold or self._pending_stall is not None:
+                continue
+            stall = self.capture_stall()
+            with self._lock:
+                if self._pending_stall is None and time.perf_counter() - self._expected_wake >= self.threshold:
+                    self._pending_stall = stall
+
+    def capture_stall(self) -> Dict[str, Any]:
+        """Snapshot of what the loop thread is running right now"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack: List[str] = []
+        offender = None
+        while frame is not None and len(stack) < 40:
+            stack.append(_describe(frame))
+            if offender is None and _is_project_frame(frame.f_code.co_filename):
+                offender = _describe(frame)
+            frame = frame.f_back
+        return {"at": time.time(), "offender": offender or (stack[0] if stack else "unknown"), "stack": stack}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Histogram, offender counts and recent stalls, newest first"""
+        with self._lock:
+            count = sum(self.histogram)
+            cumulative, buckets = 0, []
+            for bound, observed in zip(list(LAG_BUCKETS_MS) + ["+Inf"], self.histogram):
+                cumulative += observed
+                buckets.append({"le": bound, "count": cumulative})
+            return {
+                "running": self.running,
+                "threshold_ms": self.threshold * 1000,
+                "lag_ms": {
+                    "count": count,
+                    "sum": round(self.lag_sum_ms, 1),
+                    "max": round(self.max_lag_ms, 1),
+                    "buckets": buckets
+                },
+                "offenders": dict(self.offenders.most_common()),
+                "stalls": list(reversed(self.stalls))
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+            self.lag_sum_ms = 0.0
+            self.max_lag_ms = 0.0
+            self.offenders.clear()
+            self.stalls.clear()
+
+    def assert_not_blocked(self, max_block_ms: float):
+        """Test mode: raise if any recorded stall exceeded `max_block_ms`"""
+        with self._lock:
+            offending = [stall for stall in self.stalls if stall["lag_ms"] > max_block_ms]
+        if offending:
+            details = "\n".join(
+                f"  {stall['lag_ms']:.0f}ms in {stall['offender']}" for stall in offending
+            )
+            raise EventLoopBlockedError(f"Event loop blocked longer than {max_block_ms:.0f}ms:\n{details}")
+
+# In test mode every stall the tests may fail on must be recorded
+loop_monitor = EventLoopMonitor(
+    interval_ms=settings.loop_monitor_interval_ms,
+    threshold_ms=min(settings.loop_monitor_threshold_ms, settings.loop_monitor_fail_ms or float("inf")),
+    buffer_size=settings.loop_monitor_buffer_size
+)
@@ -1,13 +1,114 @@
+import time
+from typing import Dict, Any, Optional
 from passlib.context import CryptContext
 from src.config.settings import settings
+from src.utils.tracing import traced
+
+# bcrypt stores its cost factor at a fixed position: $2b$12$...
+BCRYPT_COST_SLICE = slice(4, 6)
+
+def _context_config(rounds: int, floor: int) -> Dict[str, Any]:
+    # New hashes use `rounds`, this process's calibrated cost. Only hashes
+    # below `floor`, the cluster-wide minimum, report needs_update() and get
+    # rehashed on login: were it `rounds`, the fastest pod would raise every
+    # account to its own cost and slower pods would then verify above budget.
+    return {
+        "schemes": ["bcrypt"],
+        "deprecated": "auto",
+        "bcrypt__default_rounds": rounds,
+        "bcrypt__min_rounds": min(floor, rounds)
+    }
 
 # Create password context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+pwd_context = CryptContext(**_context_config(settings.bcrypt_rounds, settings.bcrypt_min_rounds))
 
+# Result of the last calibration, reported by the internal metrics endpoint
+bcrypt_calibration: Dict[str, Any] = {
+    "rounds": settings.bcrypt_rounds,
+    "rehash_below": min(settings.bcrypt_min_rounds, settings.bcrypt_rounds),
+    "calibrated": False,
+    "target_ms": None,
+    "measured_ms": None
+}
+
+@traced("bcrypt.hash")
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
     return pwd_context.hash(password)
 
+@traced("bcrypt.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+def password_needs_update(hashed_password: str) -> bool:
+    """Check whether a hash was made with a cost below the cluster-wide floor"""
+    return pwd_context.needs_update(hashed_password)
+
+def get_bcrypt_rounds() -> int:
+    """Cost factor used for new hashes"""
+    return bcrypt_calibration["rounds"]
+
+def get_hash_cost(hashed_password: str) -> Optional[int]:
+    """Extract the cost factor from a bcrypt hash"""
+    try:
+        return int(hashed_password[BCRYPT_COST_SLICE])
+    except (TypeError, ValueError):
+        return None
+
+def configure_bcrypt_rounds(rounds: int, floor: Optional[int] = None):
+    """Switch the cost factor of new hashes, and the floor below which needs_update()"""
+    floor = min(settings.bcrypt_min_rounds if floor is None else floor, rounds)
+    pwd_context.load(_context_config(rounds, floor))
+    bcrypt_calibration.update({"rounds": rounds, "rehash_below": floor})
+
+def _time_hash_ms(rounds: int, samples: int) -> float:
+    # Best of N: the fastest run is the least disturbed by other load
+    best = None
+    hasher = pwd_context.handler("bcrypt").using(rounds=rounds)
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def calibrate_bcrypt_rounds(
+    target_ms: Optional[float] = None,
+    min_rounds: Optional[int] = None,
+    max_rounds: Optional[int] = None,
+    samples: int = 3
+) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time fits the latency budget.
+
+    Each extra round doubles the work, so the cost is extrapolated from a
+    cheap measurement at min_rounds and then confirmed once. Never goes
+    below min_rounds, even on hardware too slow to meet the budget. The
+    result only sets the cost of new hashes; existing ones are rehashed
+    when below BCRYPT_MIN_ROUNDS, the same on every pod.
+    """
+    target_ms = target_ms or settings.bcrypt_target_ms
+    min_rounds = min_rounds or settings.bcrypt_min_rounds
+    max_rounds = max_rounds or settings.bcrypt_max_rounds
+
+    base_ms = _time_hash_ms(min_rounds, samples)
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+
+    measured_ms = base_ms
+    if rounds > min_rounds:
+        measured_ms = _time_hash_ms(rounds, 1)
+        # The extrapolation was optimistic (e.g. CPU throttling); step down
+        while rounds > min_rounds and measured_ms > target_ms:
+            rounds -= 1
+            measured_ms /= 2
+
+    configure_bcrypt_rounds(rounds, settings.bcrypt_min_rounds)
+    bcrypt_calibration.update({
+        "calibrated": True,
+        "target_ms": target_ms,
+        "measured_ms": round(measured_ms, 1)
+    })
+    return rounds
@@ -0,0 +1,265 @@
+import os
+import re
+import hmac
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import secrets
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.settings import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+FrameKey = Tuple[str, str, int]
+
+def sign_profile_token(expires_at: int, secret: str) -> str:
+    """Token for the X-Profile header, valid until the given unix time"""
+    signature = hmac.new(secret.encode(), str(expires_at).encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{signature}"
+
+def verify_profile_token(token: Optional[str], secret: str, now: Optional[float] = None) -> bool:
+    """Check an X-Profile header token's signature and expiry"""
+    if not token or not secret:
+        return False
+    expires_at, _, signature = token.partition(".")
+    if not expires_at.isdigit():
+        return False
+    expected = sign_profile_token(int(expires_at), secret).partition(".")[2]
+    if not hmac.compare_digest(signature, expected):
+        return False
+    return int(expires_at) >= (time.time() if now is None else now)
+
+def _frame_key(frame: FrameType) -> FrameKey:
+    code = frame.f_code
+    # co_qualname is Python 3.11+
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+def _await_chain(coro: Any) -> Tuple[List[FrameType], Any]:
+    """Frames of a suspended coroutine chain, outermost first, and the object awaited at the bottom"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        awaited = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+        if frame is None:
+            return frames, coro
+        frames.append(frame)
+        if awaited is None:
+            return frames, None
+        coro = awaited
+    return frames, None
+
+class RequestProfile:
+    """
+    Statistical profile of one request's asyncio task.
+
+    A sampler thread looks at the task every interval. While the task is
+    running on the event loop the loop thread's real stack is recorded
+    (including synchronous calls such as JSON encoding); while it is
+    suspended the coroutine await chain is recorded with an "(await ...)"
+    leaf, so time spent waiting on MongoDB or thread pools shows up too.
+    """
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.samples: List[Tuple[FrameKey, ...]] = []
+        self.weights: List[float] = []
+        self.duration_ms = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, root_frame: FrameType):
+        """Start sampling the current task from `root_frame` (the caller's frame) down"""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread_id = threading.get_ident()
+        self._root = root_frame
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling without waiting for the sampler thread"""
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self._stop.set()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            stack = self._sample()
+            now = time.perf_counter()
+            if stack:
+                self.samples.append(stack)
+                self.weights.append((now - last) * 1000)
+            last = now
+
+    def _sample(self) -> Tuple[FrameKey, ...]:
+        if asyncio.current_task(self._loop) is self._task:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                if frame is self._root:
+                    return tuple(reversed(stack))
+                frame = frame.f_back
+        # Suspended (or between steps): walk the await chain from our frame down
+        frames, awaited = _await_chain(self._task.get_coro())
+        for index, frame in enumerate(frames):
+            if frame is self._root:
+                # The C Future's __await__ returns a FutureIter; report it as the Future
+                leaf = f"(await {type(awaited).__name__.removesuffix('Iter')})" if awaited is not None else "(await)"
+                return tuple(_frame_key(f) for f in frames[index:]) + ((leaf, "", 0),)
+        return ()
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Profile in speedscope's sampled file format"""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[FrameKey, int] = {}
+        samples = []
+        for stack in self.samples:
+            indices = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    frame_name, file, line = key
+                    frames.append({"name": frame_name, "file": file, "line": line} if file else {"name": frame_name})
+                indices.append(index[key])
+            samples.append(indices)
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": settings.app_name,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.duration_ms, 3),
+                "samples": samples,
+                "weights": [round(weight, 3) for weight in self.weights],
+            }],
+        }
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and stores the results.
+
+    A request is profiled when it carries a valid signed X-Profile header
+    or is picked at `sample_rate`. At most `max_concurrent` profiles run
+    at once and only the newest `max_profiles` files are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        secret: str = "",
+        interval_ms: float = 5.0,
+        max_profiles: int = 50,
+        max_concurrent: int = 2
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.secret = secret
+        self.interval_ms = interval_ms
+        self.max_profiles = max_profiles
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.stats = {"profiled": 0, "skipped_busy": 0, "rejected_tokens": 0}
+
+    def trigger(self, header_token: Optional[str]) -> Optional[str]:
+        """Why this request should be profiled ("header" or "sampled"), or None"""
+        if header_token is not None:
+            if verify_profile_token(header_token, self.secret):
+                return "header"
+            self.stats["rejected_tokens"] += 1
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def begin(self, root_frame: FrameType) -> Optional[RequestProfile]:
+        if self.active >= self.max_concurrent:
+            self.stats["skipped_busy"] += 1
+            return None
+        self.active += 1
+        profile = RequestProfile(self.interval_ms)
+        profile.start(root_frame)
+        return profile
+
+    def finish(self, profile: RequestProfile):
+        profile.stop()
+        self.active -= 1
+        self.stats["profiled"] += 1
+
+    @staticmethod
+    def new_profile_id() -> str:
+        return f"{int(time.time())}-{secrets.token_hex(4)}"
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.speedscope.json")
+
+    def save(self, profile_id: str, profile: RequestProfile, name: str):
+        """Write the profile to disk and prune old ones; blocking, run off the event loop"""
+        profile.join()
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile_id), "w", encoding="utf-8") as f:
+            json.dump(profile.speedscope(name), f, separators=(",", ":"))
+
+        stored = sorted(self.list_profiles(), key=lambda p: p["created_at"], reverse=True)
+        for old in stored[self.max_profiles:]:
+            try:
+                os.remove(self._path(old["id"]))
+            except OSError:
+                pass
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for filename in os.listdir(self.directory):
+            profile_id = filename.removesuffix(".speedscope.json")
+            if profile_id == filename or not PROFILE_ID_PATTERN.match(profile_id):
+                continue
+            stat = os.stat(os.path.join(self.directory, filename))
+            profiles.append({"id": profile_id, "created_at": stat.st_mtime, "size_bytes": stat.st_size})
+        return profiles
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Stored speedscope document, None if unknown"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+def speedscope_to_collapsed(document: Dict[str, Any]) -> str:
+    """Convert a stored speedscope document to collapsed-stack text"""
+    frames = document["shared"]["frames"]
+    counts: Counter = Counter()
+    for profile in document["profiles"]:
+        for sample in profile["samples"]:
+            counts[";".join(frames[i]["name"] for i in sample)] += 1
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+request_profiler = RequestProfiler(
+    directory=settings.profiling_dir,
+    sample_rate=settings.profiling_sample_rate,
+    secret=settings.profiling_secret,
+    interval_ms=settings.profiling_interval_ms,
+    max_profiles=settings.profiling_max_profiles,
+    max_concurrent=settings.profiling_max_concurrent
+)
@@ -0,0 +1,245 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from src.config.settings import settings
+from src.utils.logger import logger
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for the shared store
+    redis = None
+
+class RateLimit:
+    """Token bucket parameters: refill `rate` tokens per second up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("Rate limit rate and burst must be positive")
+        self.rate = float(rate)
+        self.burst = int(burst)
+
+    def __repr__(self):
+        return f"RateLimit(rate={self.rate}, burst={self.burst})"
+
+class RateLimitResult:
+    """Outcome of consuming tokens from a bucket"""
+
+    __slots__ = ("allowed", "remaining", "retry_after", "limit")
+
+    def __init__(self, allowed: bool, remaining: float, retry_after: float, limit: int):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+        self.limit = limit
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (never 0 for a denied request)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+def refill_and_take(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    limit: RateLimit,
+    cost: float
+) -> Tuple[bool, float, float]:
+    """Token bucket step, returns (allowed, tokens_left, retry_after_seconds)"""
+    tokens = min(limit.burst, tokens + max(0.0, now - updated_at) * limit.rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / limit.rate
+
+class RateLimitStore:
+    """Storage backend for token buckets"""
+
+    # Stores that wait on the network are called off the event loop
+    blocking = False
+
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        raise NotImplementedError
+
+    def consume_all(self, keys: List[str], limit: RateLimit, cost: float = 1.0) -> List[RateLimitResult]:
+        """
+        Take `cost` tokens from every bucket, or from none of them.
+
+        Each result reports whether its own bucket had enough tokens; the
+        buckets are only debited when all of them do, so a request rejected
+        by one identity does not use up the others.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget all buckets"""
+        raise NotImplementedError
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    In-process token buckets.
+
+    Limits are per process, so with N uvicorn workers or pods a client gets
+    up to N times the configured rate. Also used as the stand-in for the
+    shared store in tests.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+        self._clock = clock
+
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (limit.burst, now))
+            allowed, tokens, retry_after = refill_and_take(tokens, updated_at, now, limit, cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Evict least recently used buckets; an evicted bucket comes back full
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return RateLimitResult(allowed, tokens, retry_after, limit.burst)
+
+    def consume_all(self, keys: List[str], limit: RateLimit, cost: float = 1.0) -> List[RateLimitResult]:
+        now = self._clock()
+        with self._lock:
+            refilled = []
+            for key in keys:
+                tokens, updated_at = self._buckets.get(key, (limit.burst, now))
+                refilled.append(min(limit.burst, tokens + max(0.0, now - updated_at) * limit.rate))
+            all_allowed = all(tokens >= cost for tokens in refilled)
+            results = []
+            for key, tokens in zip(keys, refilled):
+                allowed = tokens >= cost
+                if all_allowed:
+                    tokens -= cost
+                retry_after = 0.0 if allowed else (cost - tokens) / limit.rate
+                self._buckets[key] = (tokens, now)
+                self._buckets.move_to_end(key)
+                results.append(RateLimitResult(allowed, tokens, retry_after, limit.burst))
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return results
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+# Atomic token bucket in Redis. Uses the server clock so pods with skewed
+# clocks agree, and expires idle buckets once they would be full again.
+_REDIS_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+# All-or-nothing variant over several buckets: every bucket is refilled,
+# and tokens are only taken when each of them can pay `cost`.
+_REDIS_TOKEN_BUCKETS_ALL_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tokens = {}
+local all_allowed = true
+for i, key in ipairs(KEYS) do
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local current = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens[i] = math.min(burst, current + math.max(0, now - ts) * rate)
+    if tokens[i] < cost then
+        all_allowed = false
+    end
+end
+local out = {}
+for i, key in ipairs(KEYS) do
+    local allowed = 0
+    local retry_after = 0
+    if tokens[i] >= cost then
+        allowed = 1
+        if all_allowed then
+            tokens[i] = tokens[i] - cost
+        end
+    else
+        retry_after = (cost - tokens[i]) / rate
+    end
+    redis.call('HSET', key, 'tokens', tokens[i], 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+    table.insert(out, allowed)
+    table.insert(out, tostring(tokens[i]))
+    table.insert(out, tostring(retry_after))
+end
+return out
+"""
+
+class RedisRateLimitStore(RateLimitStore):
+    """Token buckets shared by every worker and pod through Redis"""
+
+    blocking = True
+
+    def __init__(self, client, key_prefix: str = "ratelimit:"):
+        self._client = client
+        self._key_prefix = key_prefix
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET_SCRIPT)
+        self._all_script = client.register_script(_REDIS_TOKEN_BUCKETS_ALL_SCRIPT)
+
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        try:
+            allowed, tokens, retry_after = self._script(
+                keys=[self._key_prefix + key],
+                args=[limit.rate, limit.burst, cost]
+            )
+        except Exception as e:
+            # Fail open: an unavailable limiter must not take the API down
+            logger.warning(f"Rate limit store unavailable, allowing request: {str(e)}")
+            return RateLimitResult(True, limit.burst, 0.0, limit.burst)
+        return RateLimitResult(bool(int(allowed)), float(tokens), float(retry_after), limit.burst)
+
+    def consume_all(self, keys: List[str], limit: RateLimit, cost: float = 1.0) -> List[RateLimitResult]:
+        try:
+            flat = self._all_script(
+                keys=[self._key_prefix + key for key in keys],
+                args=[limit.rate, limit.burst, cost]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {str(e)}")
+            return [RateLimitResult(True, limit.burst, 0.0, limit.burst) for _ in keys]
+        return [
+            RateLimitResult(bool(int(flat[i])), float(flat[i + 1]), float(flat[i + 2]), limit.burst)
+            for i in range(0, len(flat), 3)
+        ]
+
+    def reset(self):
+        for key in self._client.scan_iter(match=self._key_prefix + "*"):
+            self._client.delete(key)
+
+def create_rate_limit_store(backend: Optional[str] = None) -> RateLimitStore:
+    """Create the store selected by settings.rate_limit_backend"""
+    backend = backend or settings.rate_limit_backend
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    if backend == "redis":
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package")
+        return RedisRateLimitStore(redis.Redis.from_url(settings.redis_url))
+    raise ValueError(f"Unknown rate limit backend '{backend}'")
@@ -0,0 +1,49 @@
+import unicodedata
+from typing import Any, Dict, List
+
+def _is_word_char(char: str) -> bool:
+    # Letters, marks and digits of any script
+    return unicodedata.category(char)[0] in "LMN"
+
+def normalize_name(name: str) -> str:
+    """
+    Search key of an organization name.
+
+    Accents are stripped, case folded and every run of punctuation or
+    whitespace becomes one space, so "Café-Übersee GmbH" and
+    "cafe ubersee gmbh" share a key. Letters and digits of every script
+    are kept, so "Газпром" or "東京電力" are searchable too.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = unicodedata.normalize(
+        "NFC", "".join(char for char in decomposed if not unicodedata.combining(char))
+    )
+    return " ".join("".join(
+        char if _is_word_char(char) else " " for char in stripped.casefold()
+    ).split())
+
+def trigrams(normalized: str) -> List[str]:
+    """
+    Distinct trigrams of a normalized name, sorted.
+
+    Each word is padded with two leading spaces and one trailing space,
+    as in PostgreSQL's pg_trgm, so word starts weigh more than the middle
+    of a word and even one- or two-letter words produce trigrams.
+    """
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+def similarity(query_grams: List[str], name_grams: List[str]) -> float:
+    """Jaccard similarity of two trigram sets, from 0 to 1"""
+    query, name = set(query_grams), set(name_grams)
+    if not query or not name:
+        return 0.0
+    return len(query & name) / len(query | name)
+
+def search_fields(name: str) -> Dict[str, Any]:
+    """Fields stored on an organization document for /org/search"""
+    normalized = normalize_name(name)
+    return {"search_name": normalized, "name_trigrams": trigrams(normalized)}
@@ -0,0 +1,67 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+class _Call:
+    """A lookup in progress that later callers can wait on"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical lookups into one query.
+
+    The first caller for a key runs the lookup; callers arriving while it is
+    in flight wait for it and get a copy of its result (or its exception).
+    Nothing is remembered once the lookup finishes, so this never serves
+    stale data; it only collapses a burst of simultaneous requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def do(self, operation: str, key: Hashable, func: Callable[[], Any]) -> Any:
+        flight_key = (operation, key)
+        with self._lock:
+            counters = self.stats.setdefault(operation, {"executed": 0, "coalesced": 0})
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = self._calls[flight_key] = _Call()
+                counters["executed"] += 1
+            else:
+                call.waiters += 1
+                counters["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Callers own their document, as they would after their own query
+            return copy.deepcopy(call.result)
+
+        result = None
+        try:
+            result = func()
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+                waiters = call.waiters
+            if waiters:
+                # Snapshot before our caller gets a chance to modify it
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+single_flight = SingleFlight()
@@ -0,0 +1,358 @@
+import os
+import json
+import time
+import queue
+import random
+import inspect
+import functools
+import threading
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from src.config.settings import settings
+from src.utils.logger import logger
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+class Span:
+    """A timed operation in a trace, shaped like an OpenTelemetry span"""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_span_id", "name", "kind", "sampled",
+        "start_ns", "end_ns", "attributes", "status_code", "status_message"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        sampled: bool,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def traceparent(self) -> str:
+        """W3C trace-context header value for calls made inside this span"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def parse_traceparent(header: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a W3C traceparent header, None if absent or malformed"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if version == "00" and len(parts) != 4:
+        return None
+    try:
+        if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+            return None
+        if int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return {"trace_id": trace_id.lower(), "span_id": span_id.lower(), "sampled": sampled}
+
+class SpanExporter:
+    """Destination for finished spans"""
+
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+def otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of spans"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+        "scopeSpans": [{
+            "scope": {"name": "src.utils.tracing"},
+            "spans": [span.to_otlp() for span in spans]
+        }]
+    }]}
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends OTLP/JSON batches to a local file, one request per line.
+
+    The OpenTelemetry Collector's otlpjsonfile receiver reads this format,
+    so traces can be loaded into any backend later without a collector
+    running next to the service.
+    """
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        line = json.dumps(otlp_payload(spans, self.service_name), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Posts OTLP/JSON batches to a collector's /v1/traces endpoint"""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]):
+        body = json.dumps(otlp_payload(spans, self.service_name)).encode()
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list; used by tests"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]):
+        self.spans.extend(spans)
+
+class BatchSpanProcessor:
+    """
+    Hands finished spans to the exporter from a background thread.
+
+    Spans are dropped (and counted) when the queue is full rather than
+    slowing requests down.
+    """
+
+    def __init__(self, exporter: SpanExporter, max_queue_size: int = 2048, batch_size: int = 256, interval: float = 2.0):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f"Span export failed, dropped {len(batch)} spans: {str(e)}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Flush queued spans and stop the export thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.exporter.shutdown()
+
+class SimpleSpanProcessor:
+    """Exports every span as it ends, on the caller's thread; used by tests"""
+
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+        self.dropped = 0
+
+    def on_end(self, span: Span):
+        self.exporter.export([span])
+
+    def shutdown(self, timeout: float = 5.0):
+        self.exporter.shutdown()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class Tracer:
+    """
+    Creates spans, tracks the active one per context and samples traces.
+
+    Sampling is parent based: a trace continues with the decision made
+    upstream (the traceparent sampled flag), and new traces are kept with
+    probability `sample_ratio`, decided from the trace id so every service
+    using the same ratio agrees.
+    """
+
+    def __init__(self, processor=None, sample_ratio: float = 1.0):
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def configure(self, processor, sample_ratio: Optional[float] = None):
+        if self.processor is not None:
+            self.processor.shutdown()
+        self.processor = processor
+        if sample_ratio is not None:
+            self.sample_ratio = sample_ratio
+
+    def should_sample(self, trace_id: str) -> bool:
+        if self.sample_ratio >= 1.0:
+            return True
+        return int(trace_id[16:], 16) < self.sample_ratio * 2 ** 64
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        traceparent: Optional[str] = None
+    ) -> Span:
+        """Start a span under the active span, or under a remote parent from a traceparent header"""
+        parent = _current_span.get()
+        remote = parse_traceparent(traceparent) if parent is None else None
+        if parent is not None:
+            return Span(name, parent.trace_id, parent.span_id, parent.sampled, kind, attributes)
+        if remote is not None:
+            return Span(name, remote["trace_id"], remote["span_id"], remote["sampled"], kind, attributes)
+        trace_id = f"{random.getrandbits(128):032x}"
+        return Span(name, trace_id, None, self.should_sample(trace_id), kind, attributes)
+
+    def end_span(self, span: Span):
+        span.end_ns = time.time_ns()
+        if span.sampled and self.processor is not None:
+            self.processor.on_end(span)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        traceparent: Optional[str] = None
+    ) -> Iterator[Optional[Span]]:
+        """Run a block inside a new active span; yields None when tracing is off"""
+        if self.processor is None:
+            yield None
+            return
+        span = self.start_span(name, kind, attributes, traceparent)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator running a sync or async function inside a span"""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if tracer.processor is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if tracer.processor is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+def create_span_processor(exporter: Optional[str] = None):
+    """Create the processor for settings.tracing_exporter, None when tracing is off"""
+    exporter = exporter or settings.tracing_exporter
+    if exporter == "none":
+        return None
+    if exporter == "file":
+        return BatchSpanProcessor(FileSpanExporter(settings.tracing_file_path, settings.tracing_service_name))
+    if exporter == "otlp":
+        return BatchSpanProcessor(OtlpHttpSpanExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name))
+    raise ValueError(f"Unknown tracing exporter '{exporter}'")
+
+tracer = Tracer(sample_ratio=settings.tracing_sample_ratio)
@@ -1,4 +1,5 @@
 import re
+import unicodedata
 from typing import Optional
 
 def validate_organization_name(name: str) -> bool:
@@ -6,9 +7,9 @@ def validate_organization_name(name: str) -> bool:
     if not name or len(name) > 100:
         return False
     
-    # Allow alphanumeric, spaces, hyphens, and underscores
-    pattern = r'^[a-zA-Z0-9 _-]+$'
-    return bool(re.match(pattern, name))
+    # Allow letters and digits of any script, spaces, hyphens, and underscores;
+    # collection names come from the organization id, not the name
+    return all(unicodedata.category(char)[0] in "LMN" or char in " _-" for char in name)
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
@@ -1,9 +1,15 @@
+import os
+# Tests create many organizations from one client; rate limits are tested separately
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import time
 import pytest
 import asyncio
 from fastapi.testclient import TestClient
 from motor.motor_asyncio import AsyncIOMotorClient
 from main import app
-import os
+from src.config.settings import settings
+from src.utils.loop_monitor import loop_monitor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -70,4 +76,15 @@ def sample_login_data():
 async def cleanup_test_data(test_db):
     """Auto-cleanup after each test"""
     yield
-    # Cleanup happens in test_db fixture now
\ No newline at end of file
+    # Cleanup happens in test_db fixture now
+@pytest.fixture(autouse=True)
+def fail_on_blocked_event_loop():
+    """With LOOP_MONITOR_FAIL_MS set, fail tests whose handlers block the event loop longer"""
+    if settings.loop_monitor_fail_ms <= 0:
+        yield
+        return
+    loop_monitor.reset()
+    yield
+    # Let the heartbeat wake up and record a stall that just ended
+    time.sleep(loop_monitor.interval * 2)
+    loop_monitor.assert_not_blocked(settings.loop_monitor_fail_ms)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.models.audit_log import AuditLogModel
+from src.services.audit_service import AuditWriter
+
+def login(test_client: TestClient, email: str) -> dict:
+    response = test_client.post("/admin/login", json={"email": email, "password": "TestPass123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def wait_for_events(test_client: TestClient, url: str, headers: dict, count: int, timeout: float = 10.0) -> dict:
+    """Poll an audit endpoint until `count` events are visible"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        page = test_client.get(url, headers=headers).json()
+        if len(page["events"]) >= count:
+            return page
+        time.sleep(0.2)
+    pytest.fail(f"Fewer than {count} audit events after {timeout}s")
+
+def test_lifecycle_events_are_queryable(test_client: TestClient, monkeypatch):
+    """Test create, update and delete are written to the audit log and paginated"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    created = test_client.post("/org/create", json={
+        "organization_name": "Audited", "email": "admin@audited.com", "password": "TestPass123"
+    }).json()
+    headers = login(test_client, "admin@audited.com")
+    test_client.put("/org/update", json={"organization_name": "Audited", "password": "NewSecret123"}, headers=headers)
+
+    page = wait_for_events(test_client, "/org/audit", headers, 2)
+    assert [event["event"] for event in page["events"]] == ["organization.updated", "organization.created"]
+    assert page["events"][0]["details"] == {"fields": ["password"]}
+    assert "NewSecret123" not in str(page)
+    assert page["events"][1]["actor"] == "admin@audited.com"
+    assert page["events"][1]["organization_id"] == created["id"]
+
+    first = test_client.get("/org/audit", params={"limit": 1}, headers=headers).json()
+    second = test_client.get("/org/audit", params={"limit": 1, "cursor": first["next_cursor"]}, headers=headers).json()
+    assert [event["event"] for event in first["events"] + second["events"]] == ["organization.updated", "organization.created"]
+    filtered = test_client.get("/org/audit", params={"event": "organization.created"}, headers=headers).json()
+    assert [event["event"] for event in filtered["events"]] == ["organization.created"]
+    assert test_client.get("/org/audit", params={"cursor": "nonsense"}, headers=headers).status_code == 400
+
+    # Events outlive the organization and stay readable through /internal
+    test_client.request("DELETE", "/org/delete", json={"organization_name": "Audited"}, headers=headers)
+    page = wait_for_events(
+        test_client, f"/internal/audit/{created['id']}", {"X-Internal-Token": "internal-test-token"}, 4
+    )
+    assert [event["event"] for event in page["events"]][:2] == ["organization.deleted", "organization.delete_requested"]
+    assert page["writer"]["dropped"] == 0
+
+async def test_writer_flushes_on_size_and_applies_backpressure(test_client: TestClient, monkeypatch):
+    """Test full batches flush early and a full buffer makes producers wait, then drop"""
+    writer = AuditWriter(max_buffer=5, batch_size=2, flush_interval=60, enqueue_timeout=0.2)
+    await writer.start()
+    for i in range(4):
+        assert await writer.record("test.event", "org-1", details={"n": i})
+    for _ in range(50):
+        if writer.stats["written"] == 4:
+            break
+        await asyncio.sleep(0.02)
+    assert writer.stats["written"] == 4 and writer.buffered == 0
+
+    def unavailable(events):
+        raise RuntimeError("MongoDB unavailable")
+
+    monkeypatch.setattr(AuditLogModel, "insert_batch", staticmethod(unavailable))
+    for i in range(5):
+        assert await writer.record("test.event", "org-1", details={"n": 4 + i})
+    started = time.monotonic()
+    assert await writer.record("test.event", "org-1") is False
+    assert time.monotonic() - started >= 0.2
+    assert writer.stats["dropped"] == 1 and writer.buffered == 5
+    assert writer.record_nowait("test.event", "org-1") is False
+
+    # Queued events survive the outage and are written on shutdown
+    monkeypatch.undo()
+    await writer.stop()
+    assert writer.stats["written"] == 9 and writer.buffered == 0
+    page = AuditLogModel.page("org-1", 20)
+    assert [event["details"]["n"] for event in page] == list(range(8, -1, -1))
+
+async def test_old_partitions_are_dropped(test_client: TestClient, monkeypatch):
+    """Test months beyond the retention are dropped as whole collections"""
+    monkeypatch.setattr(settings, "audit_retention_months", 2)
+    master = mongo_manager.get_master_db()
+    master["audit_log_200001"].insert_one({"at": datetime(2000, 1, 5)})
+    current = AuditLogModel.partition_name(datetime.utcnow())
+    master[current].insert_one({"at": datetime.utcnow()})
+
+    dropped = await AuditWriter().apply_retention()
+
+    assert dropped == ["audit_log_200001"]
+    assert AuditLogModel.partitions() == [current]
@@ -62,6 +62,22 @@ def test_token_verification(test_client: TestClient, sample_organization_data: d
     assert data["message"] == "Token is valid"
     assert "admin" in data
 
+def test_token_verification_not_modified(test_client: TestClient, sample_organization_data: dict):
+    """Test /admin/verify honours If-None-Match"""
+    test_client.post("/org/create", json=sample_organization_data)
+    login_response = test_client.post("/admin/login", json={
+        "email": sample_organization_data["email"],
+        "password": sample_organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    
+    etag = test_client.get("/admin/verify", headers=headers).headers["etag"]
+    # Compared weakly: a client dropping the W/ prefix still matches
+    response = test_client.get("/admin/verify", headers={**headers, "If-None-Match": etag[2:]})
+    
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
 def test_token_verification_invalid_token(test_client: TestClient):
     """Test token verification with invalid token"""
     headers = {"Authorization": "Bearer invalid_token_here"}
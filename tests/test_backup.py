@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import bson
+from fastapi.testclient import TestClient
+from src.db.backup import BackupEngine, ChunkStore, get_codec, iter_chunk_documents, list_backups, read_chunk
+from src.db.backup_store import apply_retention, verify_backups
+from src.db.mongo import mongo_manager
+
+def create_organization(test_client: TestClient, name: str) -> str:
+    response = test_client.post("/org/create", json={
+        "organization_name": name, "email": f"admin@{name.lower()}.com", "password": "TestPass123"
+    })
+    return response.json()["id"]
+
+def restored_documents(backup_dir: str, manifest: dict, collection: str) -> list:
+    documents = []
+    for chunk in manifest["collections"][collection]["chunks"]:
+        data = read_chunk(backup_dir, manifest, chunk)
+        for document in iter_chunk_documents(data, manifest["format"]):
+            documents.append(bson.decode(document.raw) if manifest["format"] == "bson" else document)
+    return documents
+
+def test_full_backup_round_trips_every_collection(test_client: TestClient, tmp_path):
+    """Test each collection is chunked, checksummed and decodes back to its documents"""
+    org_id = create_organization(test_client, "BackupOrg")
+    tenant = mongo_manager.get_master_db()[f"org_{org_id}"]
+    tenant.insert_many([{"n": i, "payload": "x" * 200} for i in range(100)])
+
+    manifest = BackupEngine(root=str(tmp_path), workers=3, chunk_bytes=4096).run()
+    backup_dir = os.path.join(str(tmp_path), manifest["backup_id"])
+
+    assert manifest["status"] == "completed"
+    assert {"organizations", "admin_users", f"org_{org_id}"} <= set(manifest["collections"])
+    entry = manifest["collections"][f"org_{org_id}"]
+    assert entry["documents"] == 101
+    assert len(entry["chunks"]) > 1
+    assert any(index["name"] == "_id_" for index in entry["indexes"])
+    assert restored_documents(backup_dir, manifest, f"org_{org_id}") == list(tenant.find().sort("_id", 1))
+    assert list_backups(str(tmp_path))[0]["backup_id"] == manifest["backup_id"]
+
+def test_interrupted_backup_resumes_after_last_chunk(test_client: TestClient, tmp_path):
+    """Test a resumed backup keeps recorded chunks and writes only the rest"""
+    org_id = create_organization(test_client, "ResumeOrg")
+    tenant = mongo_manager.get_master_db()[f"org_{org_id}"]
+    tenant.insert_many([{"n": i, "payload": "y" * 200} for i in range(60)])
+    manifest = BackupEngine(root=str(tmp_path), workers=2, chunk_bytes=4096, fmt="ndjson").run()
+    backup_dir = os.path.join(str(tmp_path), manifest["backup_id"])
+    chunk_count = len(manifest["collections"][f"org_{org_id}"]["chunks"])
+
+    # Simulate a crash after the first chunk of the tenant collection
+    manifest["status"] = "running"
+    entry = manifest["collections"][f"org_{org_id}"]
+    entry["chunks"], entry["complete"] = entry["chunks"][:1], False
+    entry["documents"] = entry["chunks"][0]["documents"]
+    with open(os.path.join(backup_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    engine = BackupEngine(root=str(tmp_path), workers=2, chunk_bytes=4096)
+    resumed = engine.run(backup_id=manifest["backup_id"])
+
+    assert resumed["status"] == "completed"
+    assert resumed["format"] == "ndjson"
+    assert len(resumed["collections"][f"org_{org_id}"]["chunks"]) == chunk_count
+    assert engine.stats["documents"] == 61 - entry["documents"]
+    assert restored_documents(backup_dir, resumed, f"org_{org_id}") == list(tenant.find().sort("_id", 1))
+
+def test_tenant_backup_contains_only_that_tenant(test_client: TestClient, tmp_path):
+    """Test a tenant backup holds its collection, registry entry and admin user"""
+    org_id = create_organization(test_client, "TenantOnly")
+    create_organization(test_client, "OtherTenant")
+    organization = mongo_manager.get_master_db().organizations.find_one({"organization_name": "TenantOnly"})
+
+    manifest = BackupEngine(root=str(tmp_path), workers=2).run(organization=organization)
+    backup_dir = os.path.join(str(tmp_path), manifest["backup_id"])
+
+    assert manifest["type"] == "tenant"
+    assert manifest["tenant"]["organization_id"] == org_id
+    assert set(manifest["collections"]) == {f"org_{org_id}", "organizations", "admin_users"}
+    registry = restored_documents(backup_dir, manifest, "organizations")
+    assert [doc["organization_name"] for doc in registry] == ["TenantOnly"]
+    assert len(restored_documents(backup_dir, manifest, "admin_users")) == 1
+
+def test_unchanged_chunks_are_stored_once_and_collected(test_client: TestClient, tmp_path):
+    """Test a second backup reuses unchanged chunks, gc sweeps orphans and verify spots damage"""
+    org_id = create_organization(test_client, "DedupOrg")
+    tenant = mongo_manager.get_master_db()[f"org_{org_id}"]
+    tenant.insert_many([{"n": i, "payload": "x" * 200} for i in range(300)])
+    root = str(tmp_path)
+    first = BackupEngine(root=root, workers=2, chunk_bytes=4096).run()
+
+    # Same-size edit in the middle: only the chunk holding it changes
+    tenant.update_one({"n": 150}, {"$set": {"payload": "z" * 200}})
+    second = BackupEngine(root=root, workers=2, chunk_bytes=4096).run()
+
+    chunks = second["collections"][f"org_{org_id}"]["chunks"]
+    assert len(chunks) > 3
+    assert [chunk["new"] for chunk in chunks].count(True) == 1
+    assert restored_documents(os.path.join(root, second["backup_id"]), second, f"org_{org_id}") == list(tenant.find().sort("_id", 1))
+    summaries = {backup["backup_id"]: backup for backup in list_backups(root)}
+    assert summaries[second["backup_id"]]["stored_bytes"] < summaries[first["backup_id"]]["stored_bytes"]
+
+    # Age the first backup out of retention: its superseded chunk becomes garbage
+    old_id = (datetime.utcnow() - timedelta(days=30)).strftime("%Y%m%d_%H%M%S")
+    os.rename(os.path.join(root, first["backup_id"]), os.path.join(root, old_id))
+    result = apply_retention(root=root, days=7, grace_seconds=0)
+    assert result["removed_backups"] == [old_id]
+    assert result["removed_chunks"] == 1
+    assert verify_backups(root=root, workers=4)["ok"] is True
+
+    damaged = chunks[0]["file"]
+    with open(os.path.join(root, damaged), "r+b") as f:
+        f.write(b"corrupt")
+    report = verify_backups(root=root, workers=4)
+    assert report["ok"] is False
+    assert report["backups"][second["backup_id"]] == {"status": "damaged", "bad_chunks": [damaged]}
+
+def test_chunks_reused_by_a_running_backup_survive_gc(test_client: TestClient, tmp_path, monkeypatch):
+    """Test garbage collection waits out a running backup and a swept chunk is rewritten"""
+    org_id = create_organization(test_client, "ReuseOrg")
+    mongo_manager.get_master_db()[f"org_{org_id}"].insert_many([{"n": i, "payload": "x" * 200} for i in range(100)])
+    root = str(tmp_path)
+    first = BackupEngine(root=root, workers=1, chunk_bytes=4096).run()
+    # Its chunks are now old and unreferenced: the next sweep would take them all
+    shutil.rmtree(os.path.join(root, first["backup_id"]))
+    for directory, _, filenames in os.walk(os.path.join(root, "chunks")):
+        for filename in filenames:
+            os.utime(os.path.join(directory, filename), (0, 0))
+
+    reusing, resume = threading.Event(), threading.Event()
+    put = ChunkStore.put
+    def paused_put(self, raw, codec, suffix):
+        stored = put(self, raw, codec, suffix)
+        if not stored[3] and not reusing.is_set():
+            reusing.set()
+            resume.wait(10)
+        return stored
+    monkeypatch.setattr(ChunkStore, "put", paused_put)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        backup = pool.submit(BackupEngine(root=root, workers=1, chunk_bytes=4096).run)
+        assert reusing.wait(10)
+        result = apply_retention(root=root, days=7, grace_seconds=0)
+        assert result["chunk_gc_skipped"] is True and result["removed_chunks"] == 0
+        resume.set()
+        second = backup.result()
+
+    assert any(not chunk["new"] for entry in second["collections"].values() for chunk in entry["chunks"])
+    assert verify_backups(root=root, workers=2)["ok"] is True
+    assert apply_retention(root=root, days=7, grace_seconds=0)["chunk_gc_skipped"] is False
+    assert verify_backups(root=root, workers=2)["ok"] is True
+
+    # Swept between the existence check and the touch: the chunk is written again
+    store = ChunkStore(root)
+    chunk = second["collections"][f"org_{org_id}"]["chunks"][0]
+    path = os.path.join(root, chunk["file"])
+    raw = read_chunk(os.path.join(root, second["backup_id"]), second, chunk)
+    def swept_utime(target, *args, **kwargs):
+        os.remove(target)
+        raise FileNotFoundError(target)
+    monkeypatch.setattr(os, "utime", swept_utime)
+    suffix = os.path.basename(chunk["file"])[len(chunk["hash"]):]
+    relative_path, _, _, new = store.put(raw, get_codec(second["compression"]), suffix)
+    assert new is True and relative_path == chunk["file"] and os.path.exists(path)
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from src.db.mongo import mongo_manager
+
+def create_organization(test_client: TestClient, name: str) -> dict:
+    email = f"admin@{name.lower()}.com"
+    response = test_client.post("/org/create", json={"organization_name": name, "email": email, "password": "TestPass123"})
+    login = test_client.post("/admin/login", json={"email": email, "password": "TestPass123"})
+    return {"id": response.json()["id"], "headers": {"Authorization": f"Bearer {login.json()['access_token']}"}}
+
+def test_batch_get_by_name_keeps_request_order(test_client: TestClient):
+    """Test each name gets its own entry, in order, with per-item access checks"""
+    mine = create_organization(test_client, "BatchMine")
+    create_organization(test_client, "BatchOther")
+
+    response = test_client.post("/org/batch-get", json={
+        "names": ["BatchOther", "Missing", "BatchMine", "BatchMine"]
+    }, headers=mine["headers"])
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["key"] for item in items] == ["BatchOther", "Missing", "BatchMine", "BatchMine"]
+    assert [item["status"] for item in items] == [403, 404, 200, 200]
+    assert "organization" not in items[0]
+    assert items[2]["organization"]["id"] == mine["id"]
+    assert items[2]["organization"]["collection_name"] == f"org_{mine['id']}"
+
+    # The ETag is the one /org/get sends
+    single = test_client.get("/org/get", params={"org_name": "BatchMine"}, headers=mine["headers"])
+    assert items[2]["etag"] == single.headers["etag"]
+
+def test_batch_get_by_id_uses_one_query(test_client: TestClient, monkeypatch):
+    """Test ids resolve through a single $in query and bad ids are just not found"""
+    mine = create_organization(test_client, "BatchById")
+    collection = mongo_manager.get_master_db().organizations
+    queries = []
+    original_find = type(collection).find
+
+    def counting_find(self, *args, **kwargs):
+        if self.name == "organizations":
+            queries.append(args[0] if args else kwargs.get("filter"))
+        return original_find(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(collection), "find", counting_find)
+    response = test_client.post("/org/batch-get", json={
+        "ids": [mine["id"], "not-an-id", "0123456789abcdef01234567"]
+    }, headers=mine["headers"])
+    monkeypatch.undo()
+
+    assert [item["status"] for item in response.json()["items"]] == [200, 404, 404]
+    assert len(queries) == 1 and "$in" in queries[0]["_id"]
+
+def test_batch_get_validation(test_client: TestClient):
+    """Test the request must name exactly one key type and stay within the limit"""
+    mine = create_organization(test_client, "BatchLimits")
+    assert test_client.post("/org/batch-get", json={}, headers=mine["headers"]).status_code == 400
+    assert test_client.post("/org/batch-get", json={"names": ["a"], "ids": ["b"]}, headers=mine["headers"]).status_code == 400
+    assert test_client.post("/org/batch-get", json={"names": ["x"] * 101}, headers=mine["headers"]).status_code == 422
+    assert test_client.post("/org/batch-get", json={"names": ["BatchLimits"]}).status_code in (401, 403)
@@ -0,0 +1,135 @@
+import bson
+from fastapi.testclient import TestClient
+from src.models.admin_user import AdminUserModel
+from src.utils.cache import ModelCache, MemoryCacheBackend, model_cache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class CountingLoader:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+def build_cache(clock: FakeClock) -> ModelCache:
+    return ModelCache(
+        MemoryCacheBackend(clock=clock),
+        ttl=60, negative_ttl=5, stale_ttl=10, lock_wait_ms=0, clock=clock
+    )
+
+def test_read_through_and_invalidate():
+    """Test values are loaded once, then served until invalidated"""
+    cache = build_cache(FakeClock())
+    loader = CountingLoader({"_id": "1", "organization_name": "Acme"})
+
+    assert cache.get_or_load("k", loader) == loader.value
+    assert cache.get_or_load("k", loader) == loader.value
+    assert loader.calls == 1
+
+    cache.invalidate("k")
+    cache.get_or_load("k", loader)
+    assert loader.calls == 2
+
+def test_missing_documents_are_cached_briefly():
+    """Test negative entries expire after the negative TTL"""
+    clock = FakeClock()
+    cache = build_cache(clock)
+    loader = CountingLoader(None)
+
+    assert cache.get_or_load("missing", loader) is None
+    assert cache.get_or_load("missing", loader) is None
+    assert loader.calls == 1
+    assert cache.stats["negative_hits"] == 1
+
+    clock.now += 6
+    cache.get_or_load("missing", loader)
+    assert loader.calls == 2
+
+def test_stale_entry_refreshed_by_one_caller():
+    """Test only the lock holder reloads an expired entry; others get the stale copy"""
+    clock = FakeClock()
+    cache = build_cache(clock)
+    cache.get_or_load("k", CountingLoader("old"))
+    clock.now += 61
+
+    # Another pod holds the refresh lock
+    cache.backend.add("lock:k", b"1", 5)
+    refresher = CountingLoader("new")
+    assert cache.get_or_load("k", refresher) == "old"
+    assert refresher.calls == 0
+    assert cache.stats["stale_hits"] == 1
+
+    cache.backend.delete("lock:k")
+    assert cache.get_or_load("k", refresher) == "new"
+    assert refresher.calls == 1
+
+def test_alias_follows_renames():
+    """Test a name alias stops resolving once the document is renamed"""
+    cache = build_cache(FakeClock())
+    docs = {"1": {"_id": "1", "organization_name": "Acme"}}
+
+    def find_by_name(name):
+        return next((doc for doc in docs.values() if doc["organization_name"] == name), None)
+
+    def lookup(name):
+        return cache.get_or_load_aliased(
+            f"name:{name}", lambda doc_id: f"id:{doc_id}",
+            lambda: find_by_name(name), docs.get,
+            lambda doc: doc["organization_name"] == name
+        )
+
+    assert lookup("Acme")["_id"] == "1"
+    docs["1"] = {"_id": "1", "organization_name": "Renamed"}
+    cache.invalidate("id:1")
+
+    assert lookup("Acme") is None
+    assert lookup("Renamed")["_id"] == "1"
+
+def test_login_served_from_cache(test_client: TestClient, sample_organization_data: dict, monkeypatch):
+    """Test repeated logins hit the cache and updates are visible immediately"""
+    monkeypatch.setattr(model_cache, "backend", MemoryCacheBackend())
+    login = {"email": sample_organization_data["email"], "password": sample_organization_data["password"]}
+
+    test_client.post("/org/create", json=sample_organization_data)
+    assert test_client.post("/admin/login", json=login).status_code == 200
+    hits = model_cache.stats["hits"]
+    response = test_client.post("/admin/login", json=login)
+    assert response.status_code == 200
+    assert model_cache.stats["hits"] > hits
+
+    # A rename invalidates the cached organization
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    test_client.put("/org/update", json={
+        "organization_name": sample_organization_data["organization_name"],
+        "new_organization_name": "CachedRename"
+    }, headers=headers)
+    token = test_client.post("/admin/login", json=login).json()["access_token"]
+    response = test_client.get("/admin/verify", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["admin"]["organization_name"] == "CachedRename"
+    assert test_client.get(
+        f"/org/get?org_name={sample_organization_data['organization_name']}", headers=headers
+    ).status_code == 404
+
+def test_credentials_are_never_cached(test_client: TestClient, sample_organization_data: dict, monkeypatch):
+    """Test cached admin documents leave out the password hash"""
+    backend = MemoryCacheBackend()
+    monkeypatch.setattr(model_cache, "backend", backend)
+    login = {"email": sample_organization_data["email"], "password": sample_organization_data["password"]}
+
+    test_client.post("/org/create", json=sample_organization_data)
+    token = test_client.post("/admin/login", json=login).json()["access_token"]
+    assert test_client.get("/admin/verify", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    admin = AdminUserModel.find_by_email(sample_organization_data["email"])
+    assert admin is not None and "hashed_password" not in admin
+
+    cached = [bson.decode(value)["value"] for value, _ in backend._entries.values()]
+    assert any(isinstance(value, dict) and value.get("email") == login["email"] for value in cached)
+    assert not any(isinstance(value, dict) and "hashed_password" in value for value in cached)
@@ -0,0 +1,129 @@
+import gzip
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from src.middleware.compression_middleware import (
+    CompressionMiddleware, load_compression_rules, negotiate_encoding, available_encoders
+)
+from src.utils.etag import etag_matches, make_etag, not_modified, validator_headers
+
+LARGE = {"organizations": [{"organization_name": f"Org {i}", "admin_email": f"a{i}@x.com"} for i in range(200)]}
+
+def build_client(rules_json: str = "", minimum_size: int = 500) -> TestClient:
+    """Small app with only the compression middleware installed"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, rules=load_compression_rules(rules_json))
+
+    @app.get("/large")
+    async def large():
+        return LARGE
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(50):
+                yield f'{{"line": {i}, "padding": "{"x" * 40}"}}\n'
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/binary")
+    async def binary():
+        return StreamingResponse(iter([b"\0" * 4096]), media_type="application/octet-stream")
+
+    return TestClient(app)
+
+def test_negotiation_respects_q_values():
+    """Test the preferred encoding is picked unless the client weights it lower"""
+    levels = {"gzip": 6, "br": 4, "zstd": 3}
+    encoders = {"gzip": object, "br": object, "zstd": object}
+
+    assert negotiate_encoding("gzip, br, zstd", levels, encoders) == "zstd"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", levels, encoders) == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0", levels, encoders) is None
+    assert negotiate_encoding("identity", levels, encoders) is None
+    assert negotiate_encoding("*", {"gzip": 6}, encoders) == "gzip"
+    # Encodings missing from this environment are never chosen
+    assert negotiate_encoding("zstd, gzip;q=0.5", levels, {"gzip": object}) == "gzip"
+
+def test_large_json_is_gzipped():
+    """Test large responses are compressed and vary on Accept-Encoding"""
+    client = build_client()
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    # httpx decodes the body transparently
+    assert response.json() == LARGE
+
+def test_small_and_binary_responses_pass_through():
+    """Test bodies under the minimum size and non-text types are not compressed"""
+    client = build_client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["content-length"] == str(len(small.content))
+
+    binary = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in binary.headers
+
+def test_streaming_response_is_compressed_incrementally():
+    """Test streamed bodies decode to the original lines"""
+    client = build_client(minimum_size=100)
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 50
+    assert lines[0].startswith('{"line": 0')
+
+def test_route_rule_can_disable_compression():
+    """Test a level of 0 turns an encoding off for a route prefix"""
+    client = build_client('{"/large": {"gzip": 0, "br": 0, "zstd": 0}}')
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br, zstd"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_optional_encoders_round_trip(encoding):
+    """Test brotli and zstd output decodes when the packages are installed"""
+    encoders = available_encoders()
+    if encoding not in encoders:
+        pytest.skip(f"{encoding} encoder not installed")
+
+    payload = b'{"organization_name": "Org"}' * 100
+    encoder = encoders[encoding](3)
+    data = encoder.compress(payload[:1000], flush=True) + encoder.finish(payload[1000:])
+
+    if encoding == "br":
+        import brotli
+        assert brotli.decompress(data) == payload
+    else:
+        import zstandard
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(data) == payload
+
+def test_not_modified_repeats_the_compressed_etag():
+    """Test a 304 carries the same tag as the compressed 200, and matches it"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, rules=load_compression_rules(""))
+    etag = make_etag("large", 1)
+
+    @app.get("/large")
+    async def large(request: Request):
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return not_modified(etag)
+        return JSONResponse(LARGE, headers=validator_headers(etag))
+
+    client = TestClient(app)
+    full = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert full.headers["content-encoding"] == "gzip"
+
+    revalidated = client.get("/large", headers={"Accept-Encoding": "gzip", "If-None-Match": full.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == full.headers["etag"]
@@ -0,0 +1,100 @@
+import os
+from datetime import datetime, timedelta
+from bson import json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS
+from bson.timestamp import Timestamp
+from fastapi.testclient import TestClient
+from src.db.backup import BackupEngine
+from src.db.incremental_backup import IncrementalBackup, chain_for_time, load_manifest
+from src.db.mongo import mongo_manager
+from src.db.restore import RestoreEngine
+from src.db.backup_store import apply_retention
+
+def create_organization(test_client: TestClient, name: str) -> str:
+    response = test_client.post("/org/create", json={
+        "organization_name": name, "email": f"admin@{name.lower()}.com", "password": "TestPass123"
+    })
+    return response.json()["id"]
+
+def base_backup(root: str, seconds: int) -> dict:
+    """Full backup with a change stream position (needs a replica set, so set one by hand)"""
+    manifest = BackupEngine(root=root, workers=2).run()
+    manifest["position"] = json_util.dumps(
+        {"resume_token": {"_data": "base"}, "operation_time": Timestamp(seconds, 1)},
+        json_options=CANONICAL_JSON_OPTIONS
+    )
+    with open(os.path.join(root, manifest["backup_id"], "manifest.json"), "w") as f:
+        f.write(json_util.dumps(manifest))
+    return manifest
+
+def event(seconds: int, op: str, coll: str, **fields) -> dict:
+    return {"ts": Timestamp(seconds, 1), "op": op, "coll": coll, **fields}
+
+def test_point_in_time_restore_replays_increments(test_client: TestClient, tmp_path):
+    """Test base plus increments rebuild the state at any time they cover"""
+    org_id = create_organization(test_client, "PitrOrg")
+    tenant_name = f"org_{org_id}"
+    mongo_manager.get_master_db()[tenant_name].insert_many([{"_id": i, "tags": [1, 2, 3]} for i in range(20)])
+    root = str(tmp_path)
+    base = base_backup(root, 1000)
+
+    backup = IncrementalBackup(root=root, chunk_bytes=256, db=mongo_manager.get_master_db())
+    first = backup.write(base, [
+        event(1001, "insert", tenant_name, key={"_id": 100}, doc={"_id": 100, "tags": []}),
+        event(1002, "update", tenant_name, key={"_id": 1}, update={
+            "updatedFields": {"status": "active"}, "removedFields": [], "truncatedArrays": [{"field": "tags", "newSize": 1}]
+        }),
+        event(1003, "insert", "scratch", key={"_id": 1}, doc={"_id": 1}),
+        event(1004, "drop", "scratch"),
+        event(1005, "delete", tenant_name, key={"_id": 2}),
+    ], lambda: {"_data": "first"})
+    second = backup.write(load_manifest(root, first["backup_id"]), [
+        event(1010, "update", tenant_name, key={"_id": 1}, update={"updatedFields": {}, "removedFields": ["status"]}),
+    ], lambda: {"_data": "second"})
+
+    assert len(first["events"]["chunks"]) > 1
+    assert first["base_id"] == second["base_id"] == base["backup_id"]
+    assert [m["backup_id"] for m in chain_for_time(root)] == [base["backup_id"], first["backup_id"], second["backup_id"]]
+
+    client = mongo_manager.get_client()
+    as_of_1002 = client["pitr_1002"]
+    result = RestoreEngine(as_of_1002, root=root, workers=3).restore(until=datetime.utcfromtimestamp(1002))
+    tenant = as_of_1002[tenant_name]
+    assert result["increments"] == [first["backup_id"]]
+    assert tenant.find_one({"_id": 1}) == {"_id": 1, "tags": [1], "status": "active"}
+    assert tenant.find_one({"_id": 100}) is not None
+    assert tenant.find_one({"_id": 2}) is not None
+    assert as_of_1002.organizations.count_documents({}) == 1
+
+    latest = client["pitr_latest"]
+    result = RestoreEngine(latest, root=root, workers=3).restore()
+    tenant = latest[tenant_name]
+    assert result["increments"] == [first["backup_id"], second["backup_id"]]
+    assert tenant.find_one({"_id": 1}) == {"_id": 1, "tags": [1]}
+    assert tenant.find_one({"_id": 2}) is None
+    assert tenant.count_documents({}) == mongo_manager.get_master_db()[tenant_name].count_documents({})  # one insert, one delete
+    assert "scratch" not in latest.list_collection_names()
+    client.drop_database("pitr_1002")
+    client.drop_database("pitr_latest")
+
+def test_retention_keeps_bases_of_recent_increments(test_client: TestClient, tmp_path):
+    """Test retention removes old backups but not the chain a recent increment needs"""
+    root = str(tmp_path)
+    old = (datetime.utcnow() - timedelta(days=10)).strftime("%Y%m%d_%H%M%S")
+    older = (datetime.utcnow() - timedelta(days=11)).strftime("%Y%m%d_%H%M%S")
+    base = base_backup(root, 1000)
+    increment = IncrementalBackup(root=root, db=mongo_manager.get_master_db()).write(base, [], lambda: {"_data": "x"})
+    newest_full = BackupEngine(root=root, workers=2).run()
+
+    # Age the base and an unrelated full backup past the retention window
+    os.rename(os.path.join(root, base["backup_id"]), os.path.join(root, old))
+    manifest = load_manifest(root, increment["backup_id"])
+    manifest["parent_id"] = manifest["base_id"] = old
+    with open(os.path.join(root, increment["backup_id"], "manifest.json"), "w") as f:
+        f.write(json_util.dumps(manifest))
+    os.makedirs(os.path.join(root, older))
+
+    result = apply_retention(root=root, days=7)
+
+    assert result["removed_backups"] == [older]
+    assert sorted(name for name in os.listdir(root) if name != "chunks") == sorted([old, increment["backup_id"], newest_full["backup_id"]])
@@ -0,0 +1,24 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.db.index_coverage import verify_index_coverage
+from src.models.organization import OrganizationModel
+from src.models.admin_user import AdminUserModel
+from src.models.tenant_usage import TenantUsageModel
+
+def test_model_queries_are_index_backed(test_client: TestClient):
+    """Test no model or route query scans a collection, sorts in memory or leaves an index unused"""
+    # test_db drops the master database before each test, indexes included
+    OrganizationModel.create_indexes()
+    AdminUserModel.create_indexes()
+    TenantUsageModel.create_indexes(settings.usage_retention_days)
+    try:
+        report = verify_index_coverage()
+    except NotImplementedError as e:
+        pytest.skip(f"Server cannot explain queries: {e}")
+    if not report["captured"]:
+        pytest.skip("Server does not report command events")
+
+    assert report["problems"] == [], "\n".join(report["problems"])
+    queries = {query["query"]: query for query in report["queries"]}
+    assert "created_at_-1" in queries["OrganizationModel.list_recent"]["indexes"]
@@ -0,0 +1,110 @@
+import os
+import time
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.models.job import JobModel
+from src.services.job_service import job_worker
+
+def login_headers(test_client: TestClient, email: str, password: str) -> dict:
+    """Login and return authorization headers"""
+    response = test_client.post("/admin/login", json={"email": email, "password": password})
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def wait_for_job(test_client: TestClient, job_id: str, headers: dict, timeout: float = 15.0) -> dict:
+    """Poll job status until it finishes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = test_client.get(f"/jobs/{job_id}", headers=headers)
+        assert response.status_code == 200
+        job = response.json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.2)
+    pytest.fail(f"Job {job_id} did not finish within {timeout}s")
+
+def test_delete_organization_runs_in_background(test_client: TestClient, sample_organization_data: dict):
+    """Test delete returns 202 and the job removes the organization"""
+    test_client.post("/org/create", json=sample_organization_data)
+    headers = login_headers(test_client, sample_organization_data["email"], sample_organization_data["password"])
+    
+    response = test_client.request(
+        "DELETE",
+        "/org/delete",
+        json={"organization_name": sample_organization_data["organization_name"]},
+        headers=headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    
+    # Repeated deletes return the already scheduled job
+    repeat = test_client.request(
+        "DELETE",
+        "/org/delete",
+        json={"organization_name": sample_organization_data["organization_name"]},
+        headers=headers
+    )
+    assert repeat.status_code in (202, 400)
+    if repeat.status_code == 202:
+        assert repeat.json()["job_id"] == job_id
+    
+    job = wait_for_job(test_client, job_id, headers)
+    assert job["status"] == "succeeded"
+    assert job["type"] == "delete_organization"
+    
+    # Admin user is gone with the organization
+    response = test_client.post("/admin/login", json={
+        "email": sample_organization_data["email"],
+        "password": sample_organization_data["password"]
+    })
+    assert response.status_code == 401
+
+def test_export_organization(test_client: TestClient, sample_organization_data: dict, tmp_path, monkeypatch):
+    """Test export returns 202 and the job reports the export file"""
+    monkeypatch.setattr(settings, "export_dir", str(tmp_path))
+    test_client.post("/org/create", json=sample_organization_data)
+    headers = login_headers(test_client, sample_organization_data["email"], sample_organization_data["password"])
+    
+    response = test_client.post(
+        "/org/export",
+        json={"organization_name": sample_organization_data["organization_name"]},
+        headers=headers
+    )
+    assert response.status_code == 202
+    
+    job = wait_for_job(test_client, response.json()["job_id"], headers)
+    assert job["status"] == "succeeded"
+    assert job["result"]["documents"] == 1
+    assert job["result"]["path"].endswith(".ndjson.gz")
+    assert os.path.dirname(job["result"]["path"]) == str(tmp_path)
+
+def test_job_not_found(test_client: TestClient, sample_organization_data: dict):
+    """Test unknown job ids return 404"""
+    test_client.post("/org/create", json=sample_organization_data)
+    headers = login_headers(test_client, sample_organization_data["email"], sample_organization_data["password"])
+    
+    assert test_client.get("/jobs/not-a-job-id", headers=headers).status_code == 404
+    assert test_client.get("/jobs/0123456789abcdef01234567", headers=headers).status_code == 404
+
+def test_expired_leases_are_retried_until_max_attempts(test_client: TestClient):
+    """Test a job that keeps losing its worker is failed instead of reclaimed forever"""
+    expired = datetime.utcnow() - timedelta(seconds=1)
+    job = {"type": "noop", "payload": {}, "status": "running", "lease_expires_at": expired, "run_at": expired}
+    # The app's own workers would race this test for the jobs
+    test_client.portal.call(job_worker.stop)
+    try:
+        retried = JobModel.create({**job, "attempts": 1, "max_attempts": 3}).inserted_id
+        exhausted = JobModel.create({**job, "attempts": 3, "max_attempts": 3}).inserted_id
+        
+        claimed = JobModel.claim_next("worker-a", 60)
+        assert claimed["_id"] == retried and claimed["attempts"] == 2
+        assert JobModel.claim_next("worker-a", 60) is None
+        
+        assert JobModel.fail_abandoned() == 1
+        failed = JobModel.find_by_id(str(exhausted))
+        assert failed["status"] == "failed" and "Lease expired" in failed["error"]
+    finally:
+        JobModel.get_collection().delete_many({"_id": {"$in": [retried, exhausted]}})
+        test_client.portal.call(job_worker.start)
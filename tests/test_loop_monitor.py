@@ -0,0 +1,59 @@
+import time
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.utils.loop_monitor import EventLoopBlockedError, EventLoopMonitor
+
+def blocking_handler():
+    time.sleep(0.2)
+
+async def run_monitored(body) -> EventLoopMonitor:
+    monitor = EventLoopMonitor(interval_ms=10, threshold_ms=40)
+    await monitor.start()
+    await asyncio.sleep(0.05)
+    await body()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    return monitor
+
+async def test_blocking_call_is_captured():
+    """Test a blocking call is recorded with its lag and attributed to the caller"""
+    async def body():
+        blocking_handler()
+
+    monitor = await run_monitored(body)
+    snapshot = monitor.snapshot()
+
+    # Other load on the machine may add unrelated stalls; look for ours
+    stalls = [stall for stall in snapshot["stalls"] if stall["offender"].endswith("in blocking_handler")]
+    assert stalls, snapshot["stalls"]
+    stall = stalls[0]
+    assert stall["lag_ms"] >= 150
+    assert stall["offender"].startswith("tests/test_loop_monitor.py")
+    assert snapshot["offenders"][stall["offender"]] >= 1
+    assert snapshot["lag_ms"]["buckets"][-1]["count"] == snapshot["lag_ms"]["count"]
+
+    with pytest.raises(EventLoopBlockedError, match="blocking_handler"):
+        monitor.assert_not_blocked(100)
+    monitor.assert_not_blocked(1000)
+
+async def test_awaiting_does_not_stall():
+    """Test time spent awaiting, including work moved to a thread, is not a stall"""
+    async def body():
+        await asyncio.to_thread(blocking_handler)
+
+    monitor = await run_monitored(body)
+
+    assert monitor.snapshot()["stalls"] == []
+    monitor.assert_not_blocked(40)
+
+def test_internal_event_loop_endpoint(test_client: TestClient, monkeypatch):
+    """Test the app's monitor is running and exposes its histogram"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    response = test_client.get("/internal/event-loop", headers={"X-Internal-Token": "internal-test-token"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["running"] is True
+    assert body["lag_ms"]["buckets"][-1]["le"] == "+Inf"
@@ -0,0 +1,110 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.models.tenant_migration import TenantMigrationModel
+from src.services.migration_service import (
+    TENANT_MIGRATIONS, TenantMigration, TenantMigrationRunner, current_schema_version
+)
+from src.utils.rate_limiter import MemoryRateLimitStore
+
+def create_organization(test_client: TestClient, name: str) -> str:
+    response = test_client.post("/org/create", json={
+        "organization_name": name, "email": f"admin@{name.lower()}.com", "password": "TestPass123"
+    })
+    return response.json()["id"]
+
+def add_price_cents(document):
+    if "price" in document:
+        return {"$set": {"price_cents": int(document["price"] * 100)}, "$unset": {"price": ""}}
+    return None
+
+def test_runner_migrates_tenants_and_records_state(test_client: TestClient, monkeypatch):
+    """Test every tenant is migrated in batches and its version recorded"""
+    master = mongo_manager.get_master_db()
+    org_ids = [create_organization(test_client, f"Migrate{i}") for i in range(3)]
+    monkeypatch.setitem(TENANT_MIGRATIONS, "1.1", TenantMigration("1.1", "Prices in cents", add_price_cents, {"price": {"$exists": True}}))
+    for org_id in org_ids:
+        master[f"org_{org_id}"].insert_many([{"sku": n, "price": n + 0.5} for n in range(45)])
+
+    runner = TenantMigrationRunner(workers=2, batch_size=10, rate=10_000, rate_limit_store=MemoryRateLimitStore())
+    stats = runner.run(org_ids)
+
+    assert stats["migrated"] == 3 and stats["failed"] == 0
+    assert stats["documents"] == 135
+    for org_id in org_ids:
+        collection = master[f"org_{org_id}"]
+        assert collection.count_documents({"price": {"$exists": True}}) == 0
+        assert collection.find_one({"sku": 3})["price_cents"] == 350
+        assert collection.find_one({"org_id": org_id})["metadata"]["schema_version"] == "1.1"
+        state = TenantMigrationModel.find(org_id)
+        assert state["schema_version"] == "1.1" and state["status"] == "completed"
+        assert state["runner_id"] is None and state["migrated"] == 45
+
+    # Already migrated tenants are skipped, and new ones start at the current version
+    assert TenantMigrationRunner(rate_limit_store=MemoryRateLimitStore()).run(org_ids)["up_to_date"] == 3
+    assert current_schema_version() == "1.1"
+    new_id = create_organization(test_client, "MigrateNew")
+    assert master[f"org_{new_id}"].find_one({"org_id": new_id})["metadata"]["schema_version"] == "1.1"
+
+def test_failed_migration_resumes_from_checkpoint(test_client: TestClient, monkeypatch):
+    """Test a failed run is resumed after the last checkpointed batch"""
+    seen = []
+    broken = {"sku": 25}
+
+    def tag(document):
+        seen.append(document["_id"])
+        if document.get("sku") == broken["sku"]:
+            raise RuntimeError("bad document")
+        return {"$set": {"tagged": True}}
+
+    org_id = create_organization(test_client, "Resumable")
+    collection = mongo_manager.get_master_db()[f"org_{org_id}"]
+    monkeypatch.setitem(TENANT_MIGRATIONS, "1.1", TenantMigration("1.1", "Tag documents", tag, {}))
+    collection.insert_many([{"sku": n} for n in range(40)])
+
+    runner = TenantMigrationRunner(workers=1, batch_size=10, rate=10_000, rate_limit_store=MemoryRateLimitStore())
+    assert runner.run([org_id])["failed"] == 1
+    state = TenantMigrationModel.find(org_id)
+    assert state["status"] == "failed" and "bad document" in state["error"]
+    assert state["migration"] == "1.1" and state["schema_version"] == "1.0"
+    assert state["last_id"] is not None
+
+    broken["sku"] = None
+    seen.clear()
+    runner = TenantMigrationRunner(workers=1, batch_size=10, rate=10_000, rate_limit_store=MemoryRateLimitStore())
+    assert runner.run([org_id])["migrated"] == 1
+    # Only the batch that failed and the ones after it are read again
+    assert len(seen) == 41 - 20
+    assert collection.count_documents({"tagged": True}) == 41
+    assert TenantMigrationModel.find(org_id)["schema_version"] == "1.1"
+
+def test_runner_throttles_documents(test_client: TestClient, monkeypatch):
+    """Test reads beyond the burst wait for the shared token bucket"""
+    org_id = create_organization(test_client, "Throttled")
+    monkeypatch.setitem(TENANT_MIGRATIONS, "1.1", TenantMigration("1.1", "Touch", lambda document: {"$set": {"touched": True}}, {}))
+    mongo_manager.get_master_db()[f"org_{org_id}"].insert_many([{"n": n} for n in range(149)])
+
+    runner = TenantMigrationRunner(workers=1, batch_size=20, rate=100, rate_limit_store=MemoryRateLimitStore())
+    started = time.monotonic()
+    assert runner.run([org_id])["documents"] == 150
+    # 100 documents fit the burst; the other 50 need half a second of refill
+    assert time.monotonic() - started >= 0.45
+
+def test_migration_status_endpoint(test_client: TestClient, monkeypatch):
+    """Test the internal endpoint reports versions and failures"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    org_id = create_organization(test_client, "StatusCheck")
+    monkeypatch.setitem(TENANT_MIGRATIONS, "1.1", TenantMigration("1.1", "Prices in cents", add_price_cents, {}))
+    TenantMigrationRunner(rate_limit_store=MemoryRateLimitStore()).run([org_id])
+
+    response = test_client.get("/internal/migrations", headers={"X-Internal-Token": "internal-test-token"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["current_version"] == "1.1"
+    assert body["migrations"] == [{"version": "1.1", "description": "Prices in cents"}]
+    assert any(group["schema_version"] == "1.1" and group["status"] == "completed" for group in body["tenants"])
+
+    with pytest.raises(ValueError):
+        TenantMigrationRunner(target_version="9.9")
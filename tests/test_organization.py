@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from src.config.settings import settings
 import json
 
 def test_create_organization(test_client: TestClient, sample_organization_data: dict):
@@ -48,6 +49,36 @@ def test_get_organization(test_client: TestClient, sample_organization_data: dic
     assert data["id"] == org_id
     assert data["organization_name"] == sample_organization_data["organization_name"]
 
+def test_get_organization_not_modified(test_client: TestClient, sample_organization_data: dict):
+    """Test If-None-Match returns 304 until the organization changes"""
+    test_client.post("/org/create", json=sample_organization_data)
+    login_response = test_client.post("/admin/login", json={
+        "email": sample_organization_data["email"],
+        "password": sample_organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    url = f"/org/get?org_name={sample_organization_data['organization_name']}"
+    
+    response = test_client.get(url, headers=headers)
+    etag = response.headers["etag"]
+    # Weak, so it is the same whether or not the response is compressed
+    assert etag.startswith("W/")
+    
+    response = test_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    
+    # Any update bumps updated_at and with it the ETag
+    test_client.put("/org/update", json={
+        "organization_name": sample_organization_data["organization_name"],
+        "email": "changed@testorg.com"
+    }, headers=headers)
+    response = test_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["admin_email"] == "changed@testorg.com"
+
 def test_get_nonexistent_organization(test_client: TestClient, sample_organization_data: dict):
     """Test fetching non-existent organization"""
     # Login first
@@ -115,6 +146,65 @@ def test_update_organization(test_client: TestClient, sample_organization_data:
         print(f"Test error: {e}")
         raise
         
+def test_rename_organization_keeps_collection(test_client: TestClient, sample_organization_data: dict):
+    """Test renaming only changes metadata, not the tenant collection"""
+    create_response = test_client.post("/org/create", json=sample_organization_data)
+    org = create_response.json()
+    assert org["collection_name"] == f"org_{org['id']}"
+    
+    login_response = test_client.post("/admin/login", json={
+        "email": sample_organization_data["email"],
+        "password": sample_organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    
+    response = test_client.put("/org/update", json={
+        "organization_name": sample_organization_data["organization_name"],
+        "new_organization_name": "RenamedOrg"
+    }, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["organization_name"] == "RenamedOrg"
+    
+    # Admin can still login and the collection did not move
+    login_response = test_client.post("/admin/login", json={
+        "email": sample_organization_data["email"],
+        "password": sample_organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    response = test_client.get("/org/get?org_name=RenamedOrg", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == org["id"]
+    assert response.json()["collection_name"] == org["collection_name"]
+        
+def test_tokens_issued_before_a_rename_keep_access(test_client: TestClient, sample_organization_data: dict, tmp_path, monkeypatch):
+    """Test update, export and delete authorize by organization id, not the token's name"""
+    monkeypatch.setattr(settings, "export_dir", str(tmp_path))
+    test_client.post("/org/create", json=sample_organization_data)
+    test_client.post("/org/create", json={
+        "organization_name": "OtherOrg", "email": "admin@otherorg.com", "password": "TestPass123"
+    })
+    login_response = test_client.post("/admin/login", json={
+        "email": sample_organization_data["email"],
+        "password": sample_organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    test_client.put("/org/update", json={
+        "organization_name": sample_organization_data["organization_name"],
+        "new_organization_name": "RenamedOrg"
+    }, headers=headers)
+    
+    # Same token, still naming the old organization name in its claims
+    response = test_client.put("/org/update", json={"organization_name": "RenamedOrg", "password": "NewPass1234"}, headers=headers)
+    assert response.status_code == 200
+    assert test_client.post("/org/export", json={"organization_name": "RenamedOrg"}, headers=headers).status_code == 202
+    
+    response = test_client.post("/org/export", json={"organization_name": "OtherOrg"}, headers=headers)
+    assert response.status_code == 403
+    response = test_client.request("DELETE", "/org/delete", json={"organization_name": "OtherOrg"}, headers=headers)
+    assert response.status_code == 403
+    response = test_client.request("DELETE", "/org/delete", json={"organization_name": "RenamedOrg"}, headers=headers)
+    assert response.status_code == 202
+
 def test_delete_organization(test_client: TestClient, sample_organization_data: dict):
     """Test deleting organization"""
     try:
@@ -135,24 +225,25 @@ def test_delete_organization(test_client: TestClient, sample_organization_data:
             
         token = login_response.json()["access_token"]
         
-        # Delete organization - FIX: Use data parameter instead of json for DELETE
+        # Delete organization
         headers = {"Authorization": f"Bearer {token}"}
         delete_data = {
             "organization_name": sample_organization_data["organization_name"]
         }
         
-        # For DELETE with body, use data parameter and json.dumps
-        import json as json_module
-        response = test_client.delete(
-            "/org/delete", 
-            data=json_module.dumps(delete_data),
-            headers={**headers, "Content-Type": "application/json"}
+        # TestClient.delete() takes no body, so go through request()
+        response = test_client.request(
+            "DELETE",
+            "/org/delete",
+            json=delete_data,
+            headers=headers
         )
         
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = response.json()
         assert "message" in data
-        assert "deleted successfully" in data["message"].lower()
+        assert "scheduled for deletion" in data["message"].lower()
+        assert "job_id" in data
         
     except Exception as e:
         print(f"Test error: {e}")
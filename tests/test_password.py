@@ -0,0 +1,75 @@
+import pytest
+from src.models.admin_user import AdminUserModel
+from src.services.admin_service import AdminService
+from src.utils import password
+from src.utils.password import (
+    calibrate_bcrypt_rounds,
+    configure_bcrypt_rounds,
+    get_bcrypt_rounds,
+    get_hash_cost,
+    hash_password,
+    password_needs_update,
+    verify_password
+)
+
+@pytest.fixture(autouse=True)
+def restore_bcrypt_rounds():
+    """Put the cost factor back after each test"""
+    rounds = get_bcrypt_rounds()
+    yield
+    configure_bcrypt_rounds(rounds)
+
+def test_calibration_stays_within_bounds():
+    """Test calibration picks a cost between the configured bounds"""
+    rounds = calibrate_bcrypt_rounds(target_ms=10_000, min_rounds=4, max_rounds=6, samples=1)
+    assert rounds == 6
+    
+    # A budget no hardware can meet still keeps the minimum cost
+    rounds = calibrate_bcrypt_rounds(target_ms=0.001, min_rounds=5, max_rounds=8, samples=1)
+    assert rounds == 5
+    assert password.bcrypt_calibration["calibrated"] is True
+
+def test_needs_update_below_the_floor_only():
+    """Test only hashes below the cluster-wide floor are flagged for rehash"""
+    configure_bcrypt_rounds(4, floor=4)
+    old_hash = hash_password("SomePass123")
+    assert get_hash_cost(old_hash) == 4
+    assert not password_needs_update(old_hash)
+    
+    configure_bcrypt_rounds(6, floor=5)
+    assert password_needs_update(old_hash)
+    # Old hashes keep verifying until they are replaced
+    assert verify_password("SomePass123", old_hash)
+    
+    new_hash = hash_password("SomePass123")
+    assert get_hash_cost(new_hash) == 6
+    assert not password_needs_update(new_hash)
+    
+    # A pod calibrated higher hashes new passwords at its cost but leaves
+    # hashes above the floor alone
+    configure_bcrypt_rounds(7, floor=5)
+    assert get_hash_cost(hash_password("SomePass123")) == 7
+    assert not password_needs_update(new_hash)
+    
+    # Lowering the cost never downgrades stored hashes
+    configure_bcrypt_rounds(4, floor=4)
+    assert not password_needs_update(new_hash)
+
+def test_deactivated_accounts_are_not_rehashed(test_client):
+    """Test a login refused for a deactivated admin does not upgrade its hash"""
+    configure_bcrypt_rounds(4, floor=4)
+    test_client.post("/org/create", json={
+        "organization_name": "RehashOrg", "email": "admin@rehash.com", "password": "TestPass123"
+    })
+    admin = AdminUserModel.find_by_email("admin@rehash.com")
+    AdminUserModel.update(str(admin["_id"]), {"is_active": False})
+    configure_bcrypt_rounds(5, floor=5)
+    scheduled = AdminService.rehash_stats["scheduled"]
+    
+    login = {"email": "admin@rehash.com", "password": "TestPass123"}
+    assert test_client.post("/admin/login", json=login).status_code == 401
+    assert AdminService.rehash_stats["scheduled"] == scheduled
+    
+    AdminUserModel.update(str(admin["_id"]), {"is_active": True})
+    assert test_client.post("/admin/login", json=login).status_code == 200
+    assert AdminService.rehash_stats["scheduled"] == scheduled + 1
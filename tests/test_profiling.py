@@ -0,0 +1,89 @@
+import time
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.middleware.profiling_middleware import ProfilingMiddleware
+from src.utils.profiler import (
+    request_profiler, sign_profile_token, speedscope_to_collapsed, verify_profile_token
+)
+
+SECRET = "profiling-test-secret"
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    """Point the global profiler at a temporary directory with a known secret"""
+    monkeypatch.setattr(request_profiler, "directory", str(tmp_path))
+    monkeypatch.setattr(request_profiler, "secret", SECRET)
+    monkeypatch.setattr(request_profiler, "sample_rate", 0.0)
+    monkeypatch.setattr(request_profiler, "interval_ms", 1.0)
+    return request_profiler
+
+def busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def build_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        busy_wait(0.05)
+        await asyncio.sleep(0.05)
+        return {"done": True}
+
+    return TestClient(app)
+
+def test_profile_tokens():
+    """Test tokens verify until expiry and reject tampering or a wrong secret"""
+    token = sign_profile_token(int(time.time()) + 60, SECRET)
+
+    assert verify_profile_token(token, SECRET)
+    assert not verify_profile_token(token, "other-secret")
+    assert not verify_profile_token(token.split(".")[0] + "." + "0" * 64, SECRET)
+    assert not verify_profile_token(sign_profile_token(int(time.time()) - 1, SECRET), SECRET)
+    assert not verify_profile_token("garbage", SECRET)
+
+def test_signed_header_profiles_request(profiler):
+    """Test a signed request is profiled with both running and awaiting stacks"""
+    token = sign_profile_token(int(time.time()) + 60, SECRET)
+    response = build_client().get("/work", headers={"X-Profile": token})
+
+    assert response.status_code == 200
+    document = profiler.load(response.headers["x-profile-id"])
+    assert document["profiles"][0]["type"] == "sampled"
+    assert document["profiles"][0]["samples"]
+
+    collapsed = speedscope_to_collapsed(document)
+    running = [line for line in collapsed.splitlines() if "work;busy_wait" in line]
+    awaiting = [line for line in collapsed.splitlines() if "work;sleep;(await" in line]
+    assert running and awaiting
+
+def test_unsigned_requests_are_not_profiled(profiler):
+    """Test requests without a valid token are passed through untouched"""
+    client = build_client()
+
+    assert "x-profile-id" not in client.get("/work").headers
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "1.bad"}).headers
+    assert profiler.list_profiles() == []
+
+def test_internal_profile_endpoints(test_client: TestClient, profiler, monkeypatch):
+    """Test stored profiles can be listed and downloaded in both formats"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    headers = {"X-Internal-Token": "internal-test-token"}
+    token = sign_profile_token(int(time.time()) + 60, SECRET)
+    profile_id = build_client().get("/work", headers={"X-Profile": token}).headers["x-profile-id"]
+
+    listing = test_client.get("/internal/profiles", headers=headers).json()
+    assert [p["id"] for p in listing["profiles"]] == [profile_id]
+
+    speedscope = test_client.get(f"/internal/profiles/{profile_id}", headers=headers)
+    assert speedscope.json()["$schema"].startswith("https://www.speedscope.app")
+    collapsed = test_client.get(f"/internal/profiles/{profile_id}?format=collapsed", headers=headers)
+    assert "busy_wait" in collapsed.text
+
+    missing = test_client.get("/internal/profiles/1-deadbeef", headers=headers)
+    assert missing.status_code == 404
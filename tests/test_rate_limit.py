@@ -0,0 +1,155 @@
+import pytest
+import threading
+from src.config.settings import settings
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.middleware.rate_limit_middleware import RateLimitMiddleware, load_rate_limit_rules
+from src.utils.rate_limiter import RateLimit, MemoryRateLimitStore
+from src.utils.jwt import create_access_token
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+def build_client(rules_json: str, store: MemoryRateLimitStore) -> TestClient:
+    """Small app with only the rate limit middleware installed"""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, rules=load_rate_limit_rules(rules_json), store=store)
+    
+    @app.get("/org/get")
+    async def org_get():
+        return {"ok": True}
+    
+    @app.post("/admin/login")
+    async def login():
+        return {"ok": True}
+    
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+    
+    return TestClient(app)
+
+def test_token_bucket_refills_over_time():
+    """Test bucket allows a burst, denies, then refills at the configured rate"""
+    clock = FakeClock()
+    store = MemoryRateLimitStore(clock=clock)
+    limit = RateLimit(rate=2, burst=3)
+    
+    assert all(store.consume("k", limit).allowed for _ in range(3))
+    denied = store.consume("k", limit)
+    assert not denied.allowed
+    assert denied.retry_after == pytest.approx(0.5)
+    assert denied.retry_after_header == "1"
+    
+    clock.now += 0.5
+    assert store.consume("k", limit).allowed
+    assert not store.consume("k", limit).allowed
+    
+    # Other keys have their own bucket
+    assert store.consume("other", limit).allowed
+
+def test_memory_store_evicts_least_recently_used():
+    """Test the in-process store stays bounded"""
+    store = MemoryRateLimitStore(max_keys=2)
+    limit = RateLimit(rate=1, burst=1)
+    store.consume("a", limit)
+    store.consume("b", limit)
+    store.consume("c", limit)
+    
+    # "a" was evicted and comes back with a full bucket
+    assert store.consume("a", limit).allowed
+    assert not store.consume("c", limit).allowed
+
+def test_login_limited_by_client_ip():
+    """Test login returns 429 with Retry-After once the burst is used"""
+    client = build_client('{"/admin/login": {"rate": 0.1, "burst": 2}}', MemoryRateLimitStore())
+    
+    assert client.post("/admin/login").status_code == 200
+    assert client.post("/admin/login").status_code == 200
+    response = client.post("/admin/login")
+    
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    
+    # Unlimited routes are untouched
+    assert client.get("/health").status_code == 200
+
+def test_org_routes_limited_per_organization():
+    """Test one tenant exhausting its bucket does not affect another"""
+    client = build_client(
+        '{"/org": {"rate": 0.1, "burst": 2, "scopes": ["organization"]}}',
+        MemoryRateLimitStore()
+    )
+    token_a = create_access_token({"sub": "admin-a", "email": "a@a.com", "org_id": "org-a", "org_name": "A"})
+    token_b = create_access_token({"sub": "admin-b", "email": "b@b.com", "org_id": "org-b", "org_name": "B"})
+    headers_a = {"Authorization": f"Bearer {token_a}"}
+    headers_b = {"Authorization": f"Bearer {token_b}"}
+    
+    assert client.get("/org/get", headers=headers_a).status_code == 200
+    assert client.get("/org/get", headers=headers_a).headers["X-RateLimit-Remaining"] == "0"
+    assert client.get("/org/get", headers=headers_a).status_code == 429
+    assert client.get("/org/get", headers=headers_b).status_code == 200
+
+def test_rule_overrides():
+    """Test JSON overrides replace and disable default rules"""
+    rules = {rule.prefix: rule for rule in load_rate_limit_rules('{"/admin/login": null, "/org": {"burst": 5}}')}
+    
+    assert "/admin/login" not in rules
+    assert rules["/org"].limit.burst == 5
+    assert rules["/org"].limit.rate == 20
+    
+    with pytest.raises(ValueError):
+        load_rate_limit_rules('{"/org": {"scopes": ["tenant"]}}')
+
+def test_rejected_request_does_not_debit_other_scopes():
+    """Test a request denied by one bucket leaves the other buckets untouched"""
+    store = MemoryRateLimitStore(clock=FakeClock())
+    limit = RateLimit(rate=1, burst=2)
+    store.consume_all(["org", "admin"], limit)
+    store.consume_all(["org", "admin"], limit)
+
+    results = store.consume_all(["org", "other-admin"], limit)
+    assert [result.allowed for result in results] == [False, True]
+    assert results[1].remaining == 2
+    assert store.consume("other-admin", limit).remaining == 1
+
+def test_forwarded_for_uses_the_entry_added_by_the_proxy(monkeypatch):
+    """Test clients cannot pick their own bucket through X-Forwarded-For"""
+    monkeypatch.setattr(settings, "rate_limit_trust_forwarded_for", True)
+    client = build_client('{"/admin/login": {"rate": 0.1, "burst": 1}}', MemoryRateLimitStore())
+
+    assert client.post("/admin/login", headers={"X-Forwarded-For": "1.1.1.1, 203.0.113.7"}).status_code == 200
+    assert client.post("/admin/login", headers={"X-Forwarded-For": "2.2.2.2, 203.0.113.7"}).status_code == 429
+    assert client.post("/admin/login", headers={"X-Forwarded-For": "198.51.100.3"}).status_code == 200
+
+    # Two proxies in front: the client is the second entry from the right
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxy_hops", 2)
+    assert client.post("/admin/login", headers={"X-Forwarded-For": "3.3.3.3, 192.0.2.9, 10.0.0.1"}).status_code == 200
+    assert client.post("/admin/login", headers={"X-Forwarded-For": "4.4.4.4, 192.0.2.9, 10.0.0.2"}).status_code == 429
+
+def test_blocking_store_is_called_off_the_event_loop():
+    """Test network-backed stores do not stall the event loop"""
+    class ThreadRecordingStore(MemoryRateLimitStore):
+        blocking = True
+        
+        def consume_all(self, keys, limit, cost=1.0):
+            self.thread = threading.get_ident()
+            return super().consume_all(keys, limit, cost)
+    
+    store = ThreadRecordingStore()
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, rules=load_rate_limit_rules('{"/admin/login": {"rate": 1, "burst": 5}}'), store=store)
+    
+    @app.post("/admin/login")
+    async def login():
+        return {"thread": threading.get_ident()}
+    
+    response = TestClient(app).post("/admin/login")
+    
+    assert response.status_code == 200
+    assert store.thread != response.json()["thread"]
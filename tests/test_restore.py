@@ -0,0 +1,98 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.db.backup import BackupEngine
+from src.db.mongo import mongo_manager
+from src.db.restore import RestoreEngine
+
+HEADERS = {"X-Internal-Token": "internal-test-token"}
+
+def create_organization(test_client: TestClient, name: str) -> str:
+    response = test_client.post("/org/create", json={
+        "organization_name": name, "email": f"admin@{name.lower()}.com", "password": "TestPass123"
+    })
+    return response.json()["id"]
+
+def wait_for_job(test_client: TestClient, job_id: str, timeout: float = 15.0) -> dict:
+    """Poll the internal job endpoint until the job finishes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = test_client.get(f"/internal/jobs/{job_id}", headers=HEADERS).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.2)
+    pytest.fail(f"Job {job_id} did not finish within {timeout}s")
+
+def test_restore_endpoint_recreates_deleted_organization(test_client: TestClient, monkeypatch, tmp_path):
+    """Test a deleted organization comes back with its data, indexes and login"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path))
+    org_id = create_organization(test_client, "RestoreMe")
+    create_organization(test_client, "StaysOnline")
+    master = mongo_manager.get_master_db()
+    master[f"org_{org_id}"].insert_many([{"sku": f"item-{i}"} for i in range(250)])
+    master[f"org_{org_id}"].create_index("sku", unique=True)
+    organization = master.organizations.find_one({"organization_name": "RestoreMe"})
+    backup = BackupEngine(root=str(tmp_path), workers=2).run(organization=organization)
+
+    master[f"org_{org_id}"].drop()
+    master.admin_users.delete_one({"email": "admin@restoreme.com"})
+    master.organizations.delete_one({"_id": organization["_id"]})
+    assert test_client.post("/admin/login", json={"email": "admin@restoreme.com", "password": "TestPass123"}).status_code == 401
+
+    response = test_client.post(f"/internal/organizations/{org_id}/restore", json={}, headers=HEADERS)
+    assert response.status_code == 202
+    job = wait_for_job(test_client, response.json()["job_id"])
+
+    assert job["status"] == "succeeded", job["error"]
+    assert job["result"]["backup_id"] == backup["backup_id"]
+    assert job["progress"]["phase"] == "completed"
+    assert job["progress"]["documents"] == job["progress"]["total_documents"] == 251
+    assert master[f"org_{org_id}"].count_documents({}) == 251
+    assert "sku_1" in master[f"org_{org_id}"].index_information()
+    assert f"org_{org_id}_restoring" not in master.list_collection_names()
+    login = test_client.post("/admin/login", json={"email": "admin@restoreme.com", "password": "TestPass123"})
+    assert login.status_code == 200
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert test_client.get("/org/get", params={"org_name": "RestoreMe"}, headers=headers).status_code == 200
+
+    # Existing organizations are only overwritten on request
+    response = test_client.post(f"/internal/organizations/{org_id}/restore", json={}, headers=HEADERS)
+    assert response.status_code == 400
+
+def test_restore_from_full_backup_replaces_live_tenant(test_client: TestClient, tmp_path):
+    """Test one tenant is picked out of a full backup and streamed back in small batches"""
+    org_id = create_organization(test_client, "FullSource")
+    other_id = create_organization(test_client, "Untouched")
+    master = mongo_manager.get_master_db()
+    master[f"org_{org_id}"].insert_many([{"n": i} for i in range(100)])
+    BackupEngine(root=str(tmp_path), workers=2, chunk_bytes=1024).run()
+    master[f"org_{org_id}"].delete_many({"n": {"$gte": 50}})
+    master[f"org_{other_id}"].insert_one({"after": "backup"})
+
+    engine = RestoreEngine(master, root=str(tmp_path), workers=3, batch_size=7)
+    with pytest.raises(ValueError, match="exists"):
+        engine.restore_tenant(org_id)
+    phases = []
+    result = engine.restore_tenant(org_id, replace=True, progress=lambda progress: phases.append(progress["phase"]))
+
+    assert result["replaced"] is True
+    assert phases[0] == "loading" and phases[-3:] == ["indexes", "metadata", "completed"]
+    assert master[f"org_{org_id}"].count_documents({}) == 101
+    assert master[f"org_{other_id}"].count_documents({"after": "backup"}) == 1
+
+def test_restore_rejects_backup_ids_outside_backup_dir(test_client: TestClient, monkeypatch, tmp_path):
+    """Test backup ids cannot point outside the backup directory"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path / "backups"))
+    org_id = create_organization(test_client, "PathCheck")
+    (tmp_path / "manifest.json").write_text("{}")
+
+    response = test_client.post(f"/internal/organizations/{org_id}/restore", json={"backup_id": ".."}, headers=HEADERS)
+    assert response.status_code == 422
+
+    engine = RestoreEngine(mongo_manager.get_master_db(), root=str(tmp_path / "backups"))
+    for backup_id in ("..", "../backups/..", "/etc"):
+        with pytest.raises(ValueError, match="Invalid backup id"):
+            engine.find_tenant_backup(org_id, backup_id)
@@ -0,0 +1,99 @@
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.models.organization import OrganizationModel
+from src.utils.search import normalize_name, similarity, trigrams
+
+def create_organization(test_client: TestClient, name: str, email: str) -> dict:
+    test_client.post("/org/create", json={"organization_name": name, "email": email, "password": "TestPass123"})
+    login = test_client.post("/admin/login", json={"email": email, "password": "TestPass123"})
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+def test_normalization_and_trigrams():
+    """Test names are folded to a comparable key"""
+    assert normalize_name("  Café-Übersee   GmbH! ") == "cafe ubersee gmbh"
+    assert trigrams("ab") == ["  a", " ab", "ab "]
+    assert similarity(trigrams("acme"), trigrams("acme")) == 1.0
+    assert similarity(trigrams("acme"), trigrams("zeta")) == 0.0
+    assert normalize_name("Газпром-Нефть") == "газпром нефть"
+    assert normalize_name("東京電力") == "東京電力"
+    assert 0.3 < similarity(trigrams("tecnologies"), trigrams("technologies")) < 1.0
+
+def test_search_ranks_exact_prefix_and_fuzzy_matches(test_client: TestClient):
+    """Test exact matches come first, then prefixes, then similar names"""
+    headers = create_organization(test_client, "Acme", "admin@acme.com")
+    for i, name in enumerate(["Acme Rockets", "Acme-Anvils", "Acmee Supplies", "Zenith Labs"]):
+        create_organization(test_client, name, f"admin{i}@search.com")
+
+    response = test_client.get("/org/search", params={"q": "ACME"}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    names = [org["organization_name"] for org in body["organizations"]]
+    assert names[0] == "Acme"
+    assert body["organizations"][0]["match"] == "exact"
+    assert set(names[1:3]) == {"Acme Rockets", "Acme-Anvils"}
+    assert {org["match"] for org in body["organizations"][1:3]} == {"prefix"}
+    assert "Zenith Labs" not in names
+    assert body["total"] == len(names)
+
+    # Typos still find the organization through shared trigrams
+    fuzzy = test_client.get("/org/search", params={"q": "zenit labs"}, headers=headers).json()
+    assert fuzzy["organizations"][0]["organization_name"] == "Zenith Labs"
+    assert fuzzy["organizations"][0]["match"] == "fuzzy"
+
+    page = test_client.get("/org/search", params={"q": "acme", "limit": 2, "offset": 1}, headers=headers).json()
+    assert [org["organization_name"] for org in page["organizations"]] == names[1:3]
+
+    assert test_client.get("/org/search", params={"q": "!!!"}, headers=headers).status_code == 400
+    assert test_client.get("/org/search", params={"q": "acme"}).status_code in (401, 403)
+
+def test_search_fields_follow_renames_and_backfill(test_client: TestClient):
+    """Test renamed and pre-existing organizations are searchable"""
+    headers = create_organization(test_client, "Old Name", "admin@rename.com")
+    test_client.put("/org/update", json={"organization_name": "Old Name", "new_organization_name": "Brand New"}, headers=headers)
+    results = test_client.get("/org/search", params={"q": "brand"}, headers=headers).json()["organizations"]
+    assert [org["organization_name"] for org in results] == ["Brand New"]
+
+    # Organizations created before search existed get their fields from init_db
+    mongo_manager.get_master_db().organizations.update_many({}, {"$unset": {"search_name": "", "name_trigrams": ""}})
+    assert test_client.get("/org/search", params={"q": "brand"}, headers=headers).json()["total"] == 0
+    assert OrganizationModel.backfill_search_fields(batch_size=1) == 1
+    assert test_client.get("/org/search", params={"q": "brand"}, headers=headers).json()["total"] == 1
+
+def test_fuzzy_lookup_probes_rare_trigrams_within_the_scan_limit(test_client: TestClient, monkeypatch):
+    """Test common trigrams are not scanned and matches are still found"""
+    headers = create_organization(test_client, "Quixotic Labs", "admin@quixotic.com")
+    for i in range(6):
+        create_organization(test_client, f"Labs {i}", f"admin{i}@labs.com")
+
+    probes = []
+    find_by_trigrams = OrganizationModel.find_by_trigrams
+    def spy(grams, min_common, limit, projection=None, probe=None, scan_limit=None):
+        probes.append(probe)
+        return find_by_trigrams(grams, min_common, limit, projection, probe, scan_limit)
+    monkeypatch.setattr(OrganizationModel, "find_by_trigrams", staticmethod(spy))
+    monkeypatch.setattr(settings, "search_trigram_scan_limit", 3)
+
+    results = test_client.get("/org/search", params={"q": "quixotc labs"}, headers=headers).json()
+    assert results["organizations"][0]["organization_name"] == "Quixotic Labs"
+    # 13 query trigrams, 4 needed for a match: the 3 most common are not looked up
+    assert len(probes[0]) == 10
+    assert len({"  l", " la", "lab", "abs", "bs "} - set(probes[0])) == 3
+
+def test_non_latin_names_are_searchable(test_client: TestClient):
+    """Test names in other scripts get search fields and can be found"""
+    headers = create_organization(test_client, "Газпром Нефть", "admin@gazprom.com")
+    create_organization(test_client, "東京電力", "admin@tepco.com")
+
+    prefix = test_client.get("/org/search", params={"q": "газпром"}, headers=headers)
+    assert prefix.status_code == 200
+    assert [org["organization_name"] for org in prefix.json()["organizations"]] == ["Газпром Нефть"]
+    fuzzy = test_client.get("/org/search", params={"q": "газпрм нефть"}, headers=headers).json()
+    assert fuzzy["organizations"][0]["organization_name"] == "Газпром Нефть"
+    cjk = test_client.get("/org/search", params={"q": "東京"}, headers=headers).json()
+    assert [org["organization_name"] for org in cjk["organizations"]] == ["東京電力"]
+
+    # Organizations indexed with an empty key by the old normalization are redone
+    mongo_manager.get_master_db().organizations.update_many({}, {"$set": {"search_name": "", "name_trigrams": []}})
+    assert OrganizationModel.backfill_search_fields(batch_size=1) == 2
+    assert test_client.get("/org/search", params={"q": "東京"}, headers=headers).json()["total"] == 1
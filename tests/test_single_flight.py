@@ -0,0 +1,62 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.single_flight import SingleFlight
+
+def run_concurrently(flight: SingleFlight, key: str, func, callers: int):
+    """Start one leader, then callers - 1 followers while it is still in flight"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def lookup():
+        started.set()
+        release.wait(5)
+        return func()
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(flight.do, "orgs.find_by_name", key, lookup)]
+        started.wait(5)
+        futures += [pool.submit(flight.do, "orgs.find_by_name", key, lookup) for _ in range(callers - 1)]
+        # Let every follower register before the leader finishes
+        while flight.stats["orgs.find_by_name"]["coalesced"] < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        return [future.exception() or future.result() for future in futures]
+
+def test_concurrent_lookups_share_one_query():
+    """Test callers with the same key get one query's result, each their own copy"""
+    flight = SingleFlight()
+    queries = []
+
+    def query():
+        queries.append(1)
+        return {"organization_name": "Acme", "tags": []}
+
+    results = run_concurrently(flight, "Acme", query, callers=8)
+
+    assert len(queries) == 1
+    assert flight.stats["orgs.find_by_name"] == {"executed": 1, "coalesced": 7}
+    assert all(result == {"organization_name": "Acme", "tags": []} for result in results)
+    results[0]["tags"].append("mutated")
+    assert results[1]["tags"] == []
+
+def test_errors_reach_every_caller_and_are_not_remembered():
+    """Test a failed lookup raises for all waiters and the next call retries"""
+    flight = SingleFlight()
+
+    def failing():
+        raise RuntimeError("mongo down")
+
+    results = run_concurrently(flight, "Acme", failing, callers=3)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    assert flight.do("orgs.find_by_name", "Acme", lambda: "ok") == "ok"
+
+def test_different_keys_do_not_coalesce():
+    """Test sequential and different-key lookups each run their own query"""
+    flight = SingleFlight()
+    flight.do("orgs.find_by_name", "A", lambda: 1)
+    flight.do("orgs.find_by_name", "B", lambda: 2)
+    flight.do("orgs.find_by_name", "A", lambda: 3)
+
+    assert flight.stats["orgs.find_by_name"] == {"executed": 3, "coalesced": 0}
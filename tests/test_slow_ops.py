@@ -0,0 +1,80 @@
+from datetime import timedelta
+from pymongo import monitoring
+from src.db.explain import filter_shape, summarize_explain
+from src.db.slow_ops import SlowOperationListener
+
+ADDRESS = ("localhost", 27017)
+
+EXPLAIN_IXSCAN = {"queryPlanner": {"winningPlan": {
+    "stage": "FETCH",
+    "inputStage": {"stage": "IXSCAN", "indexName": "organization_name_1"}
+}}}
+
+def run_command(listener: SlowOperationListener, command: dict, duration_ms: float, request_id: int = 1):
+    """Feed the listener the events pymongo emits for one command"""
+    name = next(iter(command))
+    listener.started(monitoring.CommandStartedEvent(command, "organization_master", request_id, ADDRESS, request_id))
+    listener.succeeded(monitoring.CommandSucceededEvent(
+        timedelta(milliseconds=duration_ms), {"ok": 1}, name, request_id, ADDRESS, request_id
+    ))
+
+def test_only_slow_operations_are_recorded():
+    """Test commands under the threshold are ignored and records keep only the filter shape"""
+    listener = SlowOperationListener(threshold_ms=50, buffer_size=10)
+
+    run_command(listener, {"find": "organizations", "filter": {"organization_name": "Acme"}}, 5)
+    run_command(listener, {"find": "organizations", "filter": {"organization_name": "Acme"}}, 120, request_id=2)
+
+    operations = listener.recent()
+    assert len(operations) == 1
+    assert operations[0]["collection"] == "organizations"
+    assert operations[0]["filter_shape"] == {"organization_name": "<str>"}
+    assert operations[0]["duration_ms"] == 120
+
+def test_ring_buffer_is_bounded():
+    """Test the oldest records are dropped once the buffer is full"""
+    listener = SlowOperationListener(threshold_ms=0, buffer_size=3)
+    for i in range(5):
+        run_command(listener, {"find": f"coll{i}", "filter": {}}, 1, request_id=i)
+
+    assert [op["collection"] for op in listener.recent()] == ["coll4", "coll3", "coll2"]
+
+def test_explain_captured_once_per_shape():
+    """Test explain runs in the background and is reused for the same query shape"""
+    calls = []
+
+    def explainer(database_name, explain):
+        calls.append(explain)
+        return EXPLAIN_IXSCAN
+
+    listener = SlowOperationListener(threshold_ms=0, buffer_size=10, explainer=explainer)
+    command = {"find": "organizations", "filter": {"organization_name": "Acme"}, "lsid": {"id": 1}, "$db": "x"}
+    run_command(listener, command, 10, request_id=1)
+    listener.wait_for_explains()
+    run_command(listener, dict(command, filter={"organization_name": "Other"}), 10, request_id=2)
+    listener.wait_for_explains()
+
+    assert len(calls) == 1
+    assert calls[0] == {
+        "explain": {"find": "organizations", "filter": {"organization_name": "Acme"}},
+        "verbosity": "queryPlanner"
+    }
+    for operation in listener.recent():
+        assert operation["explain"]["plan"] == "FETCH <- IXSCAN(organization_name_1)"
+        assert operation["explain"]["collscan"] is False
+
+def test_summarize_collscan_and_sort():
+    """Test collection scans and blocking sorts are flagged"""
+    summary = summarize_explain({"queryPlanner": {"winningPlan": {
+        "stage": "SORT", "inputStage": {"stage": "COLLSCAN"}
+    }}})
+
+    assert summary["collscan"] is True
+    assert summary["in_memory_sort"] is True
+    assert summary["indexes"] == []
+
+def test_filter_shape_keeps_operators():
+    """Test literal values are replaced but operators and branches are kept"""
+    shape = filter_shape({"$or": [{"a": 1}, {"b": {"$in": ["x", "y"]}}]})
+
+    assert shape == {"$or": [{"a": "<int>"}, {"b": {"$in": "<array>"}}]}
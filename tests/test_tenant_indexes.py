@@ -0,0 +1,135 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.db.mongo import mongo_manager
+from src.models.tenant_index import TenantIndexModel
+from src.services.index_service import TenantIndexBootstrap, TenantIndexBuilder, declare_index
+from src.utils.rate_limiter import MemoryRateLimitStore
+
+HEADERS = {"X-Internal-Token": "internal-test-token"}
+
+def create_organization(test_client: TestClient, name: str) -> dict:
+    """Create an organization and return its id with admin auth headers"""
+    email = f"admin@{name.lower()}.com"
+    response = test_client.post("/org/create", json={
+        "organization_name": name, "email": email, "password": "TestPass123"
+    })
+    login = test_client.post("/admin/login", json={"email": email, "password": "TestPass123"})
+    return {"id": response.json()["id"], "headers": {"Authorization": f"Bearer {login.json()['access_token']}"}}
+
+def wait_for_job(test_client: TestClient, job_id: str, timeout: float = 15.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = test_client.get(f"/internal/jobs/{job_id}", headers=HEADERS).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.2)
+    pytest.fail(f"Job {job_id} did not finish within {timeout}s")
+
+def test_admin_declares_and_drops_index(test_client: TestClient, monkeypatch):
+    """Test an admin's index is built in the background on their collection only"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    org = create_organization(test_client, "Indexed")
+    other = create_organization(test_client, "NotIndexed")
+    master = mongo_manager.get_master_db()
+
+    response = test_client.post("/org/indexes", json={
+        "keys": [{"field": "sku", "direction": 1}, {"field": "created_at", "direction": -1}],
+        "unique": True
+    }, headers=org["headers"])
+    assert response.status_code == 202
+    job = wait_for_job(test_client, response.json()["job_id"])
+    assert job["status"] == "succeeded", job["error"]
+    assert job["result"]["changed"] == 1 and job["progress"]["phase"] == "completed"
+
+    assert master[f"org_{org['id']}"].index_information()["sku_1_created_at_-1"]["unique"] is True
+    assert "sku_1_created_at_-1" not in master[f"org_{other['id']}"].index_information()
+    listed = test_client.get("/org/indexes", headers=org["headers"]).json()
+    assert listed["indexes"][0]["built"] is True and listed["indexes"][0]["build"]["changed"] == 1
+    assert test_client.get("/org/indexes", headers=other["headers"]).json()["count"] == 0
+
+    # Names are unique per collection, and bad specs are rejected
+    duplicate = test_client.post("/org/indexes", json={"keys": [{"field": "sku"}], "name": "sku_1_created_at_-1"}, headers=org["headers"])
+    assert duplicate.status_code == 400
+    invalid = test_client.post("/org/indexes", json={"keys": [{"field": "sku", "direction": 2}]}, headers=org["headers"])
+    assert invalid.status_code == 400
+
+    response = test_client.delete("/org/indexes/sku_1_created_at_-1", headers=org["headers"])
+    assert response.status_code == 202
+    assert wait_for_job(test_client, response.json()["job_id"])["status"] == "succeeded"
+    assert "sku_1_created_at_-1" not in master[f"org_{org['id']}"].index_information()
+    assert TenantIndexModel.find(org["id"], "sku_1_created_at_-1") is None
+
+def test_all_tenant_index_applies_to_new_organizations(test_client: TestClient, monkeypatch):
+    """Test an index declared for all tenants is built everywhere and on creation"""
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+    existing = create_organization(test_client, "BeforeIndex")
+    master = mongo_manager.get_master_db()
+
+    response = test_client.post("/internal/tenant-indexes", json={"keys": [{"field": "data.status"}]}, headers=HEADERS)
+    assert response.status_code == 202
+    job = wait_for_job(test_client, response.json()["job_id"])
+    assert job["status"] == "succeeded" and job["result"]["failed"] == 0
+    assert "data.status_1" in master[f"org_{existing['id']}"].index_information()
+
+    created = create_organization(test_client, "AfterIndex")
+    assert "data.status_1" in master[f"org_{created['id']}"].index_information()
+    listed = test_client.get("/internal/tenant-indexes", params={"organization_id": created["id"]}, headers=HEADERS).json()
+    assert [index["name"] for index in listed["indexes"]] == ["data.status_1"]
+    assert listed["indexes"][0]["scope"] == "all" and listed["indexes"][0]["built"] is True
+
+    # An organization cannot shadow an index declared for everyone
+    conflict = test_client.post("/org/indexes", json={"keys": [{"field": "data.status"}]}, headers=created["headers"])
+    assert conflict.status_code == 400
+    response = test_client.delete("/internal/tenant-indexes/data.status_1", headers=HEADERS)
+    assert wait_for_job(test_client, response.json()["job_id"])["status"] == "succeeded"
+    assert "data.status_1" not in master[f"org_{existing['id']}"].index_information()
+
+def test_builder_reports_failing_collections(test_client: TestClient):
+    """Test one tenant violating a unique index fails alone and is reported"""
+    good = create_organization(test_client, "UniqueOk")
+    bad = create_organization(test_client, "UniqueBroken")
+    master = mongo_manager.get_master_db()
+    master[f"org_{bad['id']}"].insert_many([{"code": "A"}, {"code": "A"}])
+    master[f"org_{good['id']}"].insert_many([{"code": "A"}, {"code": "B"}])
+
+    spec = declare_index(None, [["code", 1]], unique=True, partial_filter={"code": {"$exists": True}})
+    progress = []
+    builder = TenantIndexBuilder(workers=3, rate=1000, rate_limit_store=MemoryRateLimitStore())
+    result = builder.build(spec, progress=progress.append)
+
+    assert result["failed"] == 1
+    assert [failure["organization_id"] for failure in result["failures"]] == [bad["id"]]
+    assert "code_1" in master[f"org_{good['id']}"].index_information()
+    assert "code_1" not in master[f"org_{bad['id']}"].index_information()
+    assert progress[-1]["phase"] == "completed"
+
+    # A rebuild only touches the collections still missing the index
+    master[f"org_{bad['id']}"].delete_one({"code": "A"})
+    result = builder.build(spec)
+    assert result["changed"] == 1 and result["failed"] == 0
+
+def test_bootstrap_creates_only_missing_indexes(test_client: TestClient):
+    """Test init_db's bootstrap indexes every registered collection once"""
+    first = create_organization(test_client, "BootFirst")
+    second = create_organization(test_client, "BootSecond")
+    gone = create_organization(test_client, "BootGone")
+    master = mongo_manager.get_master_db()
+    master[f"org_{gone['id']}"].drop()
+    declare_index(None, [["data.kind", 1]])
+    declare_index(second["id"], [["sku", 1]], unique=True)
+    master[f"org_{first['id']}"].create_index("data.kind", name="data.kind_1")
+
+    records = []
+    stats = TenantIndexBootstrap(workers=4).run(records.append)
+
+    assert stats["collections"] == 3 and stats["failed"] == 0
+    assert stats["changed"] == 1 and stats["unchanged"] == 1 and stats["missing"] == 1
+    created = {record["collection_name"]: record["created"] for record in records if record["status"] != "missing"}
+    assert created == {f"org_{first['id']}": [], f"org_{second['id']}": ["data.kind_1", "sku_1"]}
+    assert all(record["seconds"] >= 0 for record in records)
+    assert master[f"org_{second['id']}"].index_information()["sku_1"]["unique"] is True
+    assert f"org_{gone['id']}" not in master.list_collection_names()
+
+    assert TenantIndexBootstrap(workers=4).run()["changed"] == 0
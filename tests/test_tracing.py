@@ -0,0 +1,107 @@
+import json
+import pytest
+from datetime import timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo import monitoring
+from src.db.command_tracing import TracingCommandListener
+from src.middleware.tracing_middleware import TracingMiddleware
+from src.utils.tracing import (
+    FileSpanExporter, InMemorySpanExporter, SimpleSpanProcessor, Tracer,
+    parse_traceparent, traced, tracer
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+@pytest.fixture
+def exporter():
+    """Route the global tracer to an in-memory exporter for one test"""
+    exporter = InMemorySpanExporter()
+    saved_ratio = tracer.sample_ratio
+    tracer.configure(SimpleSpanProcessor(exporter), sample_ratio=1.0)
+    yield exporter
+    tracer.configure(None, sample_ratio=saved_ratio)
+
+@traced("lookup")
+def lookup():
+    return "ok"
+
+def build_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/org/{name}")
+    async def get_org(name: str):
+        return {"result": lookup()}
+
+    return TestClient(app)
+
+def test_parse_traceparent():
+    """Test valid headers parse and malformed ones are ignored"""
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == {
+        "trace_id": TRACE_ID, "span_id": PARENT_ID, "sampled": True
+    }
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00")["sampled"] is False
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent(f"ff-{TRACE_ID}-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+
+def test_request_continues_incoming_trace(exporter):
+    """Test the server span joins the caller's trace and nests handler spans"""
+    response = build_client().get("/org/acme", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+    spans = {span.name: span for span in exporter.spans}
+    server = spans["GET /org/{name}"]
+    assert server.trace_id == TRACE_ID
+    assert server.parent_span_id == PARENT_ID
+    assert server.attributes["http.status_code"] == 200
+    assert spans["lookup"].parent_span_id == server.span_id
+    assert response.headers["traceparent"] == f"00-{TRACE_ID}-{server.span_id}-01"
+
+def test_upstream_sampling_decision_is_respected(exporter):
+    """Test an unsampled parent suppresses export but still propagates context"""
+    response = build_client().get("/org/acme", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+
+    assert exporter.spans == []
+    assert response.headers["traceparent"].endswith("-00")
+
+def test_sample_ratio_applies_to_new_traces():
+    """Test a ratio of 0 drops new traces and 1 keeps them"""
+    exporter = InMemorySpanExporter()
+    local = Tracer(SimpleSpanProcessor(exporter), sample_ratio=0.0)
+    with local.span("dropped"):
+        pass
+    local.sample_ratio = 1.0
+    with local.span("kept"):
+        pass
+
+    assert [span.name for span in exporter.spans] == ["kept"]
+
+def test_mongo_commands_become_client_spans(exporter):
+    """Test pymongo command events inside a span produce child spans"""
+    listener = TracingCommandListener()
+    address = ("localhost", 27017)
+    with tracer.span("request") as parent:
+        command = {"find": "organizations", "filter": {"organization_name": "Acme"}}
+        listener.started(monitoring.CommandStartedEvent(command, "organization_master", 1, address, 1))
+        listener.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=3), {"ok": 1}, "find", 1, address, 1))
+
+    mongo_span = next(span for span in exporter.spans if span.name == "mongodb.find")
+    assert mongo_span.parent_span_id == parent.span_id
+    assert mongo_span.attributes["db.mongodb.collection"] == "organizations"
+    assert mongo_span.attributes["db.statement"] == "{'organization_name': '<str>'}"
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    """Test spans are written as OTLP/JSON export requests"""
+    path = tmp_path / "traces.jsonl"
+    local = Tracer(SimpleSpanProcessor(FileSpanExporter(str(path), "test-service")))
+    with local.span("work", attributes={"org.count": 3}):
+        pass
+
+    payload = json.loads(path.read_text().splitlines()[0])
+    resource_spans = payload["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"]["stringValue"] == "test-service"
+    span = resource_spans["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "work"
+    assert span["attributes"] == [{"key": "org.count", "value": {"intValue": "3"}}]
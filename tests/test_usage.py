@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.config.settings import settings
+from src.models.tenant_usage import TenantUsageModel
+from src.services.usage_service import UsageCollector, UsageRecorder, usage_collector
+
+INTERNAL_HEADERS = {"X-Internal-Token": "internal-test-token"}
+
+@pytest.fixture
+def internal_api(monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", "internal-test-token")
+
+def create_and_login(test_client: TestClient, name: str) -> dict:
+    email = f"admin@{name.lower()}.com"
+    created = test_client.post("/org/create", json={
+        "organization_name": name, "email": email, "password": "TestPass123"
+    }).json()
+    token = test_client.post("/admin/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    return {"id": created["id"], "headers": {"Authorization": f"Bearer {token}"}}
+
+def test_authenticated_requests_are_attributed(test_client: TestClient, internal_api):
+    """Test requests count against the caller's organization once flushed"""
+    org = create_and_login(test_client, "UsageOrg")
+    for _ in range(3):
+        assert test_client.get("/org/get?org_name=UsageOrg", headers=org["headers"]).status_code == 200
+    asyncio.run(usage_collector.flush())
+
+    summary = test_client.get("/internal/usage", headers=INTERNAL_HEADERS).json()
+    row = next(row for row in summary["organizations"] if row["organization_id"] == org["id"])
+    assert row["organization_name"] == "UsageOrg"
+    assert row["requests"] == 3
+    assert row["errors"] == 0
+
+    detail = test_client.get(f"/internal/usage/{org['id']}", headers=INTERNAL_HEADERS).json()
+    assert detail["hourly"][0]["requests"] == 3
+    assert sum(detail["hourly"][0]["latency_buckets"].values()) == 3
+
+def test_unknown_sort_is_rejected(test_client: TestClient, internal_api):
+    """Test the summary only sorts by counter fields"""
+    response = test_client.get("/internal/usage?sort=organization_name", headers=INTERNAL_HEADERS)
+
+    assert response.status_code == 400
+
+def test_storage_sampling_walks_registry_in_batches(test_client: TestClient):
+    """Test collStats is sampled a batch at a time, wrapping around the registry"""
+    org_ids = [create_and_login(test_client, f"StorageOrg{i}")["id"] for i in range(3)]
+    sampled_collections = []
+
+    def collection_stats(collection_name):
+        sampled_collections.append(collection_name)
+        return {"count": 1, "size": 100, "storageSize": 4096, "totalIndexSize": 4096, "nindexes": 1}
+
+    collector = UsageCollector(
+        UsageRecorder(), collstats_batch_size=2, collstats_per_second=1000, collection_stats=collection_stats
+    )
+    first = asyncio.run(collector.sample_storage())
+    second = asyncio.run(collector.sample_storage())
+
+    assert set(org_ids) <= set(first + second)
+    assert len(first) == 2
+    assert collector.stats["passes"] == 1
+    assert len(sampled_collections) == len(set(sampled_collections))
+    storage = TenantUsageModel.find_storage(org_ids[0])
+    assert storage["size"] == 100
+    assert storage["collection_name"] == f"org_{org_ids[0]}"